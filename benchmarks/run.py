@@ -0,0 +1,166 @@
+"""Benchmarks for the patchmoint core on synthetic leagues.
+
+    python benchmarks/run.py                          # 10^2 .. 10^4 matches, all sports
+    python benchmarks/run.py --sizes 100 100000 --sports tennis
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+Each case is timed on the same deterministic league (see
+patchmoint.synthetic), keeping the best of ``--repeat`` runs. ``--save``
+writes the timings as JSON; ``--compare`` prints them next to an earlier
+file and exits non-zero when a case got slower than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from patchmoint.cards import match_card_html, podium_html, ranking_player_html, ranking_stats_html
+from patchmoint.history import game_difference_series, performance_history
+from patchmoint.odds import doubles_pairings, singles_odds
+from patchmoint.rankings import calculate_rankings
+from patchmoint.scoring import parse_set
+from patchmoint.simulation import round_robin_fixtures, simulate_season
+from patchmoint.sports import get_sport
+from patchmoint.synthetic import synthetic_league
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cases(league, sport):
+    """The benchmarked operations for one league, as ``(name, callable)`` pairs."""
+    matches, players, bookings, config = league.matches, league.players, league.bookings, league.config
+    rank_df = calculate_rankings(matches, players, config, sport)
+    doubles_rank_df = calculate_rankings(matches[matches.match_type.isin(["Doubles", "Mixed Doubles"])], players, config, sport)
+    singles_rank_df = calculate_rankings(matches[matches.match_type == "Singles"], players, config, sport)
+    set_values = pd.concat([matches.set1, matches.set2, matches.set3]).tolist()
+    busiest = rank_df.sort_values("Matches", ascending=False).iloc[0]["Player"]
+    player_imgs = dict(zip(players["name"], players["profile_image_url"]))
+    series = game_difference_series(matches)
+    history = matches.copy()
+    history["date"] = pd.to_datetime(history["date"], errors="coerce")
+    fixtures = round_robin_fixtures(rank_df["Player"].head(8).tolist(), rounds=2)
+
+    def odds():
+        for row in bookings.itertuples():
+            booked = [p for p in [row.player1, row.player2, row.player3, row.player4] if p]
+            if row.match_type == "Doubles" and len(booked) == 4:
+                doubles_pairings(booked, doubles_rank_df)
+            elif row.match_type == "Singles" and len(booked) == 2:
+                singles_odds(booked, singles_rank_df)
+
+    def ranking_cards():
+        podium_html(rank_df.head(3).to_dict('records'))
+        for _, row in rank_df.iterrows():
+            ranking_player_html(row)
+            ranking_stats_html(row)
+
+    def match_cards():
+        for row in history.itertuples():
+            match_card_html(row, player_imgs)
+
+    return [
+        ("rankings", lambda: calculate_rankings(matches, players, config, sport)),
+        ("parse_sets", lambda: [parse_set(s) for s in set_values]),
+        ("game_difference_series", lambda: game_difference_series(matches)),
+        # Only the slice: the series is timed above and cached in the app (the old full per-player run is not comparable)
+        ("performance_history_slice", lambda: performance_history(busiest, series)),
+        ("season_simulation", lambda: simulate_season(rank_df, fixtures, config["match_type_settings"], workers=1)),
+        ("odds", odds),
+        ("ranking_cards", ranking_cards),
+        ("match_cards", match_cards),
+    ]
+
+
+def run(sizes, sports, repeat, seed):
+    results = {}
+    for sport in sports:
+        for n in sizes:
+            league = synthetic_league(n, sport=sport, seed=seed)
+            # A single run is plenty once one call takes seconds
+            case_repeat = repeat if n <= 10000 else 1
+            for name, fn in cases(league, sport):
+                key = f"{name}[{sport.name.lower()},n={n}]"
+                results[key] = best_time(fn, case_repeat)
+                print(f"{key:<45} {results[key] * 1000:>12.2f} ms", flush=True)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')})")
+    regressions = []
+    for key, seconds in results.items():
+        before = baseline["results"].get(key)
+        if not before:
+            print(f"{key:<45} {'new':>12}")
+            continue
+        ratio = seconds / before
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{key:<45} {before * 1000:>10.2f} -> {seconds * 1000:>10.2f} ms  x{ratio:.2f}{flag}")
+        if flag: regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="match counts to benchmark")
+    parser.add_argument("--sports", nargs="+", default=["tennis", "pickleball", "padel"])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="write timings to this JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against an earlier JSON file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    sports = [get_sport(name) for name in args.sports]
+    if None in sports:
+        parser.error(f"unknown sport in {args.sports}")
+
+    results = run(args.sizes, sports, args.repeat, args.seed)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                    "seed": args.seed,
+                },
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
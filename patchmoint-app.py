@@ -0,0 +1,2741 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+import uuid
+import time
+import os
+import base64
+import copy
+import json
+import requests
+import urllib.parse
+import psycopg2
+from sqlalchemy import create_engine, text
+from psycopg2.extras import RealDictCursor, execute_values
+from datetime import datetime, timedelta
+import io
+import zipfile
+import warnings
+warnings.filterwarnings("ignore", category=UserWarning, module='pandas')
+import smtplib
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from patchmoint.cards import (RADAR_CATEGORIES, form_guide_html, fragment_stats, get_img_src, match_card_html, podium_html,
+                              profile_placeholder_html, radar_metrics, radar_svg, ranking_player_html, ranking_stats_html,
+                              standing_bar_html)
+from patchmoint.config import (LOCATION_TIMEZONES, DEFAULT_LOCATION, CONFIG_SCHEMA_VERSION, MATCH_TYPES, canonical_config,
+                               default_config, get_timezone, parse_config)
+from patchmoint.history import game_difference_series, performance_history
+from patchmoint.ics import generate_ics_for_booking
+from patchmoint.odds import balanced_pairing, doubles_pairings, singles_odds
+from patchmoint.pairs import best_partners, build_pairs, head_to_head_table
+from patchmoint.planner import last_session_partners, plan_session
+from patchmoint.rankings import ELO, rank_with_history, rating_trajectory
+from patchmoint.records import RECORD_COLUMNS, hall_of_fame, records_from_history, update_records
+from patchmoint.simulation import ELO_SYSTEM, POINTS_SYSTEM, booking_fixtures, round_robin_fixtures, simulate_season
+from patchmoint.sports import SPORTS, get_sport
+from patchmoint.styles import stylesheet
+from patchmoint import bulk, context, db, framecache, notify, partitioning, sharedcache, tracing
+
+# --- Configuration & Setup ---
+# One process serves every sport. The per-sport scripts pass DEFAULT_SPORT in;
+# a ?sport= link switches the session to another league.
+def resolve_sport():
+    deployment_sport = get_sport(st.secrets.get("SPORT_TYPE", globals().get("DEFAULT_SPORT", "Tennis"))) or SPORTS["Tennis"]
+    requested = get_sport(st.query_params.get("sport", ""))
+    if 'sport_type' not in st.session_state:
+        st.session_state.sport_type = (requested or deployment_sport).name
+    elif requested and requested.name != st.session_state.sport_type:
+        # Chapters belong to one sport, so leave the current one when switching
+        st.session_state.sport_type = requested.name
+        for key in ['current_chapter', 'temp_selected_chapter']: st.session_state[key] = None
+        st.session_state.chapter_config = {}
+        st.session_state.is_admin = False
+        st.session_state.can_write = False
+    return SPORTS[st.session_state.sport_type]
+
+SPORT = resolve_sport()
+# Timings for the admin Performance panel; off unless switched on there (or by the PERF_TRACE secret)
+tracing.start(st.session_state.get("perf_trace", False) or bool(st.secrets.get("PERF_TRACE", False)))
+SPORT_TYPE = SPORT.name
+RATING_NAME = SPORT.rating.name
+LOGO_URL = "https://raw.githubusercontent.com/mahadevbk/patchmointtennis/main/logo.png"
+
+def get_chapter_timezone():
+    return get_timezone(st.session_state.get('chapter_config'))
+
+st.set_page_config(page_title=f"Patch Moint {SPORT_TYPE} League", layout="centered")
+os.environ["STREAMLIT_SERVER_FILE_WATCHER_TYPE"] = "none"
+
+# --- CHECK SECRETS ---
+if "NEON_DATABASE_URL" not in st.secrets:
+    st.error("Missing secrets! Please configure NEON_DATABASE_URL, GITHUB_TOKEN, and GITHUB_REPO in .streamlit/secrets.toml")
+    st.stop()
+
+# --- REMOTE CONNECTION SETUP ---
+# Every statement goes to the query log; slow ones also get their plan (see patchmoint.db)
+db.configure(slow_ms=st.secrets.get("SLOW_QUERY_MS", db.DEFAULT_SLOW_MS))
+
+def get_connection():
+    tracing.count("connections")
+    return psycopg2.connect(st.secrets["NEON_DATABASE_URL"], connection_factory=db.TracedConnection)
+
+# Other processes' writes reach this one's shared frames over LISTEN/NOTIFY (see patchmoint.notify).
+# Neon's pooled endpoint cannot LISTEN: LISTEN_DATABASE_URL should point at the direct one. Until the
+# listener has seen its own probe arrive, shared frames are not served (every read goes to the database).
+listener = notify.start_listener(st.secrets.get("LISTEN_DATABASE_URL", st.secrets["NEON_DATABASE_URL"]),
+                                 framecache.bump, framecache.clear)
+framecache.gate(listener.connected)
+# Replicas behind a load balancer share frames and computed results here (see patchmoint.sharedcache)
+sharedcache.configure(st.secrets.get("SHARED_CACHE_URL"))
+
+def commit_changes(conn, chapter_id, *tables):
+    """Commit ``conn`` and invalidate ``tables`` of the chapter here and in every other process."""
+    conn.commit()
+    try:
+        # Announce only once the shared version has moved, or a replica could reload the old shared frame
+        sharedcache.bump(chapter_id, *tables)
+        with conn.cursor() as cur:
+            notify.publish(cur, chapter_id, {t: framecache.version(chapter_id, t) + 1 for t in tables})
+        conn.commit()
+    finally:
+        # The write is committed: this process must drop its frames even if the announcement failed
+        framecache.bump(chapter_id, *tables)
+
+# --- DATABASE INITIALIZATION ---
+# Bump whenever init_db gains a table, column, index or migration so running servers apply it
+SCHEMA_VERSION = 2
+
+@st.cache_resource(show_spinner=False)
+@tracing.traced(kind=tracing.DB)
+def init_db(schema_version=SCHEMA_VERSION):
+    """Create and migrate the schema once per process; a failure is not cached, so the next rerun retries."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            # 1. Create tables if they don't exist
+            # Removed UNIQUE from name to allow same names across different sports
+            queries = [
+                "CREATE TABLE IF NOT EXISTS chapters (id TEXT PRIMARY KEY, name TEXT, admin_password TEXT, created_at TEXT, config JSONB, sport TEXT, title_image_url TEXT, last_active_date TEXT, admin_name TEXT, admin_email TEXT)",
+                "CREATE TABLE IF NOT EXISTS players (name TEXT, profile_image_url TEXT, birthday TEXT, chapter_id TEXT, password TEXT, gender TEXT, is_admin BOOLEAN DEFAULT FALSE, initial_utr NUMERIC DEFAULT NULL)",
+                "CREATE TABLE IF NOT EXISTS matches (match_id TEXT PRIMARY KEY, date TEXT, match_type TEXT, team1_player1 TEXT, team1_player2 TEXT, team2_player1 TEXT, team2_player2 TEXT, set1 TEXT, set2 TEXT, set3 TEXT, winner TEXT, match_image_url TEXT, chapter_id TEXT, season_id TEXT DEFAULT NULL)",
+                "CREATE TABLE IF NOT EXISTS bookings (booking_id TEXT PRIMARY KEY, date TEXT, time TEXT, match_type TEXT, court_name TEXT, player1 TEXT, player2 TEXT, player3 TEXT, player4 TEXT, standby_player TEXT, screenshot_url TEXT, chapter_id TEXT)",
+                "CREATE TABLE IF NOT EXISTS courts (chapter_id TEXT, name TEXT, url TEXT)",
+                "CREATE TABLE IF NOT EXISTS join_requests (id TEXT PRIMARY KEY, name TEXT, message TEXT, chapter_id TEXT, created_at TEXT)",
+                "CREATE TABLE IF NOT EXISTS player_records (chapter_id TEXT, player TEXT, win_streak INTEGER DEFAULT 0, best_win_streak INTEGER DEFAULT 0, best_win_streak_on TEXT DEFAULT '', last_day TEXT DEFAULT '', day_matches INTEGER DEFAULT 0, most_matches_day INTEGER DEFAULT 0, most_matches_day_on TEXT DEFAULT '', sets_won INTEGER DEFAULT 0, peak_elo DOUBLE PRECISION DEFAULT 0, peak_elo_on TEXT DEFAULT '', biggest_upset DOUBLE PRECISION DEFAULT 0, biggest_upset_on TEXT DEFAULT '', PRIMARY KEY (chapter_id, player))",
+                "CREATE TABLE IF NOT EXISTS seasons (season_id TEXT PRIMARY KEY, chapter_id TEXT, name TEXT, started TEXT, ended TEXT, archived_at TEXT, matches INTEGER DEFAULT 0, standings TEXT, seeds JSONB)"
+            ]
+            for q in queries:
+                cur.execute(q)
+            conn.commit()
+
+            # 2. Run Migrations
+            migrations = [
+                "ALTER TABLE players ADD COLUMN IF NOT EXISTS initial_utr NUMERIC DEFAULT NULL",
+                "ALTER TABLE players ADD COLUMN IF NOT EXISTS is_admin BOOLEAN DEFAULT FALSE",
+                "ALTER TABLE chapters ADD COLUMN IF NOT EXISTS sport TEXT",
+                "ALTER TABLE chapters ADD COLUMN IF NOT EXISTS last_active_date TEXT DEFAULT ''",
+                "ALTER TABLE chapters ADD COLUMN IF NOT EXISTS title_image_url TEXT DEFAULT ''",
+                "ALTER TABLE chapters ADD COLUMN IF NOT EXISTS admin_name TEXT DEFAULT ''",
+                "ALTER TABLE chapters ADD COLUMN IF NOT EXISTS admin_email TEXT DEFAULT ''",
+                "ALTER TABLE chapters DROP CONSTRAINT IF EXISTS chapters_name_key",
+                # Archived matches carry their season; the live season is season_id IS NULL
+                "ALTER TABLE matches ADD COLUMN IF NOT EXISTS season_id TEXT DEFAULT NULL",
+                "CREATE INDEX IF NOT EXISTS matches_live_idx ON matches (chapter_id) WHERE season_id IS NULL",
+                "CREATE INDEX IF NOT EXISTS matches_season_idx ON matches (season_id) WHERE season_id IS NOT NULL",
+                # The initial_utr seeds each archived season started from, for rebuilding its records
+                "ALTER TABLE seasons ADD COLUMN IF NOT EXISTS seeds JSONB",
+                # Configs are stored as JSONB (they used to be JSON text)
+                """DO $$ BEGIN
+                    IF (SELECT data_type FROM information_schema.columns WHERE table_name = 'chapters' AND column_name = 'config') = 'text' THEN
+                        ALTER TABLE chapters ALTER COLUMN config TYPE JSONB USING NULLIF(config, '')::jsonb;
+                    END IF;
+                END $$"""
+            ]
+            
+            for migration in migrations:
+                try:
+                    cur.execute(migration)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    # print(f"Migration skipped or failed: {e}") 
+
+            # 3. Migrate legacy configs once and store them in canonical form
+            cur.execute("SELECT id, sport, config FROM chapters WHERE config IS NULL OR config->>'schema_version' IS DISTINCT FROM %s",
+                        (str(CONFIG_SCHEMA_VERSION),))
+            for chapter_id, chapter_sport, raw in cur.fetchall():
+                try:
+                    config, _ = canonical_config(raw, get_sport(chapter_sport or 'Tennis') or SPORTS["Tennis"])
+                except ValueError:
+                    continue
+                cur.execute("UPDATE chapters SET config = %s WHERE id = %s", (json.dumps(config), chapter_id))
+            conn.commit()
+    finally:
+        conn.close()
+    return schema_version
+
+try:
+    init_db(SCHEMA_VERSION)
+except Exception as e:
+    st.error(f"Database Initialization Error: {e}")
+
+def send_email(to_email, admin_name, chapter_name, admin_password):
+    # Ensure secrets are available
+    smtp_server = st.secrets.get("SMTP_SERVER", "smtp.gmail.com")
+    smtp_port = st.secrets.get("SMTP_PORT", 587)
+    smtp_user = st.secrets.get("SMTP_USER")
+    smtp_pass = st.secrets.get("SMTP_PASS")
+
+    if not all([smtp_user, smtp_pass]):
+        st.warning("SMTP credentials not configured. Email not sent.")
+        return False
+
+    msg = MIMEMultipart()
+    msg['From'] = smtp_user
+    msg['To'] = to_email
+    msg['Subject'] = f"Welcome to Patch Moint - {chapter_name}"
+
+    body = f"""Hi {admin_name},
+
+Welcome to the Patch Moint League system! Your chapter '{chapter_name}' has been created successfully.
+
+Your Admin Password is: {admin_password}
+
+You can use this password to access the Chapter Settings and manage your players and matches.
+
+Best regards,
+The Patch Moint Team"""
+    msg.attach(MIMEText(body, 'plain'))
+
+    try:
+        server = smtplib.SMTP(smtp_server, smtp_port)
+        server.starttls()
+        server.login(smtp_user, smtp_pass)
+        server.send_message(msg)
+        server.quit()
+        return True
+    except Exception as e:
+        st.error(f"Failed to send email: {e}")
+        return False
+
+# Fonts, base rules, match cards and the sport's theme, built once per process (see patchmoint.styles)
+st.html(stylesheet(SPORT.theme))
+
+# --- Constants ---
+PLAYERS_TABLE = "players"
+MATCHES_TABLE = "matches"
+BOOKINGS_TABLE = "bookings"
+RECORDS_TABLE = "player_records"
+AVAILABILITY_TABLE = "availability"
+# Generic avatar placeholder (SVG base64) similar to WhatsApp default
+#DEFAULT_AVATAR = "data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHZpZXdCb3g9IjAgMCAyNCAyNCI+PGNpcmNsZSBjeD0iMTIiIGN5PSIxMiIgcj0iMTIiIGZpbGw9IiNFMEUwRTAiLz48cGF0aCBkPSZNMTIgMTJjMi4yMSAwIDQtMS43OSA0LTRzLTEuNzktNC00LTQtNCAxLjc5LTQgNCAxLjc5IDQgNCA0em0wIDJjLTIuNjcgMC04IDEuMzQtOCA0djJoMTZ2LTJjMC0yLjY2LTUuMzMtNC04LTR6IiBmaWxsPSIjRkZGRkZGIi8+PC9zdmc+"
+
+# --- Session State Init ---
+if 'current_chapter' not in st.session_state:
+    st.session_state.current_chapter = None
+
+# Handle Direct URL Chapter Selection
+if st.session_state.current_chapter is None and "chapter" in st.query_params:
+    chapter_id = st.query_params["chapter"]
+    try:
+        # The whole chapter in one round trip: after the rerun its first paint is served from the cache
+        chapter_rows = context.load(chapter_id, get_connection)["chapters"]
+        row = chapter_rows.iloc[0] if not chapter_rows.empty else None
+        if row is not None:
+            # Open the chapter in its own sport (legacy chapters without one are Tennis)
+            chapter_sport = get_sport(row['sport'] if pd.notna(row['sport']) else 'Tennis')
+            if chapter_sport:
+                st.session_state.sport_type = chapter_sport.name
+                if "sport" in st.query_params: st.query_params["sport"] = chapter_sport.name.lower()
+            st.session_state.current_chapter = {'id': row['id'], 'name': row['name']}
+            st.session_state.chapter_config = canonical_config(row['config'], chapter_sport or SPORTS["Tennis"])[0]
+            st.session_state.is_admin = False
+            st.session_state.can_write = False
+            st.rerun()
+    except: pass
+if 'is_admin' not in st.session_state:
+    st.session_state.is_admin = False
+if 'can_write' not in st.session_state:
+    st.session_state.can_write = False
+if 'is_master_admin' not in st.session_state:
+    st.session_state.is_master_admin = False
+if 'chapter_config' not in st.session_state:
+    st.session_state.chapter_config = {}
+if 'temp_selected_chapter' not in st.session_state:
+    st.session_state.temp_selected_chapter = None
+if 'logged_in_player' not in st.session_state:
+    st.session_state.logged_in_player = None
+
+# Stats DFs
+if 'players_df' not in st.session_state:
+    st.session_state.players_df = pd.DataFrame(columns=["name", "profile_image_url", "birthday", "chapter_id", "password", "gender"])
+if 'matches_df' not in st.session_state:
+    st.session_state.matches_df = pd.DataFrame(columns=["match_id", "date", "match_type", "team1_player1", "team1_player2", "team2_player1", "team2_player2", "set1", "set2", "set3", "winner", "match_image_url", "chapter_id"])
+if 'bookings_df' not in st.session_state:
+    st.session_state.bookings_df = pd.DataFrame(columns=["booking_id", "date", "time", "match_type", "court_name", "player1", "player2", "player3", "player4", "screenshot_url", "chapter_id"])
+if 'availability_df' not in st.session_state:
+    st.session_state.availability_df = pd.DataFrame(columns=["id", "player_name", "date", "comment", "chapter_id"])
+if 'form_key_suffix' not in st.session_state:
+    st.session_state.form_key_suffix = 0
+if 'match_post_key' not in st.session_state:
+    st.session_state.match_post_key = 0
+
+# --- Helper Functions ---
+
+@st.cache_resource
+def get_sqlalchemy_engine():
+    db_url = st.secrets["NEON_DATABASE_URL"]
+    if db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url, connect_args={"connection_factory": db.TracedConnection})
+
+def fetch_data(table_name, chapter_id=None):
+    try:
+        engine = get_sqlalchemy_engine()
+        query = f"SELECT * FROM {table_name}"
+        params = {}
+        conditions = []
+        if chapter_id:
+            conditions.append("chapter_id = :chapter_id")
+            params = {"chapter_id": chapter_id}
+        # Archived seasons stay in the table but out of the live working set
+        if table_name == "matches":
+            conditions.append("season_id IS NULL")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        with tracing.span(f"fetch_data {table_name}", tracing.DB), engine.connect() as conn:
+            df = pd.read_sql_query(text(query), conn, params=params)
+
+        # Ensure columns exist if empty
+        if df.empty and table_name in ("players", "matches", "bookings"):
+            return pd.DataFrame(columns=context.EMPTY_COLUMNS[table_name])
+        return df
+    except Exception as e:
+        return pd.DataFrame()
+
+def shared_frames(chapter_id, tables=context.TABLES):
+    """The chapter's ``tables`` through the process-wide cache, whatever it misses in one query.
+
+    Every session watching the chapter reuses the frames until a write
+    helper bumps their version; each gets a copy-on-write view of them.
+    See patchmoint.context and patchmoint.framecache.
+    """
+    def connect():
+        tracing.cache_miss()
+        return get_connection()
+
+    with tracing.cached(f"shared {', '.join(tables)}"):
+        try:
+            frames = context.load(chapter_id, connect, tables)
+        except Exception:
+            # As fetch_data: a column-less frame on errors (never cached)
+            return {table: pd.DataFrame() for table in tables}
+    return {table: frame.copy(deep=False) for table, frame in frames.items()}
+
+def shared_frame(table_name, chapter_id):
+    if not chapter_id:
+        return fetch_data(table_name, chapter_id)
+    return shared_frames(chapter_id, (table_name,))[table_name]
+
+def load_players():
+    cid = st.session_state.current_chapter['id'] if st.session_state.current_chapter else None
+    st.session_state.players_df = shared_frame("players", cid)
+
+def save_players(df):
+    cid = st.session_state.current_chapter['id']
+    if cid and not df.empty:
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                # Sync: Delete all for chapter and re-insert
+                cur.execute("DELETE FROM players WHERE chapter_id = %s", (cid,))
+                
+                # Convert NaN to None for SQL compatibility
+                df_clean = df.where(pd.notnull(df), None)
+                records = [tuple(x) for x in df_clean.to_numpy()]
+                cols = ",".join(list(df.columns))
+                
+                if records:
+                    query = f"INSERT INTO players ({cols}) VALUES %s"
+                    execute_values(cur, query, records)
+            commit_changes(conn, cid, "players")
+        except Exception as e:
+            st.error(f"Save error: {e}")
+        finally:
+            conn.close()
+
+def update_player_password(player_name, new_pass, chapter_id=None):
+    try:
+        cid = chapter_id if chapter_id else st.session_state.current_chapter['id']
+        conn = get_connection()
+        with conn.cursor() as cur:
+            cur.execute("UPDATE players SET password = %s WHERE name = %s AND chapter_id = %s", (new_pass, player_name, cid))
+        commit_changes(conn, cid, "players")
+        conn.close()
+        
+        if 'players_df' in st.session_state and not st.session_state.players_df.empty:
+            idx = st.session_state.players_df[st.session_state.players_df['name'] == player_name].index
+            if not idx.empty:
+                st.session_state.players_df.loc[idx, 'password'] = new_pass
+        return True
+    except Exception as e:
+        return False
+
+def update_chapter_admin_password(chapter_id, new_pass):
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            cur.execute("UPDATE chapters SET admin_password = %s WHERE id = %s", (new_pass, chapter_id))
+        conn.commit()
+        conn.close()
+        return True
+    except: return False
+
+SEASON_STANDINGS_COLUMNS = ["Rank", "Player", "Elo", "Points", "Matches", "Wins", "Losses", "Win %"]
+
+def archive_season(chapter_id, rank_df, season_name):
+    """Close the live season: seed the next one's ratings, archive its matches, clear bookings."""
+    season_id = str(uuid.uuid4())
+    standings = rank_df[SEASON_STANDINGS_COLUMNS + [SPORT.score_key]].to_json(orient="records") if rank_df is not None and not rank_df.empty else "[]"
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            # 1. Seed initial_utr with the current sport rating, in one statement (keeping the seeds this season started from)
+            cur.execute("SELECT COALESCE(jsonb_object_agg(name, initial_utr) FILTER (WHERE initial_utr IS NOT NULL), '{}') "
+                        "FROM players WHERE chapter_id = %s", (chapter_id,))
+            started_from = cur.fetchone()[0]
+            if rank_df is not None and not rank_df.empty:
+                seeds = [(row['Player'], float(row.get(SPORT.score_key, SPORT.rating.default)), chapter_id) for _, row in rank_df.iterrows()]
+                execute_values(cur, "UPDATE players AS p SET initial_utr = v.rating FROM (VALUES %s) AS v(name, rating, chapter_id) "
+                                    "WHERE p.name = v.name AND p.chapter_id = v.chapter_id", seeds, template="(%s, %s::numeric, %s)")
+
+            # 2. Archive the season's matches: they keep their rows but leave the live set
+            cur.execute("UPDATE matches SET season_id = %s WHERE chapter_id = %s AND season_id IS NULL", (season_id, chapter_id))
+            cur.execute("INSERT INTO seasons (season_id, chapter_id, name, started, ended, archived_at, matches, standings, seeds) "
+                        "SELECT %s, %s, %s, MIN(date), MAX(date), %s, COUNT(*), %s, %s FROM matches WHERE season_id = %s",
+                        (season_id, chapter_id, season_name, datetime.now().strftime('%Y-%m-%d %H:%M'), standings,
+                         json.dumps(started_from), season_id))
+
+            # 3. Delete bookings
+            cur.execute("DELETE FROM bookings WHERE chapter_id = %s", (chapter_id,))
+            
+        commit_changes(conn, chapter_id, "players", "matches", BOOKINGS_TABLE)
+        conn.close()
+        return True
+    except Exception as e:
+        st.error(f"Error archiving season: {e}")
+        return False
+
+@tracing.traced(kind=tracing.DB)
+def load_seasons(chapter_id):
+    """The chapter's archived seasons, newest first."""
+    try:
+        engine = get_sqlalchemy_engine()
+        with engine.connect() as conn:
+            return pd.read_sql_query(text("SELECT * FROM seasons WHERE chapter_id = :chapter_id ORDER BY archived_at DESC"),
+                                     conn, params={"chapter_id": chapter_id})
+    except Exception:
+        return pd.DataFrame()
+
+@tracing.traced(kind=tracing.DB)
+def load_season_matches(season_id):
+    try:
+        engine = get_sqlalchemy_engine()
+        with engine.connect() as conn:
+            return pd.read_sql_query(text("SELECT * FROM matches WHERE season_id = :season_id ORDER BY date DESC"),
+                                     conn, params={"season_id": season_id})
+    except Exception:
+        return pd.DataFrame()
+
+def get_league_data_zip(chapter_id):
+    try:
+        conn = get_connection()
+        data = {}
+        tables = ["players", "matches", "bookings", "courts", "join_requests"]
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            for table in tables:
+                try:
+                    cur.execute(f"SELECT * FROM {table} WHERE chapter_id = %s", (chapter_id,))
+                    data[table] = cur.fetchall()
+                except: continue
+            
+            cur.execute("SELECT * FROM chapters WHERE id = %s", (chapter_id,))
+            data['chapter'] = cur.fetchall()
+        conn.close()
+
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            for table, rows in data.items():
+                if rows:
+                    df = pd.DataFrame(rows)
+                    csv_data = df.to_csv(index=False)
+                    zf.writestr(f"{table}.csv", csv_data)
+        
+        buf.seek(0)
+        return buf
+    except Exception as e:
+        st.error(f"Error downloading league data: {e}")
+        return None
+
+def load_matches():
+    cid = st.session_state.current_chapter['id'] if st.session_state.current_chapter else None
+    st.session_state.matches_df = shared_frame("matches", cid)
+
+def save_matches(df):
+    """Insert the current chapter's rows of ``df``; returns whether they were stored."""
+    if df.empty:
+        return False
+
+    # Filter for only the current chapter to be safe
+    # Correctly access the 'id' from the current_chapter dictionary
+    chapter_id = st.session_state.current_chapter['id']
+    df = df[df['chapter_id'] == chapter_id]
+    
+    if df.empty:
+        return False
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            insert_matches(cur, df, chapter_id)
+            commit_changes(conn, chapter_id, "matches")
+        return True
+    except Exception as e:
+        st.error(f"Error saving matches: {e}")
+        return False
+    finally:
+        conn.close()
+
+def insert_matches(cur, df, chapter_id):
+    # OPTION 1: Safe Insert (Append Only)
+    # This SQL statement inserts rows but does nothing if a row with the same ID already exists.
+    # This prevents duplicates without needing to delete anything.
+    
+    # Prepare the data for insertion
+    data_tuples = []
+    for _, row in df.iterrows():
+        # Ensure we handle NaN/None correctly for SQL
+        t1p2 = row.get('team1_player2')
+        t2p2 = row.get('team2_player2')
+        t1p2 = t1p2 if pd.notna(t1p2) and t1p2 else None
+        t2p2 = t2p2 if pd.notna(t2p2) and t2p2 else None
+
+        # Map to correct table columns: set1, set2, set3, match_image_url
+        data_tuples.append((
+            str(row['match_id']),
+            row['date'],
+            row['match_type'],
+            row['team1_player1'],
+            t1p2,
+            row['team2_player1'],
+            t2p2,
+            row.get('set1'),
+            row.get('set2'),
+            row.get('set3'),
+            row['winner'],
+            row.get('match_image_url'),
+            chapter_id
+        ))
+
+    # Correct SQL Query matching table schema
+    query = """
+        INSERT INTO matches (
+            match_id, date, match_type, 
+            team1_player1, team1_player2, 
+            team2_player1, team2_player2, 
+            set1, set2, set3, 
+            winner, match_image_url, chapter_id
+        ) VALUES %s
+        ON CONFLICT DO NOTHING;
+    """
+    
+    execute_values(cur, query, data_tuples)
+
+def save_bulk_results(matches_df, new_players):
+    """Insert a batch of results, and the players it adds to the roster, in one transaction.
+
+    Returns the new players' passwords; raises (having saved nothing) on errors.
+    """
+    cid = st.session_state.current_chapter['id']
+    passwords = {name: uuid.uuid4().hex[:8] for name in new_players}
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if passwords:
+                execute_values(cur, "INSERT INTO players (name, profile_image_url, birthday, chapter_id, password, gender) VALUES %s",
+                               [(name, "", "", cid, pw, None) for name, pw in passwords.items()])
+            insert_matches(cur, matches_df, cid)
+        commit_changes(conn, cid, *(["players"] if passwords else []), "matches")
+    finally:
+        conn.close()
+    return passwords
+
+def delete_match_from_db(match_id):
+    try:
+        cid = st.session_state.current_chapter['id']
+        conn = get_connection()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM matches WHERE match_id = %s AND chapter_id = %s", (match_id, cid))
+        commit_changes(conn, cid, "matches")
+        conn.close()
+        if "matches_df" in st.session_state:
+            st.session_state.matches_df = st.session_state.matches_df[st.session_state.matches_df["match_id"] != match_id]
+        # The Hall of Fame may have counted the match
+        rebuild_records(cid)
+        st.success(f"Match {match_id} deleted locally.")
+    except Exception as e: st.error(f"Error: {e}")
+
+def delete_player_from_db(player_name):
+    try:
+        cid = st.session_state.current_chapter['id']
+        conn = get_connection()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM players WHERE name = %s AND chapter_id = %s", (player_name, cid))
+        commit_changes(conn, cid, "players")
+        conn.close()
+    except Exception as e: st.error(f"Error: {e}")
+
+def delete_chapter_fully(chapter_id):
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            for t in ["players", "matches", "bookings", "courts", "player_records", "seasons"]:
+                cur.execute(f"DELETE FROM {t} WHERE chapter_id = %s", (chapter_id,))
+            cur.execute("DELETE FROM chapters WHERE id = %s", (chapter_id,))
+        commit_changes(conn, chapter_id, "chapters", "players", "matches", BOOKINGS_TABLE, "courts", RECORDS_TABLE)
+        conn.close()
+        return True
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return False
+
+def get_default_config(location=DEFAULT_LOCATION):
+    return default_config(SPORT, location)
+
+def _fetch_chapter_config(chapter_id):
+    chapter_rows = shared_frame("chapters", chapter_id)
+    if len(chapter_rows.columns) == 0:
+        return None
+    row = chapter_rows.iloc[0] if not chapter_rows.empty else {}
+    raw = row.get('config')
+    if isinstance(raw, (dict, str)) and raw:
+        # init_db stored it in canonical form: this only migrates configs written by older code since,
+        # for the chapter's own sport as init_db does (not the session's)
+        sport = get_sport(row.get('sport') or 'Tennis') or SPORTS["Tennis"]
+        return canonical_config(raw, sport)[0]
+    return get_default_config()
+
+def load_chapter_config(chapter_id):
+    """The chapter's config, cached per process until the chapter row changes (see patchmoint.framecache)."""
+    # Errors fall back to the defaults but are not cached
+    config, _ = framecache.get(chapter_id, "chapters", lambda: _fetch_chapter_config(chapter_id),
+                               lambda conf: conf is not None, name="config")
+    # Sessions edit their config in place: hand each one its own
+    return copy.deepcopy(config) if config is not None else get_default_config()
+
+def save_chapter_config(chapter_id, config_dict):
+    config_dict = {**config_dict, "schema_version": CONFIG_SCHEMA_VERSION}
+    conn = get_connection()
+    with conn.cursor() as cur:
+        cur.execute("UPDATE chapters SET config = %s WHERE id = %s", (json.dumps(config_dict), chapter_id))
+    commit_changes(conn, chapter_id, "chapters")
+    conn.close()
+    st.session_state.chapter_config = config_dict
+
+def save_remote_image(uploaded_file, file_id, image_type="match"):
+    if uploaded_file is None: return ""
+    
+    # GitHub Config
+    token = st.secrets.get("GITHUB_TOKEN")
+    repo = st.secrets.get("GITHUB_REPO")
+    branch = st.secrets.get("GITHUB_BRANCH", "main")
+    
+    if not token or not repo:
+        st.error("GitHub secrets missing. Please check your secrets.toml file.")
+        return ""
+
+    # Clean file extension
+    file_ext = uploaded_file.name.split('.')[-1] if '.' in uploaded_file.name else 'jpg'
+    file_path = f"assets/{image_type}s/{file_id}.{file_ext}" # e.g. assets/matches/123.jpg
+    
+    # API URL
+    url = f"https://api.github.com/repos/{repo}/contents/{file_path}"
+    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
+    
+    # Check if exists to get SHA for update
+    r = requests.get(url, headers=headers)
+    sha = r.json().get("sha") if r.status_code == 200 else None
+    
+    # Encode content
+    try:
+        content_b64 = base64.b64encode(uploaded_file.getvalue()).decode("utf-8")
+        data = {
+            "message": f"Upload {file_path}",
+            "content": content_b64,
+            "branch": branch
+        }
+        if sha: data["sha"] = sha
+        
+        # Upload
+        resp = requests.put(url, headers=headers, json=data)
+        
+        if resp.status_code in [200, 201]:
+            st.toast(f"Image uploaded successfully!", icon="✅")
+            # Return raw URL (MUST BE PUBLIC REPO)
+            return f"https://raw.githubusercontent.com/{repo}/{branch}/{file_path}"
+        else:
+            st.error(f"GitHub Upload Failed ({resp.status_code}): {resp.json().get('message')}")
+            return ""
+    except Exception as e:
+        st.error(f"Upload Logic Error: {e}")
+        return ""
+
+def render_footer():
+    # Icons for Tennis, Pickleball, Padel
+    logo_base_url = "https://raw.githubusercontent.com/mahadevbk/patchmointtennis/main/assets/sportlogos/"
+
+    # Each icon switches this session to that sport's league
+    links_html = "".join(
+        f'<a href="?sport={name.lower()}" target="_self" title="{name}">'
+        f'<img src="{logo_base_url}{name.lower()}-{"on" if name == SPORT_TYPE else "off"}.png" width="30"></a>'
+        for name in SPORTS
+    )
+
+    st.markdown(f"""
+    <div style="text-align: center; margin-top: 30px; border-top: 1px solid rgba(255,255,255,0.1); padding-top: 20px;">
+        <div style="display: flex; justify-content: center; gap: 20px; margin-bottom: 15px;">
+            {links_html}
+        </div>
+        <div style="color: #ccff00; font-size: 0.8em;">Patch Moint League system is free and Open source. Hosted on GitHub and Powered by Streamlit.</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_performance_panel():
+    """Admin-only timings of the current rerun, collected by patchmoint.tracing."""
+    with st.expander("Performance", expanded=False, icon="⏱️"):
+        st.toggle("Collect timings", key="perf_trace", help="Times database calls, cache lookups, ranking computation and each tab from the next rerun on.")
+        trace = tracing.current()
+        if trace is None:
+            st.caption("Timings are off. Switch them on and interact with the app to see where a rerun spends its time.")
+            return
+        summary = trace.summary()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Rerun so far", f"{summary['total'] * 1000:.0f} ms")
+        c2.metric("SQL statements", summary['queries'], help=f"{trace.counters['connections']} new connections")
+        c3.metric("Cache hits", summary['cache_hits'])
+        c4.metric("Cache misses", summary['cache_misses'])
+        shared = framecache.stats()
+        st.caption(f"Shared chapter frames (all sessions): {shared['frames']} cached, {shared['hits']} hits, {shared['misses']} loads")
+        if not shared['serving']:
+            st.warning(f"Shared chapter frames are off: {listener.error or 'the change listener is still connecting'}.")
+        if sharedcache.enabled():
+            remote = sharedcache.stats()
+            st.caption(f"Replica cache (this process): {remote['hits']} hits, {remote['misses']} misses, {remote['errors']} errors")
+        fragments = fragment_stats()
+        st.caption(f"HTML fragments (all sessions): {fragments['cards']} cached, {fragments['hits']} reused, {fragments['misses']} built")
+        st.dataframe(pd.DataFrame([
+            {"Kind": kind, "Spans": summary['count_by_kind'][kind], "Time (ms)": round(seconds * 1000, 1)}
+            for kind, seconds in sorted(summary['time_by_kind'].items(), key=lambda kv: -kv[1])
+        ]), hide_index=True, width='stretch')
+        st.markdown("**Slowest spans**")
+        st.dataframe(pd.DataFrame([
+            {"Span": "· " * s.depth + s.name, "Kind": s.kind, "Time (ms)": round(s.duration * 1000, 1), "Started at (ms)": round(s.start * 1000, 1)}
+            for s in trace.slowest()
+        ]), hide_index=True, width='stretch')
+
+def render_query_log():
+    """Master admin view of patchmoint.db's query log, grouped by statement fingerprint."""
+    log = db.entries()
+    slow = [e for e in log if e['slow']]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Statements logged", len(log))
+    c2.metric(f"Slower than {db.slow_threshold_ms():.0f} ms", len(slow))
+    c3.metric("Errors", sum(1 for e in log if e['error']))
+    if not log:
+        st.info("No statements logged since the app started.")
+        return
+
+    st.markdown("**By statement** (most total time first; many calls of one statement per page view usually means an N+1 loop)")
+    grouped = pd.DataFrame(db.summary(log))
+    st.dataframe(grouped[['fingerprint', 'calls', 'total_ms', 'mean_ms', 'max_ms', 'rows', 'slow', 'errors']].round(1),
+                 hide_index=True, width='stretch',
+                 column_config={"fingerprint": st.column_config.TextColumn("Statement", width="large")})
+
+    st.markdown("**Slow statements**")
+    if not slow: st.caption("None yet.")
+    for e in reversed(slow[-20:]):
+        with st.expander(f"{e['duration_ms']:.0f} ms · {e['rows']} rows · {e['time']} · {e['fingerprint'][:70]}", expanded=False, icon="➡️"):
+            st.code(e['fingerprint'], language="sql")
+            if e['params']: st.caption(f"Parameters: {e['params']}")
+            if e['plan']: st.code(e['plan'], language="text")
+
+    if st.button("Clear Query Log"):
+        db.clear()
+        st.rerun()
+
+@tracing.traced("radar_chart", tracing.RENDER)
+def create_radar_chart(row):
+    """Interactive plotly radar; the cards use the static ``radar_svg`` and build this on demand."""
+    try:
+        fig = go.Figure()
+        fig.add_trace(go.Scatterpolar(r=list(radar_metrics(row)), theta=list(RADAR_CATEGORIES), fill='toself', name=row['Player'],
+            line=dict(color='#CCFF00'), fillcolor='rgba(204, 255, 0, 0.3)'))
+        fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100], showticklabels=False, linecolor='rgba(255,255,255,0.3)'),
+                angularaxis=dict(tickfont=dict(size=10, color='#aaa')), bgcolor='rgba(0,0,0,0)'),
+            paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=30, t=20, b=20), height=220, showlegend=False)
+        return fig
+    except: return None
+
+def render_radar(row, key):
+    """Static SVG radar for a ranking card; the plotly version only when the player's toggle is on."""
+    chart = st.container()
+    if st.toggle("Interactive", key=f"{key}_interactive"):
+        chart.plotly_chart(create_radar_chart(row), width='stretch', config={'displayModeBar': False}, key=key)
+    else:
+        chart.markdown(radar_svg(radar_metrics(row)), unsafe_allow_html=True)
+
+@st.dialog("Chapter Login")
+def login_modal(chapter):
+    st.subheader(f"Accessing: {chapter['name']}")
+    
+    # Use a unique key for the input inside the modal
+    pwd = st.text_input("Enter Password", type="password", key=f"login_pwd_{chapter['id']}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Login", use_container_width=True):
+            # Check for Master Admin
+            if pwd == st.secrets.get("MASTER_PASSWORD"):
+                st.session_state.current_chapter = chapter
+                st.session_state.is_master_admin = True
+                st.session_state.is_admin = True
+                st.session_state.can_write = True
+                st.rerun()
+            # Check for Chapter Admin
+            elif pwd == chapter.get('admin_password'):
+                st.session_state.current_chapter = chapter
+                st.session_state.is_admin = True
+                st.session_state.can_write = True
+                st.rerun()
+            # Check for Player password
+            else:
+                chapter_players_df = fetch_data("players", chapter_id=chapter['id'])
+                player_match = chapter_players_df[chapter_players_df['password'] == pwd]
+                if not player_match.empty:
+                    player_row = player_match.iloc[0]
+                    player_name = player_row['name']
+                    is_player_admin = player_row.get('is_admin', False)
+
+                    st.session_state.current_chapter = chapter
+                    st.session_state.is_admin = is_player_admin
+                    st.session_state.can_write = True 
+                    st.session_state.logged_in_player = player_name
+                    st.session_state.chapter_config = load_chapter_config(chapter['id'])
+                    
+                    if is_player_admin:
+                        st.success(f"Welcome Admin {player_name}!")
+                    else:
+                        st.success(f"Welcome {player_name}!")
+                    time.sleep(0.5); st.rerun()
+                else:
+                    st.error("Invalid Password")
+    with col2:
+        # Standard user entry (No password needed to view)
+        if st.button("View as Guest", use_container_width=True):
+            st.session_state.current_chapter = chapter
+            st.session_state.is_admin = False
+            st.session_state.can_write = False
+            st.rerun()
+            
+# --- Business Logic ---
+def get_valid_scores():
+    return SPORT.get_valid_scores()
+
+def generate_match_id(matches_df, match_datetime):
+    year = match_datetime.year
+    month = match_datetime.month
+    quarter = f"Q{(month-1)//3 + 1}"
+    if not matches_df.empty:
+        dates = pd.to_datetime(matches_df['date'], errors='coerce')
+        mask = (dates.dt.year == year) & ((dates.dt.month-1)//3 + 1 == (month-1)//3 + 1)
+        serial = mask.sum() + 1
+    else: serial = 1
+    while True:
+        new_id = f"MMD{quarter}{year}-{serial:02d}"
+        if matches_df.empty or new_id not in matches_df['match_id'].values: return new_id
+        serial += 1
+
+@st.cache_data(show_spinner=False)
+def _cached_rankings(matches_to_rank, players_df, config, sport_name, today):
+    """(ranking table, rating history) of one replay, cached per version of the data."""
+    tracing.cache_miss()
+    return sharedcache.memo("rankings", lambda: rank_with_history(matches_to_rank, players_df, config, SPORTS[sport_name],
+                                                                  today=datetime.combine(today, datetime.min.time())),
+                            matches_to_rank, players_df, config, sport_name, today)
+
+def _rankings_and_history(matches_to_rank):
+    # Players, config and sport are explicit arguments so they are part of the cache key
+    with tracing.cached("rankings"):
+        return _cached_rankings(matches_to_rank, st.session_state.players_df, st.session_state.chapter_config,
+                                SPORT_TYPE, datetime.now().date())
+
+def calculate_rankings(matches_to_rank):
+    return _rankings_and_history(matches_to_rank)[0]
+
+def get_rating_history(matches_to_rank):
+    """The rating history log of the same (cached) replay as ``calculate_rankings``."""
+    return _rankings_and_history(matches_to_rank)[1]
+
+@st.cache_data(show_spinner=False)
+def _cached_pairs(matches_df, players_df, config, sport_name):
+    tracing.cache_miss()
+    return sharedcache.memo("pairs", lambda: build_pairs(matches_df, players_df, config, SPORTS[sport_name]),
+                            matches_df, players_df, config, sport_name)
+
+def get_pairs():
+    """Head-to-head and partner tables of the chapter, built once per version of the data."""
+    with tracing.cached("pairs"):
+        return _cached_pairs(st.session_state.matches_df, st.session_state.players_df, st.session_state.chapter_config, SPORT_TYPE)
+
+@st.cache_data(show_spinner=False)
+def _cached_season_outlook(standings, fixtures, match_type_settings, system, simulations):
+    tracing.cache_miss()
+    return sharedcache.memo("season outlook", lambda: simulate_season(standings, fixtures, match_type_settings, system, simulations),
+                            standings, fixtures, match_type_settings, system, simulations)
+
+def season_outlook(standings, fixtures, system, simulations):
+    """Finishing-position odds after ``fixtures``, simulated once per standings and fixture list."""
+    with tracing.cached("season outlook"):
+        return _cached_season_outlook(standings[["Player", "Elo", "Points"]], fixtures,
+                                      st.session_state.chapter_config.get("match_type_settings", {}), system, simulations)
+
+def plot_rating_trajectory(players, system):
+    history = get_rating_history(st.session_state.matches_df)
+    trajectory = rating_trajectory(history, players, system)
+    if trajectory.empty: return None
+    fig = px.line(trajectory, x="match", y="rating", color="player", hover_data=["date", "delta"], markers=True,
+                  labels={"match": "Match #", "rating": system, "player": ""})
+    fig.update_traces(hovertemplate="%{y:.2f}<br>%{customdata[0]}<br>Δ %{customdata[1]:+.2f}")
+    fig.update_layout(height=320, margin=dict(l=20, r=20, t=20, b=20), legend=dict(orientation="h", y=-0.2))
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def _cached_game_difference_series(matches_df):
+    """Every player's cumulative game difference, one pass per version of the matches."""
+    tracing.cache_miss()
+    return sharedcache.memo("game difference series", lambda: game_difference_series(matches_df), matches_df)
+
+def plot_player_performance(player_name, matches_df):
+    with tracing.cached("game difference series"):
+        series = _cached_game_difference_series(matches_df)
+    history = performance_history(player_name, series)
+    if not history: return None
+    fig = px.line(history, x="Match", y="Cumulative Game Diff", hover_data=["Date", "Result"], title=f"Trend - {player_name}", markers=True)
+    fig.update_layout(height=300, margin=dict(l=20, r=20, t=40, b=20))
+    return fig
+
+def _styled_name(name):
+    return f"<span style='font-weight:bold; color:#ccff00;'>{name}</span>"
+
+def suggest_balanced_pairing(players, doubles_rank_df):
+    """Suggests balanced doubles teams as (styled pairing text, team 1 odds, team 2 odds)."""
+    if len(players) != 4 or "" in players:
+        return ("Please select all four players for a doubles match.", None, None)
+    if doubles_rank_df.empty:
+        return ("Please select four players with doubles match history.", None, None)
+    best = balanced_pairing(players, doubles_rank_df)
+    if best is None:
+        return ("Could not determine a balanced pairing.", None, None)
+    team1, team2, team1_odds, team2_odds = best
+    pairing_text = f"Team 1: {_styled_name(team1[0])} & {_styled_name(team1[1])} vs Team 2: {_styled_name(team2[0])} & {_styled_name(team2[1])}"
+    return (pairing_text, team1_odds, team2_odds)
+
+def suggest_singles_odds(players, singles_rank_df):
+    """Calculates winning odds for a singles match."""
+    return singles_odds(players, singles_rank_df)
+
+def load_bookings():
+    cid = st.session_state.current_chapter['id'] if st.session_state.current_chapter else None
+    df = shared_frame(BOOKINGS_TABLE, cid)
+    cols = ['booking_id', 'date', 'time', 'match_type', 'court_name', 'player1', 'player2', 'player3', 'player4', 'standby_player', 'screenshot_url', 'chapter_id']
+    for c in cols: 
+        if c not in df.columns: df[c] = None
+    if not df.empty:
+        tz_name = get_chapter_timezone()
+        try: df['dt_combo'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str), format='%Y-%m-%d %H:%M', errors='coerce')
+        except: df['dt_combo'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str), errors='coerce')
+        if isinstance(df['dt_combo'].dtype, pd.DatetimeTZDtype): df['dt_combo'] = df['dt_combo'].dt.tz_convert(tz_name)
+        else: df['dt_combo'] = df['dt_combo'].dt.tz_localize(tz_name, ambiguous='infer')
+        cutoff = pd.Timestamp.now(tz=tz_name) - timedelta(hours=4)
+        expired_ids = df[df['dt_combo'] < cutoff]['booking_id'].tolist()
+        if expired_ids:
+            try:
+                conn = get_connection()
+                with conn.cursor() as cur:
+                    format_strings = ','.join(['%s'] * len(expired_ids))
+                    cur.execute(f"DELETE FROM bookings WHERE booking_id IN ({format_strings}) AND chapter_id = %s", (*expired_ids, cid))
+                commit_changes(conn, cid, BOOKINGS_TABLE)
+                conn.close()
+                df = df[df['dt_combo'] >= cutoff]
+            except: pass
+        df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d'); df = df.fillna("")
+    st.session_state.bookings_df = df[cols]
+
+def save_bookings(df):
+    cid = st.session_state.current_chapter['id']
+    if cid and not df.empty:
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM bookings WHERE chapter_id = %s", (cid,))
+                df_clean = df.where(pd.notnull(df), None)
+                records = [tuple(x) for x in df_clean.to_numpy()]
+                cols = ",".join(list(df.columns))
+                if records:
+                    query = f"INSERT INTO bookings ({cols}) VALUES %s"
+                    execute_values(cur, query, records)
+            commit_changes(conn, cid, BOOKINGS_TABLE)
+        except Exception as e:
+            st.error(f"Save bookings error: {e}")
+        finally:
+            conn.close()
+
+def delete_booking_from_db(booking_id):
+    try:
+        cid = st.session_state.current_chapter['id']
+        conn = get_connection()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM bookings WHERE booking_id = %s AND chapter_id = %s", (booking_id, cid))
+        commit_changes(conn, cid, BOOKINGS_TABLE)
+        conn.close()
+        if "bookings_df" in st.session_state:
+            st.session_state.bookings_df = st.session_state.bookings_df[st.session_state.bookings_df.booking_id != booking_id]
+    except: pass
+
+@tracing.traced(kind=tracing.DB)
+def fetch_records(chapter_id):
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"SELECT {', '.join(RECORD_COLUMNS)} FROM player_records WHERE chapter_id = %s", (chapter_id,))
+            return {row['player']: dict(row) for row in cur.fetchall()}
+    finally:
+        conn.close()
+
+def load_records(chapter_id):
+    """The chapter's Hall of Fame rows as ``{player: row}``, shared by every session until ``save_records`` bumps them."""
+    def load():
+        tracing.cache_miss()
+        return fetch_records(chapter_id)
+
+    with tracing.cached("records"):
+        records, _ = framecache.get(chapter_id, RECORDS_TABLE, load)
+    # Callers fold matches into the rows: hand out copies
+    return {player: dict(row) for player, row in records.items()}
+
+@tracing.traced(kind=tracing.DB)
+def save_records(chapter_id, rows, replace=False):
+    """Upsert ``rows``; with ``replace`` they become the chapter's only rows."""
+    if not rows and not replace:
+        return
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if replace:
+                cur.execute("DELETE FROM player_records WHERE chapter_id = %s", (chapter_id,))
+            if rows:
+                updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in RECORD_COLUMNS[1:])
+                execute_values(cur, f"INSERT INTO player_records (chapter_id, {', '.join(RECORD_COLUMNS)}) VALUES %s "
+                                    f"ON CONFLICT (chapter_id, player) DO UPDATE SET {updates}",
+                               [(chapter_id, *(r[c] for c in RECORD_COLUMNS)) for r in rows])
+        commit_changes(conn, chapter_id, RECORDS_TABLE)
+    finally:
+        conn.close()
+
+@tracing.traced(kind=tracing.DB)
+def rebuild_records(chapter_id, stored=True):
+    """Replace the chapter's records with ones rebuilt from its whole history, archived seasons first.
+
+    Also their first build (``stored=False``: there are no rows to replace),
+    as a chapter may have archived seasons before it ever showed its Hall of Fame.
+    """
+    with get_sqlalchemy_engine().connect() as conn:
+        history = pd.read_sql_query(text(
+            "SELECT m.* FROM matches m LEFT JOIN seasons s ON s.season_id = m.season_id "
+            "WHERE m.chapter_id = :chapter_id ORDER BY m.season_id IS NULL, s.archived_at, m.date"), conn, params={"chapter_id": chapter_id})
+        seeds = conn.execute(text("SELECT season_id, seeds FROM seasons WHERE chapter_id = :chapter_id AND seeds IS NOT NULL"),
+                             {"chapter_id": chapter_id}).all()
+    records = records_from_history(history, st.session_state.players_df, st.session_state.chapter_config, SPORT,
+                                   {season_id: season_seeds for season_id, season_seeds in seeds})
+    if records or stored:
+        save_records(chapter_id, list(records.values()), replace=True)
+    return records
+
+def record_matches(new_matches_df):
+    """Fold newly posted matches into the Hall of Fame, starting from the current Elo ratings."""
+    cid = st.session_state.current_chapter['id']
+    try:
+        records = load_records(cid)
+        if not records:
+            rebuild_records(cid, stored=False)
+            return
+        # Matches dated before the latest recorded day would fold in out of order: rebuild instead
+        latest = max(str(r['last_day'] or "") for r in records.values())
+        if (new_matches_df['date'].astype(str) < latest).any():
+            rebuild_records(cid)
+            return
+        current = calculate_rankings(st.session_state.matches_df)
+        ratings = dict(zip(current['Player'], current['Elo'])) if not current.empty else {}
+        changed = update_records(records, new_matches_df, st.session_state.players_df, st.session_state.chapter_config, SPORT, ratings)
+        save_records(cid, [records[p] for p in changed])
+    except Exception as e:
+        st.error(f"Error updating Hall of Fame: {e}")
+
+def display_hall_of_fame():
+    st.header("🏆 Hall of Fame")
+    cid = st.session_state.current_chapter['id']
+    try:
+        records = load_records(cid)
+        if not records:
+            records = rebuild_records(cid, stored=False)
+    except Exception as e:
+        st.error(f"Error loading Hall of Fame: {e}")
+        return
+
+    hof = hall_of_fame(pd.DataFrame(list(records.values()), columns=RECORD_COLUMNS))
+    if hof.empty:
+        st.info("No records yet. Post a match to open the Hall of Fame.")
+        return
+    st.caption("All-time chapter records. They are kept across season resets.")
+    cols = st.columns(min(len(hof), 3))
+    for i, rec in enumerate(hof.itertuples()):
+        with cols[i % len(cols)], st.container(border=True):
+            st.metric(rec.Record, rec.Value)
+            st.markdown(f"{_styled_name(rec.Player)}" + (f" · {rec.On}" if rec.On else ""), unsafe_allow_html=True)
+
+def load_courts():
+    courts = shared_frame("courts", st.session_state.current_chapter['id'])
+    return courts[["name", "url"]].to_dict("records") if not courts.empty else []
+
+def add_court_db(name, url):
+    cid = st.session_state.current_chapter['id']
+    conn = get_connection()
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO courts (chapter_id, name, url) VALUES (%s, %s, %s)", (cid, name, url))
+    commit_changes(conn, cid, "courts")
+    conn.close()
+
+def remove_court_db(name):
+    cid = st.session_state.current_chapter['id']
+    conn = get_connection()
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM courts WHERE chapter_id = %s AND name = %s", (cid, name))
+    commit_changes(conn, cid, "courts")
+    conn.close()
+
+@tracing.traced(kind=tracing.DB)
+def load_join_requests(chapter_id):
+    try:
+        engine = get_sqlalchemy_engine()
+        query = "SELECT * FROM join_requests WHERE chapter_id = :chapter_id ORDER BY created_at DESC"
+        with engine.connect() as conn:
+            df = pd.read_sql_query(text(query), conn, params={"chapter_id": chapter_id})
+        return df
+    except Exception as e:
+        return pd.DataFrame()
+
+def save_join_request(name, message, chapter_id):
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            rid = str(uuid.uuid4())
+            now = datetime.now().isoformat()
+            cur.execute("INSERT INTO join_requests (id, name, message, chapter_id, created_at) VALUES (%s, %s, %s, %s, %s)",
+                        (rid, name, message, chapter_id, now))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        st.error(f"Error saving request: {e}")
+        return False
+
+def delete_join_request_db(request_id):
+    try:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM join_requests WHERE id = %s", (request_id,))
+        conn.commit()
+        conn.close()
+        return True
+    except: return False
+
+@st.dialog("Request to Join")
+def join_request_modal():
+    st.write(f"Send a message to the admin of **{st.session_state.current_chapter['name']}** to request joining this chapter.")
+    name = st.text_input("Your Name")
+    message = st.text_area("Message (optional)")
+    if st.button("Submit Request", type="primary"):
+        if name:
+            if save_join_request(name, message, st.session_state.current_chapter['id']):
+                st.success("Request sent successfully!")
+                time.sleep(2)
+                st.rerun()
+        else:
+            st.warning("Please enter your name.")
+
+# --- CHAPTER SELECTION & LANDING PAGE ---
+def check_chapter_selected():
+    if 'new_chapter_created' in st.session_state: return False
+    if st.session_state.is_master_admin and st.session_state.current_chapter is None: return True
+    if st.session_state.current_chapter is None: return False
+    return True
+
+if not check_chapter_selected():
+    if 'new_chapter_created' in st.session_state:
+        st.balloons()
+        st.success(f"Chapter '{st.session_state.new_chapter_created['name']}' Created Successfully!")
+        st.info(f"**ADMIN PASSWORD:** `{st.session_state.new_chapter_created['password']}`")
+        st.warning("Please copy this password now. It will not be shown again.")
+        st.divider()
+        st.subheader("⚙️ Initial Chapter Setup")
+        with st.form("initial_setup_form"):
+            st.subheader("Ranking Systems")
+            ranking_systems = {}
+            for rs in ["Elo (Hybrid)", "Points", RATING_NAME]:
+                ranking_systems[rs] = st.toggle(rs, value=(rs == "Elo (Hybrid)"))
+
+            st.subheader("Match Type Settings")
+            match_type_settings = {}
+            set_options = ["Single Set", "Best of 3", "Best of 5"]
+            
+            for mt in ["Singles", "Doubles", "Mixed Doubles"]:
+                st.markdown(f"**{mt}**")
+                cols = st.columns([1, 1, 1, 2])
+                enabled = cols[0].checkbox("Enabled", value=(mt in ["Singles", "Doubles"]), key=f"en_{mt}")
+                win_points = cols[1].number_input("Win Pts", value=2, min_value=0, key=f"wp_{mt}")
+                loss_points = cols[2].number_input("Loss Pts", value=1, min_value=0, key=f"lp_{mt}")
+                min_sets = cols[3].selectbox("Min Sets", options=set_options, index=1, key=f"ms_{mt}")
+                match_type_settings[mt] = {
+                    "enabled": enabled,
+                    "win_points": win_points,
+                    "loss_points": loss_points,
+                    "min_sets": min_sets
+                }
+
+            if st.form_submit_button("Save Settings & Enter Chapter", type="primary"):
+                new_conf = {
+                    "ranking_systems": ranking_systems,
+                    "match_type_settings": match_type_settings,
+                    "match_image_required": True # Default value
+                }
+                cid = st.session_state.new_chapter_created['id']
+                save_chapter_config(cid, new_conf)
+                st.session_state.current_chapter = {'id': cid, 'name': st.session_state.new_chapter_created['name']}
+                st.session_state.chapter_config = new_conf
+                st.session_state.is_admin = True
+                st.session_state.can_write = True
+                del st.session_state.new_chapter_created
+                st.rerun()
+    else:
+        # Use the LOGO_URL directly
+        st.markdown(f'<div style="text-align: left;"><img src="{LOGO_URL}" style="height:150px; margin-bottom: 10px;"></div>', unsafe_allow_html=True)
+        
+        st.header(f"Create & Manage your own {SPORT_TYPE} league.")
+        st.write(f"""Patch Moint allows Singles, Doubles and Mixed doubles matches with Rankings by Points per match or Elo or {RATING_NAME}. Patch Moint is Free and Open Source.""")
+
+        # --- LOAD CHAPTERS FROM NEON ---
+        try:
+            engine = get_sqlalchemy_engine()
+            with tracing.span("chapter list", tracing.DB), engine.connect() as conn:
+                # Fetch all chapters, players, and matches to calculate stats
+                chap_df = pd.read_sql_query(text("SELECT * FROM chapters"), conn)
+                all_players = pd.read_sql_query(text("SELECT chapter_id FROM players"), conn)
+                # Live seasons only, as the chapters themselves show them
+                all_matches = pd.read_sql_query(text("SELECT chapter_id FROM matches WHERE season_id IS NULL"), conn)
+            
+            player_counts = all_players.groupby('chapter_id').size().to_dict()
+            match_counts = all_matches.groupby('chapter_id').size().to_dict()
+            
+            if 'last_active_date' in chap_df.columns:
+                chap_df['last_active_date'] = pd.to_datetime(chap_df['last_active_date'], errors='coerce')
+                chap_df['last_active_date'] = chap_df['last_active_date'].fillna(pd.Timestamp.min)
+            else:
+                chap_df['last_active_date'] = pd.Timestamp.min # Add column if not exists, fill with min date
+
+            if 'created_at' in chap_df.columns:
+                chap_df['created_at'] = pd.to_datetime(chap_df['created_at'], errors='coerce')
+            else:
+                chap_df['created_at'] = pd.Timestamp.min # Add column if not exists, fill with min date
+
+            chap_df = chap_df.sort_values(by=['last_active_date', 'created_at'], ascending=[False, False])
+
+        except Exception as e:
+            chap_df = pd.DataFrame()
+            player_counts = {}
+            match_counts = {}
+
+        # --- LOGIN FORM (MOVED ABOVE CHAPTERS) ---
+        if st.session_state.temp_selected_chapter:
+            target = st.session_state.temp_selected_chapter
+            st.divider()
+            with st.container(border=True):
+                st.markdown(f"### Login to: {target['name']}")
+                
+                # Fetch players for this chapter to check passwords
+                chapter_players_df = fetch_data("players", chapter_id=target['id'])
+                
+                pw = st.text_input("Password", type="password", key="login_pw")
+                st.caption("Hint: Leave password blank for Guest Login")
+                
+                c1, c2 = st.columns([2,1])
+
+                if c1.button("Login"):
+                    # 1. Check for empty password (Guest)
+                    if not pw:
+                        st.session_state.current_chapter = {'id': target['id'], 'name': target['name']}
+                        st.session_state.is_admin = False
+                        st.session_state.can_write = False # Guests can't write
+                        st.session_state.logged_in_player = None
+                        st.session_state.chapter_config = load_chapter_config(target['id'])
+                        st.session_state.temp_selected_chapter = None
+                        st.info("Guest Login")
+                        time.sleep(0.5); st.rerun()
+
+                    # 2. Check for Admin password
+                    elif pw == target['admin_password']:
+                        st.session_state.current_chapter = {'id': target['id'], 'name': target['name']}
+                        st.session_state.is_admin = True
+                        st.session_state.can_write = True
+                        st.session_state.logged_in_player = None
+                        st.session_state.chapter_config = load_chapter_config(target['id'])
+                        st.session_state.temp_selected_chapter = None
+                        st.success("Admin Login Success")
+                        time.sleep(0.5); st.rerun()
+
+                    # 3. Check for Player password
+                    else:
+                        player_match = chapter_players_df[chapter_players_df['password'] == pw]
+                        if not player_match.empty:
+                            player_row = player_match.iloc[0]
+                            player_name = player_row['name']
+                            is_player_admin = player_row.get('is_admin', False)
+
+                            st.session_state.current_chapter = {'id': target['id'], 'name': target['name']}
+                            st.session_state.is_admin = is_player_admin
+                            st.session_state.can_write = True 
+                            st.session_state.logged_in_player = player_name
+                            st.session_state.chapter_config = load_chapter_config(target['id'])
+                            st.session_state.temp_selected_chapter = None
+                            
+                            if is_player_admin:
+                                st.success(f"Welcome Admin {player_name}!")
+                            else:
+                                st.success(f"Welcome {player_name}!")
+                            time.sleep(0.5); st.rerun()
+                        else:
+                            st.error("Invalid Credentials")
+
+                if c2.button("Cancel Selection"):
+                    st.session_state.temp_selected_chapter = None
+                    st.rerun()
+        
+        # --- ACTIVE CHAPTERS ---
+        if not chap_df.empty:
+            if 'sport' in chap_df.columns:
+                # Filter by sport. Legacy NULLs/empty are treated as 'Tennis' (the original sport)
+                if SPORT_TYPE == "Tennis":
+                    chap_df = chap_df[(chap_df['sport'] == "Tennis") | (chap_df['sport'].isna()) | (chap_df['sport'] == "")]
+                else:
+                    chap_df = chap_df[chap_df['sport'] == SPORT_TYPE]
+            else:
+                # Sport column missing. Outside Tennis, don't show any legacy chapters
+                if SPORT_TYPE != "Tennis":
+                    chap_df = pd.DataFrame()
+
+            if not chap_df.empty:
+                st.subheader("Active Chapters")
+                cols = st.columns(3)
+                
+                # Use enumerate to ensure idx starts at 0 for clean column distribution
+                for i, (idx, row) in enumerate(chap_df.iterrows()):
+                    with cols[i % 3]:
+                        img_container_content = ''
+                        if row.get("title_image_url"):
+                            img_src = get_img_src(row.get("title_image_url"))
+                            img_container_content = f'<img src="{img_src}" style="width:100%">'
+                        
+                        img_html = (
+                            '<div class="card-image-container">'
+                            f'{img_container_content}'
+                            '</div>'
+                        )
+                        
+                        title_html = f'<h3>{row["name"]}</h3>'
+                        num_players = player_counts.get(row['id'], 0)
+                        num_matches = match_counts.get(row['id'], 0)
+                        
+                        try:
+                            config_data = parse_config(row['config'])
+                            chapter_loc = config_data.get('location', DEFAULT_LOCATION)
+                        except:
+                            chapter_loc = DEFAULT_LOCATION
+
+                        stats_html = f'<p style="margin: 10px 0; color: #aaa; font-size: 0.9em;">📍 {chapter_loc}<br>{num_players} players / {num_matches} games</p>'
+                        
+                        card_html = (
+                            '<div class="chapter-card" style="height: auto; min-height: 200px; padding-bottom: 10px;">'
+                            f'{img_html}'
+                            '<div class="card-content">'
+                            f'{title_html}'
+                            f'{stats_html}'
+                            '</div>'
+                            '</div>'
+                        )
+                        
+                        st.markdown(card_html, unsafe_allow_html=True)
+                        
+                        # The button appears immediately under the HTML card
+                        #if st.button("Enter", key=f"ent_{row['id']}", width='stretch'):
+                        #    st.session_state.temp_selected_chapter = row.to_dict()
+                        #    st.rerun()
+
+                        # Locate the block you mentioned and change it to:
+                        if st.button("Enter", key=f"ent_{row['id']}", width='stretch'):
+                            # Instead of setting state and rerunning, open the modal
+                            login_modal(row.to_dict())
+                            
+            else:
+                st.info(f"No active {SPORT_TYPE} chapters found. Create one below!")
+
+                
+        
+        with st.expander("Explore Ranking Systems", expanded=False, icon="➡️"):
+            st.markdown(f"""
+            * **🏆 ELO Hybrid:** Best for highly competitive groups.
+            * **📈 {RATING_NAME} System:** For serious club-level play—the punishing standard.
+            * **🤝 Points Per Game:** For social games where grinders are rewarded!
+            * **🔥 The Trifecta:** Go wild and use all three to measure your tribe.
+            """)
+
+        st.info("🔑 **Note:** Use the admin-provided password to log in to your Chapter.")
+        
+        st.divider()
+        with st.expander("Create New Chapter", expanded=False, icon="➡️"):
+            new_chap_name = st.text_input("New Chapter Name")
+            new_location = st.selectbox("Location", options=list(LOCATION_TIMEZONES.keys()), index=0)
+            new_admin_name = st.text_input("Admin Name")
+            new_admin_email = st.text_input("Admin Email Address")
+            if st.button("Create Chapter"):
+                if new_chap_name and new_admin_name and new_admin_email:
+                    if not chap_df.empty and new_chap_name in chap_df['name'].values:
+                        st.error("Name exists")
+                    else:
+                        nid = str(uuid.uuid4()); npass = str(uuid.uuid4().hex)[:8]
+                        conn = get_connection()
+                        try:
+                            # Try insert, assuming init_db fixed columns
+                            with conn.cursor() as cur:
+                                cur.execute("INSERT INTO chapters (id, name, admin_password, created_at, config, sport, last_active_date, admin_name, admin_email) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                                            (nid, new_chap_name, npass, datetime.now().isoformat(), json.dumps(get_default_config(new_location)), SPORT_TYPE, datetime.now().isoformat(), new_admin_name, new_admin_email))
+                            conn.commit()
+                            conn.close()
+                            
+                            # Send welcome email
+                            if send_email(new_admin_email, new_admin_name, new_chap_name, npass):
+                                st.success(f"Chapter '{new_chap_name}' Created! Admin password sent to {new_admin_email}.")
+                            else:
+                                st.warning(f"Chapter Created, but failed to send email. Admin Password: {npass}")
+                                
+                            st.session_state.new_chapter_created = {'name': new_chap_name, 'id': nid, 'password': npass}
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error creating chapter: {e}")
+                            st.warning("If this persists, please refresh the page to ensure database migrations have run.")
+                else:
+                    st.warning("Please fill in all fields (Name, Admin Name, and Email).")
+        
+        with st.expander("Master Admin Login", expanded=False, icon="➡️"):
+            m_pass = st.text_input("Master Password", type="password", key="ma_pass")
+            if st.button("Login Master") and m_pass == st.secrets.get("madminpwd", "magic1"):
+                st.session_state.is_master_admin = True; st.rerun()
+    render_footer()
+    st.stop()
+
+
+
+def export_full_database():
+    try:
+        engine = get_sqlalchemy_engine()
+        with engine.connect() as conn:
+            # Fetch all data from all tables
+            chapters_df = pd.read_sql_query("SELECT * FROM chapters", conn)
+            players_df = pd.read_sql_query("SELECT * FROM players", conn)
+            matches_df = pd.read_sql_query("SELECT * FROM matches", conn)
+        
+        # Create a buffer to hold the ZIP file
+        zip_buffer = io.BytesIO()
+        
+        with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
+            # Write each dataframe to a CSV inside the ZIP
+            zip_file.writestr("chapters_export.csv", chapters_df.to_csv(index=False))
+            zip_file.writestr("players_export.csv", players_df.to_csv(index=False))
+            zip_file.writestr("matches_export.csv", matches_df.to_csv(index=False))
+            
+        return zip_buffer.getvalue()
+    except Exception as e:
+        st.error(f"Export failed: {e}")
+        return None
+
+
+
+
+# --- MASTER ADMIN DASHBOARD ---
+if st.session_state.is_master_admin and st.session_state.current_chapter is None:
+    st.title("🛡️ Master Admin Dashboard")
+    
+    # 1. Header Actions
+    col_header_1, col_header_2 = st.columns([1, 1])
+    with col_header_1:
+        if st.button("Logout Master Admin", width='stretch'): 
+            st.session_state.is_master_admin = False
+            st.rerun()
+
+    # 2. Database Stats & Connection
+    try:
+        engine = get_sqlalchemy_engine()
+        with tracing.span("dashboard stats", tracing.DB), engine.connect() as conn:
+            chapters = pd.read_sql_query("SELECT * FROM chapters", conn)
+            total_players = pd.read_sql_query("SELECT COUNT(*) FROM players", conn).iloc[0, 0]
+            total_matches = pd.read_sql_query("SELECT COUNT(*) FROM matches", conn).iloc[0, 0]
+    except Exception as e:
+        st.error(f"Error fetching dashboard stats: {e}")
+        chapters = pd.DataFrame()
+        total_players, total_matches = 0, 0
+    
+    # 3. Metrics Row
+    st.markdown("### System-Wide Statistics")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Total Chapters", len(chapters))
+    c2.metric("Total Players", total_players) 
+    c3.metric("Total Matches", total_matches) 
+
+    # 4. System Backup Section
+    st.divider()
+    st.subheader("💾 System Backup")
+    st.info("Download a complete snapshot of the database (all chapters, players, and matches) as a ZIP file.")
+    
+    zip_data = export_full_database()
+    if zip_data:
+        st.download_button(
+            label="📥 Download Full Database (ZIP)",
+            data=zip_data,
+            file_name=f"patchmoint_backup_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
+            mime="application/zip",
+            type="primary",
+            width='stretch'
+        )
+    st.divider()
+
+    # 5. Chapter Management List
+    st.subheader("All Active Chapters")
+    
+    if chapters.empty:
+        st.info("No chapters created yet.")
+    else:
+        for idx, row in chapters.iterrows():
+            with st.container(border=True):
+                col_info, col_act = st.columns([3, 2])
+                
+                with col_info:
+                    st.markdown(f"### {row['name']}")
+                    st.markdown(f"**Sport:** {row.get('sport') or 'Tennis'}")
+                    st.markdown(f"**Admin:** {row.get('admin_name', 'N/A')} ({row.get('admin_email', 'N/A')})")
+                    st.caption(f"ID: `{row['id']}` | Admin Pass: `{row['admin_password']}`")
+                
+                with col_act:
+                    # Enter Chapter as Admin
+                    if st.button(f"Enter Admin", key=f"ma_ent_{row['id']}", width='stretch'):
+                        st.session_state.current_chapter = {'id': row['id'], 'name': row['name']}
+                        st.session_state.chapter_config = load_chapter_config(row['id'])
+                        st.session_state.is_admin = True
+                        st.session_state.can_write = True
+                        st.rerun()
+                    
+                    # Delete Chapter
+                    delete_key = f"confirm_delete_{row['id']}"
+                    if st.session_state.get(delete_key):
+                        st.warning(f"Are you sure you want to permanently delete **{row['name']}** and all its data? This cannot be undone.")
+                        c1, c2 = st.columns(2)
+                        if c1.button("CONFIRM DELETION", key=f"ma_conf_del_{row['id']}", type="primary", width='stretch'):
+                            if delete_chapter_fully(row['id']):
+                                st.success(f"Deleted {row['name']}")
+                                st.session_state[delete_key] = False
+                                st.rerun()
+                        if c2.button("Cancel", key=f"ma_canc_del_{row['id']}", width='stretch'):
+                            st.session_state[delete_key] = False
+                            st.rerun()
+                    else:
+                        if st.button(f"DELETE CHAPTER", key=f"ma_del_{row['id']}", type="primary", width='stretch'):
+                            st.session_state[delete_key] = True
+                            st.rerun()
+
+                # Password & Admin Info Reset inside each Chapter card
+                with st.expander(f"Manage Security & Admin for {row['name']}", expanded=False, icon="➡️"):
+                    new_a_name = st.text_input("Admin Name", value=row.get('admin_name', ''), key=f"ana_{row['id']}")
+                    new_a_email = st.text_input("Admin Email", value=row.get('admin_email', ''), key=f"aem_{row['id']}")
+                    if st.button("Update Admin Info", key=f"uai_{row['id']}"):
+                        conn = get_connection()
+                        with conn.cursor() as cur:
+                            cur.execute("UPDATE chapters SET admin_name = %s, admin_email = %s WHERE id = %s", (new_a_name, new_a_email, row['id']))
+                        conn.commit()
+                        conn.close()
+                        st.success("Admin info updated!")
+                        st.rerun()
+
+                    st.divider()
+                    npw = st.text_input("New Admin Password", key=f"nap_{row['id']}")
+                    if st.button("Update Admin Password", key=f"rap_{row['id']}"):
+                        if npw:
+                            # Assuming update_chapter_admin_password is defined in your script
+                            update_chapter_admin_password(row['id'], npw)
+                            st.success("Password updated!")
+                        else:
+                            st.warning("Enter a password first.")
+
+    # 6. Table Partitioning (dry run; converting runs from the command line, see patchmoint.partitioning)
+    st.divider()
+    st.subheader("🗂️ Table Partitioning")
+    n_partitions = st.number_input("Hash partitions on chapter_id", min_value=2, max_value=128, value=partitioning.DEFAULT_PARTITIONS, key="n_partitions")
+    if st.button("Estimate Partition Sizes", key="btn_partition_estimate"):
+        conn = get_connection()
+        try:
+            for table in partitioning.TABLES:
+                report = partitioning.estimate(conn, table, int(n_partitions))
+                st.markdown(f"**{table}** · {report.rows} rows · {report.total_bytes / 1e6:.1f} MB · {report.chapters} chapters"
+                            + (" · already partitioned" if report.partitioned else ""))
+                st.dataframe(report.partitions, hide_index=True, width='stretch',
+                             column_config={"est_bytes": st.column_config.NumberColumn("Est. Size (bytes)", format="%d")})
+            conn.rollback()
+        except Exception as e:
+            st.error(f"Estimate failed: {e}")
+        finally:
+            conn.close()
+        st.caption("Apply with: python -m patchmoint.partitioning \"$NEON_DATABASE_URL\" --apply")
+
+    # 7. Query Log
+    st.divider()
+    st.subheader("🐢 Query Log")
+    render_query_log()
+
+    render_performance_panel()
+    render_footer()
+    st.stop()
+
+# --- MAIN APP LOGIC ---
+# Everything the chapter's first paint needs comes from one query, or from the cache (see patchmoint.context)
+chapter_frames = shared_frames(st.session_state.current_chapter['id'])
+if st.session_state.current_chapter:
+    if not st.session_state.chapter_config:
+        st.session_state.chapter_config = load_chapter_config(st.session_state.current_chapter['id'])
+
+load_players()
+load_matches()
+load_bookings()
+
+rank_df = pd.DataFrame()
+if not st.session_state.matches_df.empty:
+    rank_df = calculate_rankings(st.session_state.matches_df)
+
+# Chapter metadata
+chap_data = chapter_frames["chapters"]
+
+# Use the LOGO_URL directly in main app
+st.markdown(f'<div style="text-align: left;"><img src="{LOGO_URL}" style="height:50px; margin-bottom: 5px;"></div>', unsafe_allow_html=True)
+chapter_id = st.session_state.current_chapter['id']
+app_url = f"{SPORT.app_url}?chapter={chapter_id}"
+st.markdown(f'<div style="text-align: left; font-size: 0.8em; color: #666; margin-bottom: 15px;">Direct URL: <a href="{app_url}" target="_blank" style="color: #666; text-decoration: none;">{app_url}</a></div>', unsafe_allow_html=True)
+# Static standings page kept up to date by patchmoint.snapshots, for guests who only want the table
+if st.secrets.get("SNAPSHOT_BASE_URL"):
+    snapshot_url = f"{st.secrets['SNAPSHOT_BASE_URL'].rstrip('/')}/{chapter_id}/"
+    st.markdown(f'<div style="text-align: left; font-size: 0.8em; color: #666; margin-top: -10px; margin-bottom: 15px;">Standings snapshot: <a href="{snapshot_url}" target="_blank" style="color: #666; text-decoration: none;">{snapshot_url}</a></div>', unsafe_allow_html=True)
+
+if not chap_data.empty and pd.notna(chap_data.iloc[0]['title_image_url']) and chap_data.iloc[0]['title_image_url']:
+    img_path = chap_data.iloc[0]['title_image_url']
+    src = get_img_src(img_path)
+    st.markdown(f'<img src="{src}" style="height:150px; width:auto; object-fit:contain; margin-bottom:10px;">', unsafe_allow_html=True)
+else:
+    st.title(f"{st.session_state.current_chapter['name']}")
+
+if not st.session_state.can_write:
+    if st.button("Request to Join Chapter", type="primary"):
+        join_request_modal()
+
+
+
+tab_names = ["Rankings", "Matches", "Player Profile", "Court Locations", "Bookings", "Hall of Fame"]
+if st.session_state.is_admin: tab_names.append("Chapter Settings")
+tabs = st.tabs(tab_names)
+
+
+with tabs[0], tracing.span("tab Rankings", tracing.RENDER):
+    conf = st.session_state.chapter_config
+    with st.expander("Ranking Systems & Filters", expanded=False, icon="➡️"):
+        st.header(f"Rankings")
+        
+        active_systems_dict = conf.get("ranking_systems", {"Elo (Hybrid)": True})
+        active_systems = [k for k, v in active_systems_dict.items() if v]
+        if not active_systems: active_systems = ["Elo (Hybrid)"] 
+        
+        view_system = st.radio("Ranking System", active_systems, horizontal=True) if len(active_systems) > 1 else active_systems[0]
+        
+        # --- Ranking System Explanations ---
+        # This part can be improved by dynamically creating descriptions based on match_type_settings
+        pts_desc = "Varies by match type"
+        if "match_type_settings" in conf:
+            s_pts = conf["match_type_settings"].get("Singles", {})
+            d_pts = conf["match_type_settings"].get("Doubles", {})
+            pts_desc = f"S:{s_pts.get('win_points',0)}W/{s_pts.get('loss_points',0)}L, D:{d_pts.get('win_points',0)}W/{d_pts.get('loss_points',0)}L"
+    
+        ranking_descriptions = {
+            "Elo (Hybrid)": {
+                "desc": "A dynamic rating system that adjusts based on opponent quality. This hybrid version rewards Game Difference.",
+                "scenario": "Best for competitive leagues."
+            },
+            "Points": {
+                "desc": f"Cumulative system based on match type. ({pts_desc})",
+                "scenario": "Ideal for social leagues."
+            },
+            RATING_NAME: {
+                "desc": SPORT.rating.description,
+                "scenario": "Best for technical assessment."
+            }
+        }
+        
+        current_desc = ranking_descriptions.get(view_system, {"desc": "Custom ranking system.", "scenario": "General usage."})
+        
+        with st.expander(f"About {view_system}", expanded=False, icon="➡️"):
+            st.markdown(f"**How it works:** {current_desc['desc']}")
+            st.markdown(f"**Best for:** *{current_desc['scenario']}*")
+    
+        ranking_view = st.radio("View", ["Combined", "Doubles", "Singles", "Table View"], horizontal=True)
+    display_rank_df = rank_df.copy() if not rank_df.empty else pd.DataFrame()
+
+    if not st.session_state.matches_df.empty:
+        if ranking_view == "Doubles": display_rank_df = calculate_rankings(st.session_state.matches_df[st.session_state.matches_df.match_type.isin(["Doubles", "Mixed Doubles"])])
+        elif ranking_view == "Singles": display_rank_df = calculate_rankings(st.session_state.matches_df[st.session_state.matches_df.match_type == "Singles"])
+
+    if display_rank_df.empty: 
+        st.info("No matches.")
+    else:
+        sys_key = f"Score_{view_system}"
+        if sys_key in display_rank_df.columns:
+            display_rank_df = display_rank_df.sort_values(by=[sys_key, "Win %"], ascending=[False, False]).reset_index(drop=True)
+            display_rank_df['Rank'] = [i+1 for i in display_rank_df.index]
+            display_rank_df['Score'] = display_rank_df[sys_key]
+            display_rank_df['Label'] = view_system
+
+        with st.expander("🎲 Season Outlook", expanded=False, icon="➡️"):
+            sim_system = view_system if view_system in (ELO_SYSTEM, POINTS_SYSTEM) else ELO_SYSTEM
+            st.caption(f"Finishing odds in the {sim_system} standings, from simulating the remaining matches many times with Elo win probabilities.")
+            # Only on request: the simulation is too slow to run on every Rankings render
+            if st.toggle("Simulate", key="outlook_run"):
+                c_source, c_sims = st.columns([2, 1])
+                fixture_source = c_source.radio("Remaining matches", ["Upcoming bookings", "Round robin"], horizontal=True, key="outlook_source")
+                n_sims = c_sims.select_slider("Simulations", [10_000, 20_000, 50_000, 100_000], value=20_000, key="outlook_sims")
+                if fixture_source == "Round robin":
+                    ranked = display_rank_df['Player'].tolist()
+                    c_players, c_rounds = st.columns([3, 1])
+                    rr_players = c_players.multiselect("Players", ranked, default=ranked[:8], key="outlook_players")
+                    rr_rounds = c_rounds.number_input("Rounds", min_value=1, max_value=5, value=1, key="outlook_rounds")
+                    fixtures = round_robin_fixtures(rr_players, int(rr_rounds))
+                else:
+                    fixtures = booking_fixtures(st.session_state.bookings_df, dict(zip(display_rank_df['Player'], display_rank_df['Elo'])), datetime.now())
+
+                if not fixtures:
+                    st.info("No remaining matches to simulate.")
+                else:
+                    with st.spinner(f"Simulating {n_sims:,} seasons..."):
+                        outlook = season_outlook(display_rank_df, fixtures, sim_system, n_sims)
+                    me = st.session_state.get('logged_in_player')
+                    if me in outlook.players:
+                        mine = outlook.table[outlook.table['Player'] == me].iloc[0]
+                        st.markdown(f"{_styled_name(me)}: **{mine['P(1st)']:.1f}%** to finish first, **{mine['P(Top 3)']:.1f}%** top 3, "
+                                    f"expected position {mine['Expected Position']:.1f}", unsafe_allow_html=True)
+                    st.dataframe(outlook.table, hide_index=True, width='stretch',
+                                 column_config={"P(1st)": st.column_config.ProgressColumn("P(1st)", format="%.1f%%", min_value=0, max_value=100),
+                                                "P(Top 3)": st.column_config.ProgressColumn("P(Top 3)", format="%.1f%%", min_value=0, max_value=100),
+                                                "Expected Position": st.column_config.NumberColumn(format="%.2f")})
+                    st.caption(f"{len(fixtures)} matches · {outlook.simulations:,} simulated seasons")
+
+        if ranking_view == "Table View":
+            cols = ['Rank', 'Profile', 'Player', 'Score', 'Label', 'Win %', 'Matches', 'Game Diff Avg', 'Singles Perf', 'Doubles Perf']
+            st.dataframe(display_rank_df[cols], hide_index=True, width='stretch', 
+                         column_config={"Profile": st.column_config.ImageColumn("PIC"), 
+                                        "Win %": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+                                        "Singles Perf": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+                                        "Doubles Perf": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100)})
+        else:
+            # --- DATE AND SYSTEM HEADER ---
+            today_str = datetime.now().strftime("%B %d, %Y")
+            st.markdown(f"**Rankings as of {today_str}, {view_system} View**")
+
+            # --- OPTIC YELLOW PODIUM ---
+            if len(display_rank_df) >= 3:
+                top3 = display_rank_df.head(3).to_dict('records')
+                st.markdown(podium_html(top3), unsafe_allow_html=True)
+
+            # --- RANKING PLAYER LIST ---
+            # Plain records: the memoized cards key on their fields, and dict lookups are cheap
+            max_score = display_rank_df['Score'].max()
+            for row in display_rank_df.to_dict('records'):
+                with st.container(border=True):
+                    c1, c2, c3 = st.columns([1.5, 2.5, 1.8])
+                    
+                    with c1:
+                        st.markdown(ranking_player_html(row), unsafe_allow_html=True)
+                    
+                    with c2:
+                        st.markdown(ranking_stats_html(row), unsafe_allow_html=True)
+                    
+                    with c3:
+                        render_radar(row, key=f"rd_{row['Player']}")
+                    
+                    # --- DATA DISPLAY BELOW COLUMNS ---
+                    st.divider() # Subtle line separating main stats from form
+                    
+                    p_name = row['Player']
+                    m_df = st.session_state.matches_df
+                    player_matches = m_df[
+                        (m_df['team1_player1'] == p_name) | (m_df['team1_player2'] == p_name) |
+                        (m_df['team2_player1'] == p_name) | (m_df['team2_player2'] == p_name)
+                    ].copy()
+                    
+                    # 1. Recent Form Guide
+                    if not player_matches.empty:
+                        player_matches['dt'] = pd.to_datetime(player_matches['date'], errors='coerce')
+                        player_matches = player_matches.sort_values('dt', ascending=False).head(5)
+
+                        results = []
+                        for m in player_matches.itertuples():
+                            is_t1 = (m.team1_player1 == p_name or m.team1_player2 == p_name)
+                            if m.winner == "Tie": results.append("T")
+                            else: results.append("W" if (is_t1 and m.winner == "Team 1") or (not is_t1 and m.winner == "Team 2") else "L")
+                        st.markdown(form_guide_html(tuple(results)), unsafe_allow_html=True)
+                    
+                    # 2. Power Level Bar
+                    percent_of_max = min((row['Score'] / max_score) * 100, 100)
+                    st.markdown(standing_bar_html(percent_of_max), unsafe_allow_html=True)
+
+    seasons_df = load_seasons(st.session_state.current_chapter['id'])
+    if not seasons_df.empty:
+        with st.expander("📚 Past Seasons", expanded=False, icon="➡️"):
+            labels = {r.season_id: f"{r.name} ({r.started or '?'} to {r.ended or '?'}, {r.matches} matches)" for r in seasons_df.itertuples()}
+            season_id = st.selectbox("Season", list(labels), format_func=labels.get, key="past_season")
+            season = seasons_df[seasons_df['season_id'] == season_id].iloc[0]
+            standings = pd.DataFrame(json.loads(season['standings'] or "[]"))
+            if standings.empty: st.caption("No standings were recorded for this season.")
+            else:
+                st.dataframe(standings, hide_index=True, width='stretch',
+                             column_config={"Win %": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100)})
+            if st.toggle("Show matches", key="past_season_matches"):
+                season_matches = load_season_matches(season_id)
+                st.dataframe(season_matches[["date", "match_type", "team1_player1", "team1_player2", "team2_player1", "team2_player2", "set1", "set2", "set3", "winner"]]
+                             if not season_matches.empty else season_matches, hide_index=True, width='stretch')
+
+
+
+with tabs[1], tracing.span("tab Matches", tracing.RENDER):
+    st.header("Matches")
+    
+    config = st.session_state.chapter_config
+    is_img_required = config.get("match_image_required", True)
+    
+    # --- POST RESULT SECTION ---
+    if st.session_state.can_write:
+        with st.expander("➕ Post Result", expanded=False, icon="➡️"):
+            if st.session_state.players_df.empty: 
+                st.warning("Add players first.")
+            else:
+                pk = st.session_state.match_post_key
+                pnames = sorted([p for p in st.session_state.players_df["name"].dropna().tolist() if p != "Visitor"])
+                
+                match_type_settings = config.get("match_type_settings", get_default_config()["match_type_settings"])
+                ui_opts = []
+                if match_type_settings.get("Singles", {}).get("enabled"): ui_opts.append("Singles")
+                if match_type_settings.get("Doubles", {}).get("enabled") or match_type_settings.get("Mixed Doubles", {}).get("enabled"): ui_opts.append("Doubles")
+                
+                if not ui_opts: 
+                    st.warning("No match types enabled in Chapter Settings.")
+                    ui_opts = ["Singles"]
+
+                mt = st.radio("Type", ui_opts, horizontal=True, key=f"mt_{pk}")
+                
+                is_mixed = False
+                if mt == "Doubles" and match_type_settings.get("Mixed Doubles", {}).get("enabled"):
+                    is_mixed = st.checkbox("This is a Mixed Doubles match", key=f"mixed_{pk}")
+                
+                final_match_type = "Mixed Doubles" if is_mixed else mt
+                md = st.date_input("Date", datetime.now(), key=f"md_{pk}")
+                
+                c1, c2 = st.columns(2)
+                if mt == "Doubles":
+                    opts = [""] + pnames + ["Visitor"]
+                    t1p1 = c1.selectbox("T1 P1", opts, key=f"1_{pk}"); t1p2 = c1.selectbox("T1 P2", opts, key=f"2_{pk}")
+                    t2p1 = c2.selectbox("T2 P1", opts, key=f"3_{pk}"); t2p2 = c2.selectbox("T2 P2", opts, key=f"4_{pk}")
+                else:
+                    opts = [""] + pnames
+                    t1p1 = c1.selectbox("P1", opts, key=f"1s_{pk}"); t2p1 = c2.selectbox("P2", opts, key=f"2s_{pk}")
+                    t1p2, t2p2 = None, None
+                
+                sc1, sc2, sc3 = st.columns(3)
+                s_list = [""] + get_valid_scores()
+                s1_sel = sc1.selectbox("Set 1", s_list, key=f"s1_sel_{pk}")
+                s2_sel = sc2.selectbox("Set 2", s_list, key=f"s2_sel_{pk}")
+                s3_sel = sc3.selectbox("Set 3", s_list, key=f"s3_sel_{pk}")
+
+                def get_final_score(sel, col, k):
+                    custom = SPORT.get_custom_score(sel)
+                    if custom:
+                        c1, c2 = col.columns(2)
+                        v1 = c1.number_input("P1", min_value=0, max_value=99, value=custom.defaults[0], key=f"{custom.key}1_{k}_{pk}")
+                        v2 = c2.number_input("P2", min_value=0, max_value=99, value=custom.defaults[1], key=f"{custom.key}2_{k}_{pk}")
+                        if not custom.is_valid(v1, v2):
+                            col.error(custom.error)
+                            return None
+                        return custom.format(v1, v2)
+                    return sel
+
+                s1 = get_final_score(s1_sel, sc1, 1)
+                s2 = get_final_score(s2_sel, sc2, 2)
+                s3 = get_final_score(s3_sel, sc3, 3)
+                
+                win_opts = ["Team 1", "Team 2"]
+                if config.get("allow_ties", False): win_opts.append("Tie")
+                win = st.radio("Winner", win_opts, horizontal=True, key=f"w_{pk}")
+                img = st.file_uploader("Photo", type=["jpg", "png"], key=f"im_{pk}")
+
+                if st.button("Post Match", key=f"bp_{pk}"):
+                    if s1 and (img or not is_img_required):
+                        # Validate that s1, s2, s3 are not None (failed custom validation)
+                        if s1 is None or (s2_sel != "" and s2 is None) or (s3_sel != "" and s3 is None):
+                            st.error("Please fix custom score errors.")
+                        else:
+                            mid = str(uuid.uuid4())
+                            path = save_remote_image(img, mid, "match") if img else ""
+                            new_row = {
+                                "match_id": mid, "date": md.strftime('%Y-%m-%d'), "match_type": final_match_type, 
+                                "team1_player1": t1p1, "team1_player2": t1p2, "team2_player1": t2p1, "team2_player2": t2p2, 
+                                "set1": s1, "set2": s2 if s2 else "", "set3": s3 if s3 else "", "winner": win, "match_image_url": path, 
+                                "chapter_id": st.session_state.current_chapter['id']
+                            }
+                            new_row_df = pd.DataFrame([new_row])
+                            if save_matches(new_row_df):
+                                record_matches(new_row_df)
+                                st.session_state.matches_df = pd.concat([st.session_state.matches_df, new_row_df], ignore_index=True)
+                                st.session_state.match_post_key += 1
+                                st.success(f"Saved as {mt}"); time.sleep(1); st.rerun()
+                    else: st.error("Score & Photo required")
+
+    # --- BULK ENTRY: a whole session's results, checked together and saved in one transaction (see patchmoint.bulk) ---
+    if st.session_state.is_admin:
+        with st.expander("📋 Bulk Entry", expanded=False, icon="➡️"):
+            added = st.session_state.pop('bulk_new_players', None)
+            if added:
+                st.info("Added to the roster (passwords): " + ", ".join(f"{name} ({pw})" for name, pw in added.items()))
+            bk = st.session_state.match_post_key
+            st.caption("Paste CSV with a header row, fill in the grid, or both. A blank match type is taken from the number of "
+                       "players and a blank winner from the sets. Bulk entries need no photo.")
+            csv_text = st.text_area("Paste CSV", key=f"bulk_csv_{bk}", height=150,
+                                    placeholder=f"{bulk.CSV_HEADER}\n{datetime.now():%Y-%m-%d},Doubles,Ann,Bea,Cat,Dee,6-4,3-6,Super Tie Break 10-7,Team 1")
+            roster = [p for p in st.session_state.players_df["name"].dropna().tolist() if p != bulk.VISITOR] if not st.session_state.players_df.empty else []
+            grid = st.data_editor(
+                bulk.empty_grid(f"{datetime.now():%Y-%m-%d}"), num_rows="dynamic", hide_index=True, width='stretch', key=f"bulk_grid_{bk}",
+                column_config={
+                    "match_type": st.column_config.SelectboxColumn("Type", options=[""] + MATCH_TYPES),
+                    **{c: st.column_config.SelectboxColumn(c.replace("team", "T").replace("_player", " P"), options=[""] + sorted(roster) + [bulk.VISITOR])
+                       for c in bulk.PLAYER_COLUMNS},
+                    **{c: st.column_config.SelectboxColumn(c.title(), options=[""] + list(SPORT.valid_scores)) for c in bulk.SET_COLUMNS},
+                    "winner": st.column_config.SelectboxColumn("Winner", options=[""] + bulk.WINNERS),
+                })
+            add_players = st.checkbox("Add players not on the roster", key=f"bulk_add_{bk}")
+
+            if st.button("Check & Post Results", key=f"bulk_post_{bk}"):
+                try:
+                    rows = pd.concat([bulk.parse_csv(csv_text) if csv_text.strip() else bulk.normalize(pd.DataFrame()),
+                                      bulk.normalize(grid)])
+                except ValueError as e:
+                    st.error(str(e))
+                    rows = None
+                if rows is not None:
+                    new_matches, problems, new_players = bulk.validate(rows, roster, config, SPORT, add_players)
+                    if rows.empty:
+                        st.warning("No results to post.")
+                    elif not problems.empty:
+                        st.error(f"Nothing was posted: {len(problems)} problem(s) to fix first.")
+                        st.dataframe(problems, hide_index=True, width='stretch')
+                    else:
+                        cid = st.session_state.current_chapter['id']
+                        new_matches = new_matches.assign(match_id=[str(uuid.uuid4()) for _ in range(len(new_matches))], match_image_url="",
+                                                         chapter_id=cid).reset_index(drop=True)
+                        try:
+                            st.session_state.bulk_new_players = save_bulk_results(new_matches, new_players)
+                        except Exception as e:
+                            st.error(f"Nothing was posted: {e}")
+                        else:
+                            if new_players: load_players()
+                            # One Hall of Fame update and, on the rerun, one ranking recompute for the whole batch
+                            record_matches(new_matches)
+                            st.session_state.matches_df = pd.concat([st.session_state.matches_df, new_matches], ignore_index=True)
+                            st.session_state.match_post_key += 1
+                            st.toast(f"Posted {len(new_matches)} results", icon="✅")
+                            st.rerun()
+
+    # --- MATCH HISTORY DISPLAY ---
+    player_imgs = {}
+    if not st.session_state.players_df.empty:
+        for _, p_row in st.session_state.players_df.iterrows():
+            player_imgs[p_row['name']] = p_row.get('profile_image_url')
+
+    m_hist = st.session_state.matches_df.copy()
+    if not m_hist.empty:
+        m_hist['date'] = pd.to_datetime(m_hist['date'], errors='coerce')
+        m_hist = m_hist.sort_values('date', ascending=False)
+        
+        for row in m_hist.itertuples():
+            st.markdown(match_card_html(row, player_imgs), unsafe_allow_html=True)
+
+            # Match Photo Expander
+            img_url = getattr(row, 'match_image_url', '')
+            if img_url:
+                with st.expander("📷 View Match Photo", expanded=False, icon="➡️"):
+                    st.markdown(f'<a href="{img_url}" target="_blank"><img src="{img_url}" style="width:100%; border-radius:10px; cursor:pointer;"></a>', unsafe_allow_html=True)
+
+            # Edit/Delete Logic
+            can_edit_match = False
+            if st.session_state.is_admin or st.session_state.is_master_admin: can_edit_match = True
+            elif st.session_state.get('logged_in_player'):
+                me = st.session_state.logged_in_player
+                if me in [row.team1_player1, getattr(row, 'team1_player2', ''), row.team2_player1, getattr(row, 'team2_player2', '')]: can_edit_match = True
+            
+            if can_edit_match:
+                with st.expander(f"⚙️ Manage Result ({row.match_id})", expanded=False, icon="➡️"):
+                    if st.button("Delete Match Record", key=f"del_{row.match_id}"): 
+                        delete_match_from_db(row.match_id)
+                        st.rerun()                         
+
+with tabs[2], tracing.span("tab Player Profile", tracing.RENDER):
+    st.header("Player Profile")
+    
+    # --- Edit My Profile (For Logged-in Players) ---
+    if st.session_state.get('logged_in_player'):
+        me = st.session_state.logged_in_player
+        if not st.session_state.players_df.empty:
+            my_row_matches = st.session_state.players_df[st.session_state.players_df['name'] == me]
+            if not my_row_matches.empty:
+                my_row_index = my_row_matches.index[0]
+                my_row = st.session_state.players_df.loc[my_row_index]
+                
+                with st.expander(f"👤 Edit My Profile ({me})", expanded=False, icon="➡️"):
+                    with st.form(key="edit_my_profile_form"):
+                        # Profile Image
+                        new_img = st.file_uploader("Update Profile Image", type=["jpg", "png"], key="my_profile_img")
+                        
+                        # Gender
+                        my_current_gend = my_row.get('gender', '')
+                        gender_options = ["", "Male", "Female"]
+                        my_gend_idx = gender_options.index(my_current_gend) if my_current_gend in gender_options else 0
+                        my_new_gend = st.selectbox("My Gender", options=gender_options, index=my_gend_idx, key="my_profile_gender")
+                        
+                        # Password
+                        my_new_pass = st.text_input("Change My Password", placeholder="Leave blank to keep current", type="password", key="my_profile_pass")
+                        
+                        if st.form_submit_button("Update My Profile", type="primary"):
+                            my_has_changed = False
+                            
+                            # Update Image
+                            if new_img is not None:
+                                my_path = save_remote_image(new_img, me, "profile")
+                                if my_path:
+                                    st.session_state.players_df.at[my_row_index, 'profile_image_url'] = my_path
+                                    my_has_changed = True
+                            
+                            # Update Gender
+                            if my_new_gend != my_current_gend:
+                                st.session_state.players_df.at[my_row_index, 'gender'] = my_new_gend if my_new_gend else None
+                                my_has_changed = True
+                                
+                            if my_has_changed:
+                                save_players(st.session_state.players_df)
+                                st.toast("Profile updated successfully!")
+                                
+                            # Update Password
+                            if my_new_pass:
+                                if update_player_password(me, my_new_pass):
+                                    st.toast("Password updated successfully!")
+                                else:
+                                    st.error("Failed to update password.")
+                                    
+                            if my_has_changed or my_new_pass:
+                                time.sleep(0.5)
+                                st.rerun()
+
+    if st.session_state.is_admin:
+        with st.expander("Manage Players", expanded=False, icon="➡️"):
+            new_p = st.text_input("New Name")
+            gend = st.selectbox("Gender (Optional)", ["", "Male", "Female"])
+            
+            # Allow Admin to set a custom password
+            custom_pw = st.text_input("Custom Password (Optional)", placeholder="Leave blank for random", type="password")
+            
+            # Check if new_p already exists to determine if it's a new player or a potential duplicate check for the UI
+            # For the purpose of this form, we assume 'new_p' is a new player until added
+            
+            initial_utr_input = st.number_input(f"Initial {RATING_NAME} (Optional, for new players)", min_value=SPORT.rating.minimum, max_value=SPORT.rating.maximum, value=None, format="%.2f", help=f"Enter {RATING_NAME} if player has not played any games yet. Max {SPORT.rating.maximum}, Min {SPORT.rating.minimum}. This can only be set when the player has not played any matches.")
+            
+            if st.button("Add", key="add_player_btn"):
+                if new_p:
+                    # Check if player already exists in the current chapter
+                    if new_p in st.session_state.players_df['name'].tolist():
+                        st.error(f"Player '{new_p}' already exists in this chapter.")
+                    else:
+                        # Check if the player name has played any matches globally (across chapters, or just within this chapter for a robust check)
+                        # For simplicity, we'll check against current chapter's matches_df
+                        player_has_played = (
+                            (st.session_state.matches_df['team1_player1'] == new_p) |
+                            (st.session_state.matches_df['team1_player2'] == new_p) |
+                            (st.session_state.matches_df['team2_player1'] == new_p) |
+                            (st.session_state.matches_df['team2_player2'] == new_p)
+                        ).any()
+                        
+                        if initial_utr_input is not None and player_has_played:
+                            st.warning(f"Initial {RATING_NAME} can only be set for players who have not played any matches. '{new_p}' has played matches.")
+                        else:
+                            pw = custom_pw if custom_pw else str(uuid.uuid4().hex)[:8]
+                            final_gender = gend if gend else None
+                            new_player_data = {
+                                "name": new_p,
+                                "profile_image_url": "",
+                                "birthday": "",
+                                "chapter_id": st.session_state.current_chapter['id'],
+                                "password": pw,
+                                "gender": final_gender,
+                                "initial_utr": initial_utr_input if initial_utr_input is not None else None
+                            }
+                            st.session_state.players_df = pd.concat([st.session_state.players_df, pd.DataFrame([new_player_data])], ignore_index=True)
+                            save_players(st.session_state.players_df); load_players()
+                            st.success(f"Added '{new_p}'! Password: {pw}" + (f" (Initial {RATING_NAME}: {initial_utr_input})" if initial_utr_input is not None else ""))
+                            st.session_state.form_key_suffix += 1 # Increment to reset form state
+                            st.rerun()
+            st.markdown("---")
+            if not st.session_state.players_df.empty:
+                player_names = [""] + st.session_state.players_df['name'].tolist()
+                sel = st.selectbox("Edit Player", options=player_names, index=0)
+
+                if sel:
+                    row_index = st.session_state.players_df[st.session_state.players_df['name'] == sel].index[0]
+                    row = st.session_state.players_df.loc[row_index]
+
+                    with st.form(key=f"edit_player_{sel}"):
+                        st.subheader(f"Editing: {sel}")
+
+                        # Image uploader
+                        ni = st.file_uploader("Profile Image", type=["jpg", "png"], key=f"pu_{sel}")
+
+                        # Initial sport rating
+                        current_utr = row.get('initial_utr')
+                        new_utr = st.number_input(
+                            f"Starting {RATING_NAME}",
+                            value=float(current_utr) if pd.notna(current_utr) else None,
+                            min_value=SPORT.rating.minimum, max_value=SPORT.rating.maximum, step=0.1, format="%.2f"
+                        )
+
+                        # Admin status
+                        is_p_admin = st.checkbox("Player is Admin", value=row.get('is_admin', False))
+
+                        # Gender Edit
+                        current_gend = row.get('gender', '')
+                        gender_options = ["", "Male", "Female"]
+                        gend_idx = gender_options.index(current_gend) if current_gend in gender_options else 0
+                        new_gend = st.selectbox("Gender", options=gender_options, index=gend_idx, key=f"eg_{sel}")
+
+                        # Password reset
+                        new_pass = st.text_input("Reset Password", placeholder="Leave blank to keep current")
+
+                        # --- Action Buttons ---
+                        c1, c2 = st.columns([1,1])
+                        update_button = c1.form_submit_button("Update Player", use_container_width=True, type="primary")
+                        delete_button = c2.form_submit_button("Delete Player", use_container_width=True)
+
+                        if update_button:
+                            # --- Update Logic ---
+                            has_changed = False
+
+                            # 1. Update Image
+                            if ni is not None:
+                                path = save_remote_image(ni, sel, "profile")
+                                if path:
+                                    st.session_state.players_df.at[row_index, 'profile_image_url'] = path
+                                    has_changed = True
+
+                            # 2. Update starting rating
+                            utr_changed = (pd.isna(current_utr) and pd.notna(new_utr)) or \
+                                          (pd.notna(current_utr) and pd.isna(new_utr)) or \
+                                          (pd.notna(current_utr) and pd.notna(new_utr) and float(current_utr) != new_utr)
+                            if utr_changed:
+                                st.session_state.players_df.at[row_index, 'initial_utr'] = new_utr
+                                has_changed = True
+
+                            # 3. Update Admin Status
+                            if is_p_admin != row.get('is_admin', False):
+                                st.session_state.players_df.at[row_index, 'is_admin'] = is_p_admin
+                                has_changed = True
+
+                            # 4. Update Gender
+                            if new_gend != current_gend:
+                                st.session_state.players_df.at[row_index, 'gender'] = new_gend if new_gend else None
+                                has_changed = True
+
+                            # 5. Save player changes to DB
+                            if has_changed:
+                                save_players(st.session_state.players_df)
+                                st.toast(f"Player {sel} updated!")
+                            
+                            # 6. Update Password
+                            if new_pass:
+                                update_player_password(sel, new_pass)
+                                st.toast(f"Password for {sel} updated.")
+                            
+                            if has_changed or new_pass:
+                                st.rerun()
+
+                        if delete_button:
+                            delete_player_from_db(sel)
+                            st.session_state.players_df = st.session_state.players_df[st.session_state.players_df['name'] != sel]
+                            st.rerun()
+
+    # --- Rating trajectories, sliced from the rating history of the cached replay ---
+    if not rank_df.empty:
+        with st.expander("📈 Rating Trajectory", expanded=False, icon="➡️"):
+            me = st.session_state.get('logged_in_player')
+            ranked_players = rank_df['Player'].tolist()
+            default_players = [me] if me in ranked_players else ranked_players[:3]
+            c_players, c_system = st.columns([3, 1])
+            traj_players = c_players.multiselect("Players", ranked_players, default=default_players, key="traj_players")
+            traj_system = c_system.radio("Rating", [ELO, RATING_NAME], horizontal=True, key="traj_system")
+            fig = plot_rating_trajectory(traj_players, traj_system) if traj_players else None
+            if fig is not None:
+                st.plotly_chart(fig, width='stretch', config={'displayModeBar': False}, key="traj_chart")
+            else:
+                st.info("Pick one or more players to compare their ratings match by match.")
+
+        with st.expander("📉 Game Difference Trend", expanded=False, icon="➡️"):
+            me = st.session_state.get('logged_in_player')
+            ranked_players = rank_df['Player'].tolist()
+            trend_player = st.selectbox("Player", ranked_players, index=ranked_players.index(me) if me in ranked_players else 0, key="trend_player")
+            fig = plot_player_performance(trend_player, st.session_state.matches_df)
+            if fig is not None:
+                st.plotly_chart(fig, width='stretch', config={'displayModeBar': False}, key="trend_chart")
+            else:
+                st.info(f"{trend_player} has no matches with game scores yet.")
+
+        with st.expander("🤝 Head-to-Head & Partners", expanded=False, icon="➡️"):
+            me = st.session_state.get('logged_in_player')
+            ranked_players = rank_df['Player'].tolist()
+            c_player, c_opponent = st.columns(2)
+            h2h_player = c_player.selectbox("Player", ranked_players, index=ranked_players.index(me) if me in ranked_players else 0, key="h2h_player")
+            h2h_opponent = c_opponent.selectbox("Against", [""] + [p for p in ranked_players if p != h2h_player], key="h2h_opponent")
+            pairs = get_pairs()
+            if h2h_opponent:
+                rec = pairs.opponents.get(h2h_player, h2h_opponent)
+                if rec:
+                    st.markdown(f"{_styled_name(h2h_player)} vs {_styled_name(h2h_opponent)}: **{rec['wins']}W-{rec['losses']}L"
+                                f"{'-' + str(rec['ties']) + 'T' if rec['ties'] else ''}** in {rec['matches']} matches, "
+                                f"games {rec['games_won']}-{rec['games_lost']}", unsafe_allow_html=True)
+                else:
+                    st.info(f"{h2h_player} and {h2h_opponent} have not played against each other.")
+
+            st.markdown("**Head-to-Head**")
+            h2h = head_to_head_table(pairs, h2h_player)
+            if h2h.empty: st.caption("No opponents yet.")
+            else:
+                st.dataframe(h2h[["other", "matches", "wins", "losses", "ties", "win_pct", "games_won", "games_lost"]], hide_index=True, width='stretch',
+                             column_config={"other": "Opponent", "matches": "Played", "wins": "W", "losses": "L", "ties": "T",
+                                            "win_pct": st.column_config.ProgressColumn("Win %", format="%.1f%%", min_value=0, max_value=100),
+                                            "games_won": "Games Won", "games_lost": "Games Lost"})
+
+            st.markdown("**Best Partners**")
+            partners = best_partners(pairs, h2h_player)
+            if partners.empty: st.caption("No doubles partners yet.")
+            else:
+                st.dataframe(partners[["other", "matches", "wins", "losses", "win_pct", "game_diff_avg"]], hide_index=True, width='stretch',
+                             column_config={"other": "Partner", "matches": "Together", "wins": "W", "losses": "L",
+                                            "win_pct": st.column_config.ProgressColumn("Win %", format="%.1f%%", min_value=0, max_value=100),
+                                            "game_diff_avg": st.column_config.NumberColumn("Game Diff Avg", format="%+.2f")})
+
+    # Prepare data for profile view using default/first active ranking system
+    # This ensures we have the Score/Label/Rank fields populated
+    profile_view_system = "Elo (Hybrid)"
+    active_systems_dict = st.session_state.chapter_config.get("ranking_systems", {"Elo (Hybrid)": True})
+    active_systems = [k for k, v in active_systems_dict.items() if v]
+    if active_systems: profile_view_system = active_systems[0]
+
+    # Ranked once for every card; plain records, as the memoized cards key on their fields
+    display_profile_rank_df = rank_df.copy() if not rank_df.empty else pd.DataFrame()
+    if not display_profile_rank_df.empty:
+        sys_key = f"Score_{profile_view_system}"
+        if sys_key in display_profile_rank_df.columns:
+            display_profile_rank_df = display_profile_rank_df.sort_values(by=[sys_key, "Win %"], ascending=[False, False]).reset_index(drop=True)
+            display_profile_rank_df['Rank'] = display_profile_rank_df.index + 1
+            display_profile_rank_df['Score'] = display_profile_rank_df[sys_key]
+            display_profile_rank_df['Label'] = profile_view_system
+    profile_stats = {r['Player']: r for r in display_profile_rank_df.to_dict('records')} if 'Score' in display_profile_rank_df.columns else {}
+    max_score = display_profile_rank_df['Score'].max() if profile_stats else 1
+
+    for idx, row in st.session_state.players_df.sort_values("name").iterrows():
+            p_name = row['name']
+            s = profile_stats.get(p_name)
+    
+            if s is not None:
+                # --- RENDER CARD (MATCHING RANKINGS TAB DESIGN) ---
+                with st.container(border=True):
+                    c1, c2, c3 = st.columns([1.5, 2.5, 1.8])
+                    
+                    with c1:
+                        st.markdown(ranking_player_html(s), unsafe_allow_html=True)
+                    
+                    with c2:
+                        st.markdown(ranking_stats_html(s), unsafe_allow_html=True)
+                    
+                    with c3:
+                        render_radar(s, key=f"rp_rd_{p_name}")
+
+                    # --- DATA DISPLAY BELOW COLUMNS (FORM & POWER) ---
+                    st.divider() 
+                    
+                    # 1. Recent Form Guide
+                    m_df = st.session_state.matches_df
+                    player_matches = m_df[
+                        (m_df['team1_player1'] == p_name) | (m_df['team1_player2'] == p_name) |
+                        (m_df['team2_player1'] == p_name) | (m_df['team2_player2'] == p_name)
+                    ].copy()
+                    
+                    if not player_matches.empty:
+                        player_matches['dt'] = pd.to_datetime(player_matches['date'], errors='coerce')
+                        player_matches = player_matches.sort_values('dt', ascending=False).head(5)
+
+                        results = []
+                        for m in player_matches.itertuples():
+                            is_t1 = (m.team1_player1 == p_name or m.team1_player2 == p_name)
+                            if m.winner == "Tie": results.append("T")
+                            else: results.append("W" if (is_t1 and m.winner == "Team 1") or (not is_t1 and m.winner == "Team 2") else "L")
+                        st.markdown(form_guide_html(tuple(results)), unsafe_allow_html=True)
+                    
+                    # 2. Power Level Bar
+                    percent_of_max = min((s['Score'] / max_score) * 100, 100)
+                    st.markdown(standing_bar_html(percent_of_max), unsafe_allow_html=True)
+            else:
+                # --- NO STATS FALLBACK ---
+                with st.container(border=True):
+                    c1, c2 = st.columns([1, 4])
+                    with c1:
+                        st.markdown(profile_placeholder_html(p_name, row['profile_image_url']), unsafe_allow_html=True)
+                    with c2:
+                        st.info("No stats yet. Play a match to get started!")
+            st.divider()
+
+with tabs[3], tracing.span("tab Court Locations", tracing.RENDER):
+    st.header("Courts")
+    if st.session_state.is_admin:
+        with st.expander("Add Court", expanded=False, icon="➡️"):
+            n, u = st.text_input("Name"), st.text_input("URL")
+            if st.button("Add", key="add_court_btn"): add_court_db(n, u); st.rerun()
+    courts = load_courts()
+    if courts:
+        cols = st.columns(3)
+        for i, c in enumerate(courts):
+             with cols[i%3]: st.markdown(f"""<div class="court-card"><h4>{c.get('name')}</h4><a href="{c.get('url')}" target="_blank">Map</a></div>""", unsafe_allow_html=True)
+
+with tabs[4], tracing.span("tab Bookings", tracing.RENDER):
+    st.header("Bookings")
+    available_players = sorted(st.session_state.players_df['name'].tolist()) if not st.session_state.players_df.empty else []
+    
+    # --- MATCH UP EXPANDER ---
+    with st.expander("Match up", expanded=False, icon="➡️"):
+        match_type_odds = st.radio("Select Match Type", ["Doubles", "Singles"], horizontal=True, key="matchup_type")
+
+        if match_type_odds == "Doubles":
+            t1p1 = st.selectbox("Team 1 - Player 1", [""] + available_players, key="matchup_doubles_t1p1")
+            t1p2 = st.selectbox("Team 1 - Player 2", [""] + available_players, key="matchup_doubles_t1p2")
+            t2p1 = st.selectbox("Team 2 - Player 1", [""] + available_players, key="matchup_doubles_t2p1")
+            t2p2 = st.selectbox("Team 2 - Player 2", [""] + available_players, key="matchup_doubles_t2p2")
+
+            if st.button("Match up", key="btn_matchup_doubles"):
+                st.subheader("Match Odds")
+                players_list = [t1p1, t1p2, t2p1, t2p2]
+                doubles_rank_df = calculate_rankings(st.session_state.matches_df[st.session_state.matches_df['match_type'].isin(["Doubles", "Mixed Doubles"])])
+                if all(p in doubles_rank_df["Player"].values for p in players_list if p):
+                    pairing_text, team1_odds, team2_odds = suggest_balanced_pairing(players_list, doubles_rank_df)
+                    if pairing_text:
+                        st.markdown(pairing_text, unsafe_allow_html=True)
+                        st.write(f"Team 1: {team1_odds:.1f}% | Team 2: {team2_odds:.1f}%")
+                    else: st.info("No odds available for this combination.")
+                else: st.info("No odds available (one or more players have no doubles match history).")
+        else:  # Singles
+            p1 = st.selectbox("Player 1", [""] + available_players, key="matchup_singles_p1")
+            p2 = st.selectbox("Player 2", [""] + available_players, key="matchup_singles_p2")
+
+            if st.button("Match up", key="btn_matchup_singles"):
+                st.subheader("Match Odds")
+                if p1 and p2:
+                    singles_rank_df = calculate_rankings(st.session_state.matches_df[st.session_state.matches_df['match_type']=="Singles"])
+                    if p1 in singles_rank_df["Player"].values and p2 in singles_rank_df["Player"].values:
+                        odds1, odds2 = suggest_singles_odds([p1, p2], singles_rank_df)
+                        st.write(f"Odds → {p1}: {odds1:.1f}% | {p2}: {odds2:.1f}%")
+                    else: st.info("No odds available (one or both players have no singles match history).")
+                else: st.warning("Please select both players.")
+
+    # --- SESSION PLANNER ---
+    with st.expander("Session Planner", expanded=False, icon="➡️"):
+        st.caption("Split tonight's players into balanced doubles courts by Elo. Extra players sit out, last picked first.")
+        attendees = st.multiselect("Players attending", available_players, key="planner_players")
+        c_courts, c_avoid = st.columns([1, 2])
+        n_courts = c_courts.number_input("Courts", min_value=1, max_value=10, value=max(1, min(5, len(attendees) // 4)))
+        avoid_repeats = c_avoid.checkbox("Avoid partners from the last session", value=True, key="planner_avoid")
+
+        if st.button("Plan Session", key="btn_plan_session"):
+            if len(attendees) < 4:
+                st.warning("Select at least four players.")
+            else:
+                doubles_matches = st.session_state.matches_df[st.session_state.matches_df['match_type'].isin(["Doubles", "Mixed Doubles"])]
+                doubles_rank_df = calculate_rankings(doubles_matches)
+                ratings = dict(zip(doubles_rank_df['Player'], doubles_rank_df['Elo'])) if not doubles_rank_df.empty else {}
+                plan = plan_session(attendees, ratings, int(n_courts), last_session_partners(doubles_matches) if avoid_repeats else ())
+                court_names = [c['name'] for c in courts] if courts else []
+                for i, court in enumerate(plan.courts):
+                    court_name = court_names[i] if i < len(court_names) else f"Court {i + 1}"
+                    st.markdown(f"**{court_name}:** {_styled_name(' & '.join(court.team1))} vs {_styled_name(' & '.join(court.team2))} "
+                                f"· {court.team1_odds:.1f}% / {court.team2_odds:.1f}%", unsafe_allow_html=True)
+                if plan.sitting_out: st.caption(f"Sitting out: {', '.join(plan.sitting_out)}")
+                if plan.repeated_partners: st.caption(f"{plan.repeated_partners} partnership(s) from the last session could not be avoided.")
+                unranked = [p for p in attendees if p not in ratings]
+                if unranked: st.caption(f"No doubles history, rated as new players: {', '.join(unranked)}")
+
+    # --- BOOKING MANAGEMENT ---
+    with st.expander("Add New Booking", expanded=False, icon="➡️"):
+        if st.session_state.can_write:
+            match_type_book = st.radio("Match Type", ["Doubles", "Singles"], index=0, key=f"new_booking_match_type_{st.session_state.form_key_suffix}")
+            
+            with st.form(key=f"add_booking_form_{st.session_state.form_key_suffix}"):
+                date = st.date_input("Booking Date *", key=f"new_booking_date_{st.session_state.form_key_suffix}")
+                hours = [f"{h:02d}:00" for h in range(6, 23)] + [f"{h:02d}:30" for h in range(6, 23)]
+                hours.sort()
+                time_sel = st.selectbox("Booking Time *", hours, key=f"new_booking_time_{st.session_state.form_key_suffix}")
+                
+                court_names_list = [c['name'] for c in courts] if courts else []
+                court = st.selectbox("Court Name *", [""] + court_names_list, key=f"court_{st.session_state.form_key_suffix}")
+                
+                if match_type_book == "Doubles":
+                    col1, col2 = st.columns(2)
+                    p1_b = col1.selectbox("Player 1", [""] + available_players, key=f"new_booking_t1p1_{st.session_state.form_key_suffix}")
+                    p2_b = col1.selectbox("Player 2", [""] + available_players, key=f"new_booking_t1p2_{st.session_state.form_key_suffix}")
+                    p3_b = col2.selectbox("Player 3", [""] + available_players, key=f"new_booking_t2p1_{st.session_state.form_key_suffix}")
+                    p4_b = col2.selectbox("Player 4", [""] + available_players, key=f"new_booking_t2p2_{st.session_state.form_key_suffix}")
+                else:
+                    p1_b = st.selectbox("Player 1", [""] + available_players, key=f"new_booking_s1p1_{st.session_state.form_key_suffix}")
+                    p3_b = st.selectbox("Player 2", [""] + available_players, key=f"new_booking_s1p2_{st.session_state.form_key_suffix}")
+                    p2_b = None; p4_b = None
+                
+                standby = st.selectbox("Standby Player", [""] + available_players, key=f"new_booking_standby_{st.session_state.form_key_suffix}")
+                screenshot = st.file_uploader("Booking Screenshot", type=["jpg", "png"], key=f"screenshot_{st.session_state.form_key_suffix}")
+                
+                if st.form_submit_button("Add Booking"):
+                    if not court or not date or not time_sel:
+                        st.error("Required fields missing")
+                    else:
+                        bid = str(uuid.uuid4())
+                        path = save_remote_image(screenshot, bid, "booking") if screenshot else ""
+                        new_booking = {
+                            "booking_id": bid, "date": date.isoformat(), "time": time_sel, "match_type": match_type_book,
+                            "court_name": court, "player1": p1_b, "player2": p2_b, "player3": p3_b, "player4": p4_b,
+                            "standby_player": standby, "screenshot_url": path, "chapter_id": st.session_state.current_chapter['id']
+                        }
+                        st.session_state.bookings_df = pd.concat([st.session_state.bookings_df, pd.DataFrame([new_booking])], ignore_index=True)
+                        save_bookings(st.session_state.bookings_df); st.success("Booking added!"); time.sleep(1); st.rerun()
+        else:
+            st.info("Please log in to add bookings.")
+
+    st.markdown("---")
+    st.subheader("📅 Upcoming Bookings")
+    if st.session_state.bookings_df.empty:
+        st.info("No upcoming bookings found.")
+    else:
+        df_book = st.session_state.bookings_df.copy()
+        df_book['dt'] = pd.to_datetime(df_book['date'] + ' ' + df_book['time'])
+        df_book = df_book[df_book['dt'] >= datetime.now() - timedelta(hours=2)].sort_values('dt')
+        
+        if df_book.empty: st.info("No upcoming bookings.")
+        else:
+            court_map = {c['name']: c['url'] for c in courts}
+            # PRE-CALCULATE RANKINGS FOR ODDS
+            doubles_rank_df = calculate_rankings(st.session_state.matches_df[st.session_state.matches_df['match_type'].isin(["Doubles", "Mixed Doubles"])])
+            singles_rank_df = calculate_rankings(st.session_state.matches_df[st.session_state.matches_df['match_type']=="Singles"])
+
+            for _, row in df_book.iterrows():
+                players = [p for p in [row['player1'], row['player2'], row['player3'], row['player4']] if p]
+                players_str = ", ".join([f"<span style='font-weight:bold; color:#ccff00;'>{p}</span>" for p in players]) if players else "No players"
+                standby_str = f"<span style='font-weight:bold; color:#ccff00;'>{row['standby_player']}</span>" if row['standby_player'] else "None"
+                
+                pairing_suggestion = ""; plain_suggestion = ""
+                try:
+                    if row['match_type'] == "Doubles" and len(players) == 4:
+                        booking_rank_df = doubles_rank_df
+                        unranked = [p for p in players if p not in booking_rank_df["Player"].values]
+                        if unranked:
+                            pairing_suggestion = f"<div>Odds unavailable: {', '.join(unranked)} unranked.</div>"
+                        else:
+                            all_p = doubles_pairings(players, booking_rank_df)
+                            pairing_suggestion = "<div><strong>Recommended Matchups:</strong></div>"
+                            for idx, p in enumerate(all_p[:3], 1):
+                                pairing_suggestion += f"<div style='font-size:0.85em;'>Opt {idx}: {', '.join(p['t1'])} ({p['o1']:.1f}%) vs {', '.join(p['t2'])} ({p['o2']:.1f}%)</div>"
+                            plain_suggestion = f"Top Odds: {all_p[0]['o1']:.1f}% vs {all_p[0]['o2']:.1f}%"
+                    elif row['match_type'] == "Singles" and len(players) == 2:
+                        booking_rank_df = singles_rank_df
+                        if all(p in booking_rank_df["Player"].values for p in players):
+                            o1, o2 = suggest_singles_odds(players, booking_rank_df)
+                            pairing_suggestion = f"<div><strong>Odds:</strong> {players[0]} ({o1:.1f}%) vs {players[1]} ({o2:.1f}%)</div>"
+                            plain_suggestion = f"Odds: {o1:.1f}% vs {o2:.1f}%"
+                except: pass
+
+                court_url = court_map.get(row['court_name'], "#")
+                share_msg = f"*Game Booking:* Date: {row['date']} {row['time']} | Court: {row['court_name']} | Players: {', '.join(players)} | {plain_suggestion}"
+                wa_link = f"https://api.whatsapp.com/send?text={urllib.parse.quote(share_msg)}"
+                ics_data, _ = generate_ics_for_booking(row, SPORT_TYPE, plain_suggestion)
+                ics_link = f"data:text/calendar;charset=utf-8,{urllib.parse.quote(ics_data)}" if ics_data else "#"
+
+                booking_html = f"""
+                <div class="booking-row" style='background: rgba(255,255,255,0.05); padding:15px; border-radius:10px; margin-bottom:15px; border-left:4px solid #ccff00;'>
+                    <div style="display:flex; justify-content:space-between; align-items:center;">
+                        <span style="color:#ccff00; font-weight:bold; font-size:1.1em;">{row['date']} at {row['time']}</span>
+                        <span style="font-size:0.8em; background:#ccff00; color:#000; padding:2px 8px; border-radius:4px; font-weight:bold;">{row['match_type']}</span>
+                    </div>
+                    <div style="margin-top:8px;">🏟️ Court: <a href="{court_url}" target="_blank" style="color:#ccff00; text-decoration:none; font-weight:bold;">{row['court_name']}</a></div>
+                    <div style="margin-top:5px; font-size:0.95em;">👥 Players: {players_str}</div>
+                    <div style="font-size:0.85em; color:#aaa; margin-top:3px;">⏳ Standby: {standby_str}</div>
+                    <div style="margin-top:10px; padding-top:10px; border-top:1px solid rgba(255,255,255,0.1);">
+                        {pairing_suggestion}
+                    </div>
+                    <div style="margin-top:15px; display:flex; gap:20px; align-items:center;">
+                        <a href="{wa_link}" target="_blank" style="text-decoration:none; display:flex; align-items:center; gap:5px; color:#25D366; font-weight:bold;">
+                            <img src="https://upload.wikimedia.org/wikipedia/commons/6/6b/WhatsApp.svg" width="20"> WhatsApp
+                        </a>
+                        <a href="{ics_link}" download="booking.ics" style="text-decoration:none; display:flex; align-items:center; gap:5px; color:#ccff00; font-weight:bold;">
+                            📅 Calendar
+                        </a>
+                    </div>
+                </div>
+                """
+                st.markdown(booking_html, unsafe_allow_html=True)
+                if row['screenshot_url']:
+                    with st.expander("📸 View Screenshot", expanded=False, icon="➡️"):
+                        st.image(row['screenshot_url'], use_container_width=True)
+
+    if st.session_state.is_admin and not st.session_state.bookings_df.empty:
+        with st.expander("Manage Existing Bookings", expanded=False, icon="➡️"):
+            for idx, row in st.session_state.bookings_df.iterrows():
+                c1, c2 = st.columns([4, 1])
+                c1.write(f"{row['date']} {row['time']} - {row['court_name']}")
+                if c2.button("Delete", key=f"del_b_{row['booking_id']}"):
+                    delete_booking_from_db(row['booking_id']); st.rerun()
+
+with tabs[5], tracing.span("tab Hall of Fame", tracing.RENDER): display_hall_of_fame()
+
+if st.session_state.is_admin:
+    with tabs[6], tracing.span("tab Chapter Settings", tracing.RENDER):
+        st.header("Settings")
+        with st.form("sets"):
+            st.subheader("Chapter Info")
+            current_loc = st.session_state.chapter_config.get('location', DEFAULT_LOCATION)
+            try:
+                loc_index = list(LOCATION_TIMEZONES.keys()).index(current_loc)
+            except ValueError:
+                loc_index = 0
+            new_loc = st.selectbox("Chapter Location", options=list(LOCATION_TIMEZONES.keys()), index=loc_index)
+
+            st.subheader("Ranking Systems")
+            current_ranking_systems = st.session_state.chapter_config.get("ranking_systems", {})
+            ranking_systems = {}
+            for rs in ["Elo (Hybrid)", "Points", RATING_NAME]:
+                ranking_systems[rs] = st.toggle(rs, value=current_ranking_systems.get(rs, False))
+
+            st.subheader("Match Type Settings")
+            current_match_settings = st.session_state.chapter_config.get("match_type_settings", get_default_config()["match_type_settings"])
+            match_type_settings = {}
+            set_options = ["Single Set", "Best of 3", "Best of 5"]
+
+            for mt in ["Singles", "Doubles", "Mixed Doubles"]:
+                st.markdown(f"--- \n**{mt}**")
+                cols = st.columns([1, 1, 1, 2])
+                mt_config = current_match_settings.get(mt, {"enabled": False, "win_points": 0, "loss_points": 0, "min_sets": "Best of 3"})
+                enabled = cols[0].checkbox("Enabled", value=mt_config.get("enabled", False), key=f"en_edit_{mt}")
+                win_points = cols[1].number_input("Win Pts", value=mt_config.get("win_points", 0), min_value=0, key=f"wp_edit_{mt}")
+                loss_points = cols[2].number_input("Loss Pts", value=mt_config.get("loss_points", 0), min_value=0, key=f"lp_edit_{mt}")
+                
+                try:
+                    set_index = set_options.index(mt_config.get("min_sets", "Best of 3"))
+                except ValueError:
+                    set_index = 1 # Default to "Best of 3"
+                
+                min_sets = cols[3].selectbox("Min Sets", options=set_options, index=set_index, key=f"ms_edit_{mt}")
+                
+                match_type_settings[mt] = {
+                    "enabled": enabled,
+                    "win_points": win_points,
+                    "loss_points": loss_points,
+                    "min_sets": min_sets
+                }
+
+            img_req = st.checkbox("Require Match Photo Evidence?", value=st.session_state.chapter_config.get("match_image_required", True))
+            allow_ties = st.checkbox("Allow Tie Matches?", value=st.session_state.chapter_config.get("allow_ties", False))
+
+            if st.form_submit_button("Save Settings"):
+                # Ensure at least one ranking system is enabled
+                if not any(ranking_systems.values()):
+                    st.error("At least one Ranking System must be enabled.")
+                else:
+                    st.session_state.chapter_config['location'] = new_loc
+                    st.session_state.chapter_config['ranking_systems'] = ranking_systems
+                    st.session_state.chapter_config['match_type_settings'] = match_type_settings
+                    st.session_state.chapter_config['match_image_required'] = img_req
+                    st.session_state.chapter_config['allow_ties'] = allow_ties
+                    save_chapter_config(st.session_state.current_chapter['id'], st.session_state.chapter_config)
+                    st.success("Settings saved successfully!")
+                    st.rerun()
+        
+        st.subheader("Branding")
+        ut = st.file_uploader("Chapter Title Graphic", type=["png", "jpg"])
+        if ut and st.button("Upload Graphic"):
+            path = save_remote_image(ut, f"title_{st.session_state.current_chapter['id']}", "title")
+            conn = get_connection()
+            with conn.cursor() as cur:
+                 cur.execute("UPDATE chapters SET title_image_url = %s WHERE id = %s", (path, st.session_state.current_chapter['id']))
+            conn.commit()
+            conn.close()
+            st.success("Updated"); st.rerun()
+        
+        
+        st.subheader("Player Management")
+        with st.expander("Manage player roles and passwords", expanded=True, icon="➡️"):
+            if not st.session_state.players_df.empty:
+                # Password Reset
+                st.markdown("#### Manage Player Password")
+                players = st.session_state.players_df["name"].tolist()
+                selected_player = st.selectbox("Select Player", players, key="player_select_for_password")
+                
+                new_pw_input = st.text_input("New Password", placeholder="Enter manual password", key="new_pw_manual")
+                
+                col_p1, col_p2 = st.columns(2)
+                
+                if col_p1.button("Set Manual Password", use_container_width=True):
+                    if new_pw_input:
+                        if update_player_password(selected_player, new_pw_input):
+                            st.success(f"Password for {selected_player} updated to: `{new_pw_input}`")
+                            load_players() # Refresh player data
+                        else:
+                            st.error("Failed to update password.")
+                    else:
+                        st.warning("Please enter a password first.")
+
+                if col_p2.button("Generate Random Password", use_container_width=True):
+                    new_password = str(uuid.uuid4().hex)[:8]
+                    if update_player_password(selected_player, new_password):
+                        st.success(f"New random password for {selected_player}: `{new_password}`")
+                        load_players() # Refresh player data
+                    else:
+                        st.error("Failed to update password.")
+                st.divider()
+
+                # Display all player passwords for admin
+                st.markdown("#### Current Player Passwords")
+                for i, r in st.session_state.players_df.iterrows():
+                    st.code(f"{r['name']}: {r['password']}")
+                st.divider()
+
+                # Manage Player Roles
+                st.markdown("#### Manage Player Roles")
+                for idx, player in st.session_state.players_df.iterrows():
+                    is_player_admin = player.get('is_admin', False)
+                    new_status = st.toggle(f"Promote {player['name']} to Admin", value=is_player_admin, key=f"admin_toggle_{player['name']}")
+                    
+                    if new_status != is_player_admin:
+                        st.session_state.players_df.loc[idx, 'is_admin'] = new_status
+                        save_players(st.session_state.players_df)
+                        st.success(f"{player['name']}'s admin status updated.")
+                        st.rerun()
+            else:
+                st.info("No players to manage yet.")
+        
+        st.subheader("League Control")
+        with st.expander("New Season or Download League Data", expanded=True, icon="⚙️"):
+            c1, c2 = st.columns(2)
+            with c1:
+                zip_data = get_league_data_zip(st.session_state.current_chapter['id'])
+                if zip_data:
+                    st.download_button(
+                        label="Download League Data (.zip)",
+                        data=zip_data,
+                        file_name=f"{st.session_state.current_chapter['name']}_data.zip",
+                        mime="application/zip",
+                        use_container_width=True,
+                        key="dl_btn_league"
+                    )
+            with c2:
+                st.markdown("⚠️ **Danger Zone**")
+                season_name = st.text_input("Season name", value=f"Season ending {datetime.now().strftime('%b %Y')}", key="season_name")
+                confirm_reset = st.checkbox("Confirm: Archive all matches and clear bookings for this Chapter?", key="confirm_reset_chk")
+                if st.button("Archive Season & Start New", type="primary", use_container_width=True, disabled=not confirm_reset, help=f"Matches move to the season archive and bookings are deleted. Players start the new season from their {RATING_NAME} rating."):
+                    if archive_season(st.session_state.current_chapter['id'], rank_df, season_name.strip() or "Season"):
+                        st.success("Season archived! Ratings carried over, new season started.")
+                        time.sleep(1)
+                        st.rerun()
+
+        st.subheader("Join Requests")
+        with st.expander("View and manage guest join requests", expanded=True, icon="➡️"):
+            jr_df = load_join_requests(st.session_state.current_chapter['id'])
+            if not jr_df.empty:
+                for idx, r in jr_df.iterrows():
+                    with st.container(border=True):
+                        c1, c2 = st.columns([4, 1])
+                        with c1:
+                            st.markdown(f"**From:** {r['name']}")
+                            st.markdown(f"**Message:** {r['message']}")
+                            try:
+                                dt = datetime.fromisoformat(r['created_at']).strftime("%d %b %Y, %H:%M")
+                                st.caption(f"Sent on: {dt}")
+                            except: pass
+                        with c2:
+                            if st.button("Delete", key=f"del_jr_{r['id']}"):
+                                if delete_join_request_db(r['id']):
+                                    st.success("Deleted")
+                                    st.rerun()
+            else:
+                st.info("No pending join requests.")
+
+
+if st.session_state.is_admin or st.session_state.is_master_admin:
+    render_performance_panel()
+
+if st.button("Switch Chapter" if not st.session_state.is_master_admin else "Return Master"):
+    st.session_state.current_chapter = None
+    st.session_state.chapter_config = {}
+    if not st.session_state.is_master_admin: st.session_state.is_admin = False
+    st.session_state.can_write = False
+    st.session_state.temp_selected_chapter = None
+    st.query_params.clear()
+    st.rerun()
+st.markdown("----")
+st.info("Cloud Version running with Neon (PostgreSQL) & GitHub.")
+render_footer()
@@ -0,0 +1 @@
+"""Shared core of the Patch Moint Tennis, Pickleball and Padel leagues."""
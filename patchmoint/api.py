@@ -0,0 +1,284 @@
+"""Read-only JSON API for bots, screens and other club tools.
+
+Runs next to the app and reads the same tables through the same caches:
+frames come from ``patchmoint.context`` (``framecache``, then
+``sharedcache`` when configured), the ``notify`` listener drops them when
+the app writes, and rankings come from the ranking engine.
+
+    python -m patchmoint.api "$NEON_DATABASE_URL" --port 8600
+
+    GET /chapters/<id>/rankings[?view=all|doubles|singles]
+    GET /chapters/<id>/matches[?cursor=<next_cursor>&limit=50]   newest first
+    GET /chapters/<id>/bookings                                  upcoming
+
+Every response carries an ETag built from the versions of the tables it
+was made from (and, for rankings, the day: the participation badges
+depend on it). A poll sending ``If-None-Match`` with the current ETag gets
+``304 Not Modified`` without any table being read or ranking computed.
+The versions are the shared ones when ``--shared-cache`` is set, else this
+process's ``framecache`` counters under an epoch that changes whenever the
+listener reconnects (notifications sent while it was away are lost, so
+the counters no longer say what changed). While the listener is not
+connected the counters say nothing at all: responses then carry no ETag
+and are built afresh.
+"""
+import argparse
+import base64
+import binascii
+import json
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from patchmoint import context, framecache, notify, sharedcache
+from patchmoint.config import canonical_config, get_timezone
+from patchmoint.rankings import calculate_rankings
+from patchmoint.sports import TENNIS, get_sport
+
+DEFAULT_PORT = 8600
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+BOOKING_GRACE = timedelta(hours=4)  # Bookings stay listed this long after they start, as in the app
+VIEWS = {"all": None, "doubles": ["Doubles", "Mixed Doubles"], "singles": ["Singles"]}
+MATCH_FIELDS = ["match_id", "date", "match_type", "team1_player1", "team1_player2", "team2_player1", "team2_player2",
+                "set1", "set2", "set3", "winner", "match_image_url"]
+BOOKING_FIELDS = ["booking_id", "date", "time", "match_type", "court_name", "player1", "player2", "player3", "player4",
+                  "standby_player", "screenshot_url"]
+
+# Local versions restart at 0 with the process and miss changes while the listener
+# reconnects: the epoch keeps an ETag from before either from matching after
+_EPOCH = uuid.uuid4().hex[:8]
+_ROUTE = re.compile(r"^/chapters/([^/]+)/(rankings|matches|bookings)/?$")
+_engine = None
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def chapter_ids():
+    with _engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT id FROM chapters ORDER BY id"))]
+
+
+def frame(chapter_id, table):
+    """``table`` of ``chapter_id`` through the process and shared caches (see patchmoint.context)."""
+    return context.load(chapter_id, _engine.raw_connection, (table,))[table]
+
+
+def etag(chapter_id, *tables, extra=""):
+    """The ETag of a response made from ``tables``; None when no versions can vouch for it."""
+    shared = sharedcache.versions(chapter_id, tables)
+    if shared is not None:
+        return f'W/"s-{".".join(map(str, shared))}{extra}"'
+    if not framecache.serving():
+        return None
+    versions = ".".join(str(framecache.version(chapter_id, t)) for t in tables)
+    return f'W/"{_EPOCH}-{versions}{extra}"'
+
+
+def chapter(chapter_id):
+    """``(name, sport, migrated config)`` of the chapter; NotFound if there is none."""
+    rows = frame(chapter_id, "chapters")
+    if rows.empty:
+        raise NotFound(f"no chapter {chapter_id}")
+    row = rows.iloc[0]
+    # Legacy chapters without a sport are Tennis
+    sport = (get_sport(row["sport"]) if pd.notna(row["sport"]) else None) or TENNIS
+    return row["name"], sport, canonical_config(row["config"] if isinstance(row["config"], (dict, str)) else None, sport)[0]
+
+
+def _records(df, fields=None):
+    df = df if fields is None else df.reindex(columns=fields)
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+def _dump(body):
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@lru_cache(maxsize=256)
+def rankings_body(chapter_id, view, tag):
+    """The rankings response; ``tag`` (the ETag) only keys the cache."""
+    name, sport, config = chapter(chapter_id)
+    matches = frame(chapter_id, "matches")
+    if VIEWS[view] is not None:
+        matches = matches[matches["match_type"].isin(VIEWS[view])]
+    table = pd.DataFrame()
+    if not matches.empty:
+        table = calculate_rankings(matches, frame(chapter_id, "players"), config, sport)
+    return _dump({"chapter": chapter_id, "name": name, "sport": sport.name, "view": view, "rankings": _records(table)})
+
+
+def encode_cursor(date, match_id):
+    return base64.urlsafe_b64encode(json.dumps([date, match_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        date, match_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(date), str(match_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise BadRequest("invalid cursor")
+
+
+@lru_cache(maxsize=256)
+def matches_body(chapter_id, cursor, limit, tag):
+    """One page of matches, newest first; ``cursor`` is the previous page's ``next_cursor``."""
+    chapter(chapter_id)
+    matches = frame(chapter_id, "matches")
+    keys = pd.DataFrame({"date": matches["date"].fillna("").astype(str), "match_id": matches["match_id"].astype(str)})
+    order = keys.sort_values(["date", "match_id"], ascending=False).index
+    if cursor:
+        date, match_id = decode_cursor(cursor)
+        # Keyset paging: strictly after the cursor's (date, match_id) in the descending order
+        after = (keys["date"] < date) | ((keys["date"] == date) & (keys["match_id"] < match_id))
+        order = order[after[order].to_numpy()]
+    page = matches.loc[order[:limit]]
+    more = len(order) > limit
+    next_cursor = encode_cursor(keys.at[order[limit - 1], "date"], keys.at[order[limit - 1], "match_id"]) if more else None
+    return _dump({"chapter": chapter_id, "matches": _records(page, MATCH_FIELDS), "next_cursor": next_cursor})
+
+
+@lru_cache(maxsize=256)
+def bookings_body(chapter_id, tag):
+    """Bookings that have not finished (``BOOKING_GRACE``), soonest first; never deletes."""
+    _, _, config = chapter(chapter_id)
+    bookings = frame(chapter_id, "bookings")
+    if not bookings.empty:
+        tz_name = get_timezone(config)
+        start = pd.to_datetime(bookings["date"].astype(str) + " " + bookings["time"].astype(str), errors="coerce")
+        cutoff = (pd.Timestamp.now(tz=tz_name) - BOOKING_GRACE).tz_localize(None)
+        bookings = bookings[start >= cutoff].assign(_start=start).sort_values("_start")
+    return _dump({"chapter": chapter_id, "bookings": _records(bookings, BOOKING_FIELDS)})
+
+
+def reconnected():
+    """The listener is back: what was cached may have missed changes, so start a new epoch without it."""
+    global _EPOCH
+    framecache.clear()
+    _EPOCH = uuid.uuid4().hex[:8]
+    for body in (rankings_body, matches_body, bookings_body):
+        body.cache_clear()
+
+
+def _body(cached, tag, *args):
+    # Without an ETag nothing keys the cache: build the body afresh
+    return cached(*args, tag) if tag else cached.__wrapped__(*args, tag)
+
+
+def respond(path, query):
+    """``(ETag, body builder)`` for a request; the builder only runs when the ETag did not match."""
+    route = _ROUTE.match(path)
+    if not route:
+        raise NotFound(f"no route {path}")
+    chapter_id, resource = route.groups()
+    if resource == "rankings":
+        view = query.get("view", ["all"])[0].lower()
+        if view not in VIEWS:
+            raise BadRequest(f"view must be one of {', '.join(VIEWS)}")
+        tag = etag(chapter_id, "chapters", "players", "matches", extra=f"-{datetime.now().date():%Y%m%d}-{view}")
+        return tag, lambda: _body(rankings_body, tag, chapter_id, view)
+    if resource == "matches":
+        cursor = query.get("cursor", [""])[0]
+        if cursor:
+            decode_cursor(cursor)
+        try:
+            limit = min(max(int(query.get("limit", [PAGE_SIZE])[0]), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            raise BadRequest("limit must be a number")
+        tag = etag(chapter_id, "chapters", "matches", extra=f"-{limit}-{cursor}")
+        return tag, lambda: _body(matches_body, tag, chapter_id, cursor, limit)
+    tag = etag(chapter_id, "chapters", "bookings", extra=f"-{datetime.now():%Y%m%d%H}")
+    return tag, lambda: _body(bookings_body, tag, chapter_id)
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "PatchMointAPI/1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        try:
+            tag, build = respond(url.path, parse_qs(url.query))
+            if tag and tag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                self._send(HTTPStatus.NOT_MODIFIED, b"", tag, send_body=False)
+                return
+            self._send(HTTPStatus.OK, build(), tag, send_body)
+        except NotFound as e:
+            self._send(HTTPStatus.NOT_FOUND, _dump({"error": str(e)}), None, send_body)
+        except BadRequest as e:
+            self._send(HTTPStatus.BAD_REQUEST, _dump({"error": str(e)}), None, send_body)
+        except Exception as e:
+            self.log_error("%s failed: %r", self.path, e)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, _dump({"error": "internal error"}), None, send_body)
+
+    def _send(self, status, body, tag, send_body):
+        self.send_response(status)
+        if tag:
+            self.send_header("ETag", tag)
+            # Clients may keep the response but must revalidate it: that is the cheap 304 above
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def connect(dsn, shared_cache_url=None):
+    """Read chapters from ``dsn`` (and the shared cache at ``shared_cache_url``)."""
+    global _engine
+    if dsn.startswith("postgres://"):
+        dsn = dsn.replace("postgres://", "postgresql://", 1)
+    _engine = create_engine(dsn)
+    sharedcache.configure(shared_cache_url)
+    return dsn
+
+
+def serve(dsn, host="0.0.0.0", port=DEFAULT_PORT, listen_dsn=None, shared_cache_url=None):
+    """Run the API until interrupted."""
+    dsn = connect(dsn, shared_cache_url)
+    framecache.gate(notify.start_listener(listen_dsn or dsn, framecache.bump, reconnected).connected)
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dsn", help="Postgres connection string")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--listen-dsn", help="direct (non-pooled) connection string for LISTEN, if the DSN is pooled")
+    parser.add_argument("--shared-cache", metavar="URL", help="Redis URL of the cache shared with the app replicas")
+    args = parser.parse_args(argv)
+    serve(args.dsn, args.host, args.port, args.listen_dsn, args.shared_cache)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
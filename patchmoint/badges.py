@@ -0,0 +1,29 @@
+"""Badge rules shown on the ranking and profile cards."""
+
+COURT_DOMINATOR = "👑 Court Dominator"
+
+
+def player_badges(matches, wins, streak, consistency, clutch_pct, clutch_matches,
+                  giant_kills=0, comebacks=0, max_daily_matches=0, sets_won=0, tb_wins=0,
+                  last_active=None, today=None):
+    """Badges earned by one player; ``last_active`` and ``today`` are datetimes."""
+    badges = []
+    if streak >= 3: badges.append("🔥 Hot Hand")
+    elif streak <= -3: badges.append("❄️ Cold Snap")
+    if matches >= 5:
+        if consistency < 1.5: badges.append("🤖 Machine")
+        if clutch_pct > 66 and clutch_matches >= 3: badges.append("🧊 Clutch")
+        if (wins/matches) > 0.75: badges.append("🦁 Dominant")
+
+    if giant_kills > 0: badges.append("🛡️ Giant Killer")
+    if comebacks > 0: badges.append("🔄 Comeback Kid")
+    if max_daily_matches >= 3: badges.append("⛓️ Iron Player")
+    if sets_won >= 20: badges.append("🏆 Set Collector")
+    if tb_wins >= 3: badges.append("🎯 Sniper")
+    if matches >= 50: badges.append("🎖️ Veteran")
+    if matches >= 100: badges.append("💯 Century Club")
+
+    # Participation Badge (Played in last 7 days)
+    if last_active is not None and today is not None and (today - last_active).days <= 7:
+        badges.append("🌱 Participation")
+    return badges
@@ -0,0 +1,174 @@
+"""Bulk result entry: check a whole session's matches in one pass.
+
+After a club session an admin pastes the results as CSV (or types them
+into the grid) instead of posting them one at a time:
+
+    date,match_type,team1_player1,team1_player2,team2_player1,team2_player2,set1,set2,set3,winner
+    2026-10-18,Doubles,Ann,Bea,Cat,Dee,6-4,3-6,Super Tie Break 10-7,Team 1
+    2026-10-18,Singles,Ann,,Cat,,6-2,6-3,,
+
+``validate`` checks every row at once against the roster, the chapter's
+``match_type_settings`` and the sport's score grammar, and returns the
+rows ready to insert plus one line per problem. A blank match type is
+taken from the number of players, a blank winner from the sets.
+"""
+import functools
+import io
+import itertools
+import re
+
+import pandas as pd
+
+from patchmoint.config import MATCH_TYPES
+from patchmoint.scoring import parse_set
+
+PLAYER_COLUMNS = ["team1_player1", "team1_player2", "team2_player1", "team2_player2"]
+SET_COLUMNS = ["set1", "set2", "set3"]
+COLUMNS = ["date", "match_type", *PLAYER_COLUMNS, *SET_COLUMNS, "winner"]
+CSV_HEADER = ",".join(COLUMNS)
+PROBLEM_COLUMNS = ["Row", "Problem"]
+VISITOR = "Visitor"  # Stand-in for a guest, doubles only (as in Post Result)
+WINNERS = ["Team 1", "Team 2", "Tie"]
+
+_MATCH_TYPE_NAMES = {**{mt.lower(): mt for mt in MATCH_TYPES}, "mixed": "Mixed Doubles"}
+_WINNER_NAMES = {"team 1": "Team 1", "t1": "Team 1", "1": "Team 1",
+                 "team 2": "Team 2", "t2": "Team 2", "2": "Team 2", "tie": "Tie"}
+
+
+def empty_grid(date, rows=6):
+    """Blank rows for the grid editor, dated ``date``."""
+    grid = pd.DataFrame("", index=range(rows), columns=COLUMNS)
+    grid["date"] = date
+    return grid
+
+
+def normalize(df, label="Row", first=1):
+    """``df`` as ``COLUMNS`` of stripped text, without rows that name no player and no set.
+
+    Rows are labelled ``"<label> <n>"`` counting from ``first``, so
+    problems point at the CSV line or grid row they came from.
+    """
+    df = df.reindex(columns=COLUMNS).fillna("").astype(str)
+    df = df.apply(lambda column: column.str.strip())
+    df.index = [f"{label} {n}" for n in range(first, first + len(df))]
+    return df[(df[PLAYER_COLUMNS + SET_COLUMNS] != "").any(axis=1)]
+
+
+def parse_csv(text):
+    """Pasted CSV with a header row as ``normalize``-d rows; ValueError if it cannot be read."""
+    try:
+        df = pd.read_csv(io.StringIO(text.strip()), dtype=str, keep_default_na=False, skipinitialspace=True)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        raise ValueError(f"Could not read the CSV: {e}")
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    unknown = [c for c in df.columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column(s) {', '.join(unknown)}; expected {CSV_HEADER}")
+    # Line 1 is the header
+    return normalize(df, "Line", 2)
+
+
+@functools.lru_cache(maxsize=None)
+def _custom_patterns(sport):
+    return [(re.compile(re.escape(c.template).replace(r"\{\}", r"(\d+)")), c) for c in sport.custom_scores]
+
+
+def valid_score(score, sport):
+    """Whether ``score`` is one of the sport's set scores or a valid custom entry (e.g. "Tie Break 9-7")."""
+    if score in sport.valid_scores:
+        return True
+    for pattern, custom in _custom_patterns(sport):
+        match = pattern.fullmatch(score)
+        if match and custom.is_valid(int(match[1]), int(match[2])):
+            return True
+    return False
+
+
+def _set_winner(score):
+    parsed = parse_set(score)
+    if parsed is None or parsed.t1_games == parsed.t2_games:
+        return 0
+    return 1 if parsed.t1_games > parsed.t2_games else -1
+
+
+def validate(df, roster, config, sport, add_players=False):
+    """``(matches, problems, new_players)`` for ``normalize``-d rows.
+
+    ``matches`` holds the rows without problems, cleaned up for saving.
+    ``problems`` has a ``Row`` / ``Problem`` line for everything wrong.
+    Names not in ``roster`` are problems unless ``add_players``, when they
+    come back sorted as ``new_players`` instead.
+    """
+    problems = []
+    if df.empty:
+        return df, pd.DataFrame(problems, columns=PROBLEM_COLUMNS), []
+
+    def flag(mask, message):
+        # message: one text for every flagged row, or a Series of texts by row
+        for row in mask.index[mask]:
+            problems.append((row, message if isinstance(message, str) else message[row]))
+
+    blank = df == ""
+
+    dates = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
+    flag(dates.isna(), "date must look like 2026-10-18")
+
+    # Match type: as typed, else singles when both second players are missing
+    singles_by_players = blank["team1_player2"] & blank["team2_player2"]
+    inferred = singles_by_players.map({True: "Singles", False: "Doubles"})
+    match_type = df["match_type"].str.lower().map(_MATCH_TYPE_NAMES).where(~blank["match_type"], inferred)
+    flag(match_type.isna(), "match type must be Singles, Doubles or Mixed Doubles")
+    settings = config.get("match_type_settings", {})
+    enabled = match_type.map(lambda mt: bool(settings.get(mt, {}).get("enabled"))).astype(bool)
+    flag(match_type.notna() & ~enabled, match_type.astype(str) + " matches are not enabled in this chapter")
+    singles = match_type == "Singles"
+
+    # Players: two for singles, four for doubles, each once, all on the roster
+    flag(blank["team1_player1"] | blank["team2_player1"], "both teams need a player")
+    flag(~singles & match_type.notna() & (blank["team1_player2"] | blank["team2_player2"]), "doubles need four players")
+    flag(singles & ~singles_by_players, "singles have one player per team")
+    repeated = pd.Series(False, index=df.index)
+    for a, b in itertools.combinations(PLAYER_COLUMNS, 2):
+        repeated |= (df[a] == df[b]) & ~blank[a] & (df[a] != VISITOR)
+    flag(repeated, "a player appears twice")
+    flag(singles & (df[["team1_player1", "team2_player1"]] == VISITOR).any(axis=1), "Visitor can only play doubles")
+    names = df[PLAYER_COLUMNS].where(~blank & (df[PLAYER_COLUMNS] != VISITOR))
+    unknown = names.where(~names.isin(set(roster)))
+    new_players = sorted(set(unknown.stack().dropna()))
+    if not add_players:
+        has_unknown = unknown.notna().any(axis=1)
+        message = unknown.apply(lambda r: "not on the roster: " + ", ".join(r.dropna()), axis=1) if has_unknown.any() else ""
+        flag(has_unknown, message)
+        new_players = []
+
+    # Sets: the sport's grammar, played in order, one set for single-set formats
+    scores = df[SET_COLUMNS].stack()
+    valid = {score: valid_score(score, sport) for score in scores[scores != ""].unique()}
+    for column in SET_COLUMNS:
+        bad = ~blank[column] & ~df[column].map(valid).fillna(False).astype(bool)
+        flag(bad, f"{column} '" + df[column] + f"' is not a {sport.name} score")
+    flag(blank["set1"], "set1 is missing")
+    flag(blank["set2"] & ~blank["set3"], "set3 without set2")
+    single_set = match_type.map(lambda mt: settings.get(mt, {}).get("min_sets") == "Single Set").astype(bool)
+    flag(single_set & ~(blank["set2"] & blank["set3"]), "this match type is a single set")
+
+    # Winner: as typed, else whoever won more sets
+    tally = sum(df[column].map(_set_winner) for column in SET_COLUMNS)
+    by_sets = pd.Series(None, index=df.index, dtype=object).mask(tally > 0, "Team 1").mask(tally < 0, "Team 2")
+    allow_ties = config.get("allow_ties", False)
+    if allow_ties:
+        by_sets = by_sets.mask(tally == 0, "Tie")
+    winner = df["winner"].str.lower().map(_WINNER_NAMES).where(~blank["winner"], by_sets)
+    flag(~blank["winner"] & winner.isna(), "winner must be Team 1, Team 2 or Tie")
+    flag(blank["winner"] & winner.isna(), "the sets are level: give the winner")
+    flag((winner == "Tie") & ~allow_ties, "ties are not allowed in this chapter")
+    flag(~blank["winner"] & winner.notna() & by_sets.notna() & (winner != by_sets) & (tally != 0),
+         "the winner does not match the sets")
+
+    order = {row: i for i, row in enumerate(df.index)}
+    problems = pd.DataFrame(problems, columns=PROBLEM_COLUMNS).sort_values("Row", key=lambda rows: rows.map(order), kind="stable")
+    ok = ~df.index.isin(problems["Row"])
+    # Singles are saved without second players, as Post Result saves them
+    partners = {c: df.loc[ok, c].astype(object).where(df.loc[ok, c] != "", None) for c in ("team1_player2", "team2_player2")}
+    matches = df[ok].assign(date=dates[ok].dt.strftime("%Y-%m-%d"), match_type=match_type[ok], winner=winner[ok], **partners)
+    return matches, problems, new_players
@@ -0,0 +1,363 @@
+"""HTML for the ranking and match cards.
+
+Every rerun renders the same cards again, so the builders are memoized:
+a card is keyed on its entity and exactly the fields it shows, and an
+unchanged card costs a dictionary lookup.
+"""
+import functools
+import math
+from types import SimpleNamespace
+
+import pandas as pd
+
+from patchmoint.scoring import SET, SUPER_TIE_BREAK, TIE_BREAK, parse_set
+from patchmoint.sports import DEFAULT_AVATAR
+
+
+FRAGMENT_CACHE_SIZE = 4096
+_NAN = float("nan")  # One NaN object, so cache keys holding NaN compare equal
+
+
+def _hashable(value):
+    if isinstance(value, float) and value != value:
+        return _NAN
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _memoized(*fields):
+    """Memoize a builder of one row (a mapping) on the ``fields`` it reads, the entity's first."""
+    def decorator(build):
+        @functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+        def cached(items):
+            return build(dict(items))
+
+        @functools.wraps(build)
+        def wrapper(row):
+            return cached(tuple((f, _hashable(row[f])) for f in fields if f in row))
+
+        wrapper.cache_info = cached.cache_info
+        return wrapper
+    return decorator
+
+
+def get_img_src(path_or_url):
+    if path_or_url:
+        return path_or_url
+    return DEFAULT_AVATAR
+
+
+def badges_html(badges):
+    return "".join([f"<span class='badge'>{b}</span>" for b in badges])
+
+
+def podium_html(top3):
+    """The top-three podium; ``top3`` holds the first three ranking records."""
+    return _podium_html(tuple((p['Player'], p['Profile'], _hashable(p['Score'])) for p in top3[:3]))
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _podium_html(places):
+    top3 = [{"Player": player, "Profile": profile, "Score": score} for player, profile, score in places]
+    pod_order = [
+        {"p": top3[1], "color": "#C0C0C0", "icon": "🥈", "height": "210px"},
+        {"p": top3[0], "color": "#ccff00", "icon": "🥇", "height": "250px"},
+        {"p": top3[2], "color": "#CD7F32", "icon": "🥉", "height": "190px"}
+    ]
+
+    pod_html = '<div style="display:flex; align-items:flex-end; gap:12px; margin-bottom:40px; justify-content:center;">'
+    for item in pod_order:
+        p = item["p"]
+        pod_html += f"""
+        <div style="flex:1; background:rgba(255,255,255,0.08); border-radius:15px; border-bottom:4px solid {item['color']}; padding:15px; text-align:center; height:{item['height']}; display:flex; flex-direction:column; justify-content:center;">
+            <div style="font-size:1.5em; margin-bottom:5px;">{item['icon']}</div>
+            <div class="glow-square" style="border-color:{item['color']}; width:80px; height:80px; box-shadow: 0 0 10px {item['color']}66;">
+                <a href="{get_img_src(p['Profile'])}" target="_blank">
+                    <img src="{get_img_src(p['Profile'])}">
+                </a>
+            </div>
+            <div style="color:white; font-weight:bold; font-size:0.9em; margin-top:10px; white-space:nowrap; overflow:hidden; text-overflow:ellipsis;">{p['Player']}</div>
+            <div style="color:{item['color']}; font-weight:bold; font-size:1.2em;">{p['Score']:.1f}</div>
+        </div>"""
+    pod_html += '</div>'
+    return pod_html
+
+
+@_memoized('Player', 'Rank', 'Profile', 'Score', 'Label', 'Last Change', 'Badges')
+def ranking_player_html(row):
+    """Rank, picture, name, score and badges of one ranking row."""
+    ch = row.get('Last Change', 0)
+    cc = "#00ff88" if ch >= 0 else "#ff4b4b"
+    trend_arrow = "▲" if ch > 0 else "▼" if ch < 0 else "—"
+    cd_html = f"<span style='color:{cc}; font-size:0.8em;'>{trend_arrow} {abs(ch)}</span>" if row['Label'] != 'Points' else ""
+    return f"""
+                        <div style="text-align:center;">
+                            <div style="font-size:1.8em; font-weight:bold; color:#ccff00; line-height:1;">🏆 #{row['Rank']}</div>
+                            <div class="glow-square" style="margin-top:8px;">
+                                <a href="{get_img_src(row['Profile'])}" target="_blank">
+                                    <img src="{get_img_src(row['Profile'])}">
+                                </a>
+                            </div>
+                            <div style="font-weight:bold; color:white; font-size:1.1em; margin-top:10px;">{row['Player']}</div>
+                            <div style="color:#ccff00; font-size:1.1em; font-weight:bold;">{row['Score']:.2f} {cd_html}</div>
+                            <div style="margin-top:5px;">{badges_html(row.get('Badges', []))}</div>
+                        </div>
+                        """
+
+
+@_memoized('Player', 'Win %', 'Record', 'Clutch Factor', 'Label', 'Score', 'Game Diff Avg', 'Games Won',
+           'Consistency Index', 'Singles Perf', 'Doubles Perf')
+def ranking_stats_html(row):
+    """The nine-tile stats grid of one ranking row."""
+    return f"""
+                        <div style="display:grid; grid-template-columns:1fr 1fr 1fr; gap:8px; margin-top:15px; align-items: stretch; height:100%;">
+                            <div style="border-left:3px solid #00FF88; background:rgba(0,255,136,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Win %</div><div style="color:#00FF88; font-weight:bold; font-size:1.0em;">{row['Win %']}%</div></div>
+                            <div style="border-left:3px solid #00C0F2; background:rgba(0,192,242,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Record</div><div style="color:#00C0F2; font-weight:bold; font-size:1.0em;">{row['Record']}</div></div>
+                            <div style="border-left:3px solid #FF4B4B; background:rgba(255,75,75,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Clutch</div><div style="color:#FF4B4B; font-weight:bold; font-size:1.0em;">{row.get('Clutch Factor', 0)}%</div></div>
+                            <div style="border-left:3px solid #ccff00; background:rgba(204,255,0,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">{row['Label']}</div><div style="color:#ccff00; font-weight:bold; font-size:1.2em;">{row.get('Score', 0)}</div></div>
+                            <div style="border-left:3px solid #FFA500; background:rgba(255,165,0,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">GDA</div><div style="color:#FFA500; font-weight:bold; font-size:1.0em;">{row.get('Game Diff Avg', 0):+.2f}</div></div>
+                            <div style="border-left:3px solid #FFFFFF; background:rgba(255,255,255,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Games Won</div><div style="color:#FFFFFF; font-weight:bold; font-size:1.0em;">{row.get('Games Won', 0)}</div></div>
+                            <div style="border-left:3px solid #9400D3; background:rgba(148,0,211,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Consistency</div><div style="color:#9400D3; font-weight:bold; font-size:1.0em;">{row.get('Consistency Index', 0):.2f}</div></div>
+                            <div style="border-left:3px solid #32CD32; background:rgba(50,205,50,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Singles Perf</div><div style="color:#32CD32; font-weight:bold; font-size:1.0em;">{row.get('Singles Perf', 0)}%</div></div>
+                            <div style="border-left:3px solid #1E90FF; background:rgba(30,144,255,0.05); padding:8px; border-radius:4px;"><div style="font-size:0.6em; color:#aaa; text-transform:uppercase;">Doubles Perf</div><div style="color:#1E90FF; font-weight:bold; font-size:1.0em;">{row.get('Doubles Perf', 0)}%</div></div>
+                        </div>
+                        """
+
+
+_FORM_COLORS = {"W": "#00FF88", "L": "#FF4B4B", "T": "#FFA500"}
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def form_guide_html(results):
+    """Recent-form dots of a ranking card; ``results`` is a tuple of "W", "L" and "T", newest first."""
+    dots = "".join(
+        f'<div style="width:30px; height:30px; border-radius:50%; background:{_FORM_COLORS[r]}22; border:2px solid {_FORM_COLORS[r]}; color:{_FORM_COLORS[r]}; display:flex; justify-content:center; align-items:center; font-weight:bold; font-size:0.8em; box-shadow:0 0 8px {_FORM_COLORS[r]}33;">{r}</div>'
+        for r in results
+    )
+    return f'<div style="display:flex; gap:12px; justify-content:center; margin-bottom:10px;">{dots}</div>'
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def standing_bar_html(percent_of_max):
+    """The league standing bar of a ranking card: the score as a share of the leader's."""
+    return f"""
+                    <div style="padding: 0 10px 10px 10px;">
+                        <div style="display:flex; justify-content:space-between; font-size:0.65em; color:#aaa; margin-bottom:4px;">
+                            <span style="letter-spacing:1px; font-weight:bold;">PLAYER POTENTIAL / LEAGUE STANDING</span>
+                            <span style="color:#ccff00; font-weight:bold;">{percent_of_max:.1f}%</span>
+                        </div>
+                        <div style="width:100%; height:6px; background:rgba(255,255,255,0.05); border-radius:10px; overflow:hidden; border:1px solid rgba(255,255,255,0.1);">
+                            <div style="width:{percent_of_max}%; height:100%; background:linear-gradient(90deg, #ccff00, #00FF88); border-radius:10px; box-shadow:0 0 12px #ccff00aa;"></div>
+                        </div>
+                    </div>
+                    """
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def profile_placeholder_html(player, profile):
+    """Picture and name of a player without stats yet, on the Player Profile tab."""
+    img_src = get_img_src(profile)
+    return (f'<div class="glow-square" style="width:80px; height:80px; margin:0 auto;"><a href="{img_src}" target="_blank"><img src="{img_src}"></a></div>'
+            f'<div style="text-align:center; font-weight:bold; color:white; margin-top:5px; font-size:0.9em;">{player}</div>')
+
+
+RADAR_CATEGORIES = ('Win Rate', 'Consistency', 'Dominance', 'Clutch', 'Experience')
+
+
+def radar_metrics(row):
+    """The five radar values of one ranking row, each on a 0-100 scale."""
+    consistency = max(0, 100 - (row.get('Consistency Index', 0) * 15))
+    dominance = max(0, min(100, 50 + (row.get('Game Diff Avg', 0) * 16)))
+    experience = min(100, row.get('Matches', 0) * 5)
+    values = (row.get('Win %', 0), consistency, dominance, row.get('Clutch Factor', 0), experience)
+    return tuple(round(float(v), 1) for v in values)
+
+
+_RADAR_CX, _RADAR_CY, _RADAR_RADIUS = 160, 108, 70
+
+
+def _radar_point(i, value):
+    # First axis straight up, then clockwise
+    angle = -math.pi / 2 + 2 * math.pi * i / len(RADAR_CATEGORIES)
+    r = _RADAR_RADIUS * value / 100
+    return _RADAR_CX + r * math.cos(angle), _RADAR_CY + r * math.sin(angle)
+
+
+@functools.lru_cache(maxsize=2048)
+def radar_svg(metrics):
+    """Inline SVG radar of ``radar_metrics`` values; memoized, players with equal stats share it."""
+    n = len(RADAR_CATEGORIES)
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 320 220" width="100%" height="220" role="img">']
+    for level in (25, 50, 75, 100):
+        ring = " ".join(f"{x:.1f},{y:.1f}" for x, y in (_radar_point(i, level) for i in range(n)))
+        parts.append(f'<polygon points="{ring}" fill="none" stroke="rgba(255,255,255,0.15)" stroke-width="1"/>')
+    for i, label in enumerate(RADAR_CATEGORIES):
+        x, y = _radar_point(i, 100)
+        lx, ly = _radar_point(i, 124)
+        anchor = "middle" if abs(lx - _RADAR_CX) < 5 else ("start" if lx > _RADAR_CX else "end")
+        parts.append(f'<line x1="{_RADAR_CX}" y1="{_RADAR_CY}" x2="{x:.1f}" y2="{y:.1f}" stroke="rgba(255,255,255,0.3)" stroke-width="1"/>')
+        parts.append(f'<text x="{lx:.1f}" y="{ly + 3:.1f}" fill="#aaa" font-size="10" text-anchor="{anchor}">{label}</text>')
+    shape = [_radar_point(i, max(0, min(100, v))) for i, v in enumerate(metrics)]
+    parts.append(f'<polygon points="{" ".join(f"{x:.1f},{y:.1f}" for x, y in shape)}" fill="rgba(204,255,0,0.3)" stroke="#CCFF00" stroke-width="2"/>')
+    for (x, y), label, v in zip(shape, RADAR_CATEGORIES, metrics):
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="#CCFF00"><title>{label}: {v:g}</title></circle>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def _team_html(p1_name, p2_name, player_imgs, text_class, img_class):
+    def get_p_img(name):
+        return get_img_src(player_imgs.get(name, ''))
+
+    if p2_name:
+        return f"""<div style="display:flex; gap:5px; justify-content:center;">
+                                <div class="player-img-container">
+                                    <a href="{get_p_img(p1_name)}" target="_blank">
+                                        <img src="{get_p_img(p1_name)}" class="mmc-avatar {img_class}">
+                                    </a>
+                                </div>
+                                <div class="player-img-container">
+                                    <a href="{get_p_img(p2_name)}" target="_blank">
+                                        <img src="{get_p_img(p2_name)}" class="mmc-avatar {img_class}">
+                                    </a>
+                                </div>
+                              </div>
+                              <div class="mmc-name {text_class}">{p1_name}<br>& {p2_name}</div>"""
+    return f"""<div class="player-img-container">
+                                <a href="{get_p_img(p1_name)}" target="_blank">
+                                    <img src="{get_p_img(p1_name)}" class="mmc-avatar {img_class}">
+                                </a>
+                              </div>
+                              <div class="mmc-name {text_class}">{p1_name}</div>"""
+
+
+_MATCH_CARD_FIELDS = ('match_id', 'date', 'match_type', 'team1_player1', 'team1_player2', 'team2_player1', 'team2_player2',
+                      'set1', 'set2', 'set3', 'winner')
+
+
+def match_card_html(row, player_imgs):
+    """Card for one match history row (an ``itertuples`` row, ``date`` parsed).
+
+    The winner is shown on the left with the set scores oriented to match.
+    ``player_imgs`` maps player names to profile image URLs.
+    """
+    fields = tuple((f, _hashable(getattr(row, f))) for f in _MATCH_CARD_FIELDS if hasattr(row, f))
+    names = (row.team1_player1, getattr(row, 'team1_player2', ''), row.team2_player1, getattr(row, 'team2_player2', ''))
+    return _match_card_html(fields, tuple((_hashable(n), _hashable(player_imgs.get(n, ''))) for n in names))
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _match_card_html(fields, imgs):
+    row, player_imgs = SimpleNamespace(**dict(fields)), dict(imgs)
+    t1_p1_name = row.team1_player1
+    t1_p2_name = getattr(row, 'team1_player2', '')
+    t2_p1_name = row.team2_player1
+    t2_p2_name = getattr(row, 'team2_player2', '')
+
+    # Stats Calculation
+    t1_games_total = 0
+    t2_games_total = 0
+    t1_sets = 0
+    t2_sets = 0
+    set_scores_data = [] # List of dicts for structured score data
+
+    for s in [getattr(row, 'set1',''), getattr(row, 'set2',''), getattr(row, 'set3','')]:
+        if s:
+            score = parse_set(s)
+            g1, g2 = (score.t1_games, score.t2_games) if score else (0, 0)
+            if score and (g1 or g2 or score.kind == SET):
+                set_scores_data.append({"g1": g1, "g2": g2, "is_tb": score.kind == TIE_BREAK, "is_stb": score.kind == SUPER_TIE_BREAK,
+                                        "p1_pts": score.t1_points, "p2_pts": score.t2_points})
+
+            if g1 > g2: t1_sets += 1
+            elif g2 > g1: t2_sets += 1
+
+            t1_games_total += g1
+            t2_games_total += g2
+
+    game_diff = abs(t1_games_total - t2_games_total)
+
+    # Winner Logic
+    match_winner = getattr(row, 'winner', 'Team 1')
+    t1_won = (match_winner == "Team 1")
+    t2_won = (match_winner == "Team 2")
+    is_tie = (match_winner == "Tie")
+
+    t1_class = "mmc-winner-text" if t1_won else ""
+    t2_class = "mmc-winner-text" if t2_won else ""
+    t1_img_class = "mmc-winner-img" if t1_won else ""
+    t2_img_class = "mmc-winner-img" if t2_won else ""
+
+    if is_tie:
+        t1_class = "mmc-tie-text"
+        t2_class = "mmc-tie-text"
+        t1_img_class = "mmc-tie-img"
+        t2_img_class = "mmc-tie-img"
+
+    t1_html = _team_html(t1_p1_name, t1_p2_name, player_imgs, t1_class, t1_img_class)
+    t2_html = _team_html(t2_p1_name, t2_p2_name, player_imgs, t2_class, t2_img_class)
+
+    # Determine display order: Winner on left
+    if t2_won:
+        left_html, right_html = t2_html, t1_html
+        left_sets, right_sets = t2_sets, t1_sets
+        vs_label = "def."
+        flip_score = True
+    elif t1_won:
+        left_html, right_html = t1_html, t2_html
+        left_sets, right_sets = t1_sets, t2_sets
+        vs_label = "def."
+        flip_score = False
+    else:
+        left_html, right_html = t1_html, t2_html
+        left_sets, right_sets = t1_sets, t2_sets
+        vs_label = "TIE"
+        flip_score = False
+
+    # Re-orient scores relative to displayed sides (Match Winner leads)
+    final_scores_list = []
+    for item in set_scores_data:
+        lg, rg = (item['g2'], item['g1']) if flip_score else (item['g1'], item['g2'])
+        base_score = f"{lg}-{rg}"
+        if item.get('is_tb') or item.get('is_stb'):
+            ltb, rtb = (item['p2_pts'], item['p1_pts']) if flip_score else (item['p1_pts'], item['p2_pts'])
+            base_score += f" (TB {ltb}-{rtb})"
+        final_scores_list.append(base_score)
+
+    # Format Score String (with line breaks if 3 sets to keep it readable)
+    if len(final_scores_list) == 3:
+        scores_detail = f"{final_scores_list[0]} {final_scores_list[1]}<br>{final_scores_list[2]}"
+    else:
+        scores_detail = " ".join(final_scores_list)
+
+    main_score = f"{left_sets}-{right_sets}"
+
+    return f"""
+            <div class="modern-match-card">
+                <div class="mmc-header">
+                    <div>📅 {row.date.strftime('%d %b %Y') if pd.notnull(row.date) else ''}</div>
+                    <div style="font-weight:bold; color:#ccff00;">{getattr(row, 'match_type', 'Match').upper()}</div>
+                </div>
+                <div class="mmc-body">
+                    <div class="mmc-team">{left_html}</div>
+                    <div class="mmc-vs-container">
+                        <div class="mmc-score-main">{main_score}</div>
+                        <div class="mmc-vs-label">{vs_label}</div>
+                        <div style="font-size:0.8em; color:#bbbbbb; margin-top:5px;">{scores_detail}</div>
+                    </div>
+                    <div class="mmc-team">{right_html}</div>
+                </div>
+                <div class="mmc-footer">
+                    <div></div>
+                    <div class="mmc-stat">Game Diff: <span style="color:#ccff00; font-weight:bold;">{game_diff}</span></div>
+                </div>
+            </div>
+            """
+
+
+def fragment_stats():
+    """Hits, misses and cached cards of the memoized builders, for the admin panels."""
+    infos = [f.cache_info() for f in (_podium_html, ranking_player_html, ranking_stats_html, form_guide_html, standing_bar_html,
+                                       profile_placeholder_html, radar_svg, _match_card_html)]
+    return {"hits": sum(i.hits for i in infos), "misses": sum(i.misses for i in infos), "cards": sum(i.currsize for i in infos)}
@@ -0,0 +1,125 @@
+"""Chapter configuration defaults, locations and legacy-config migration."""
+import copy
+import json
+
+LOCATION_TIMEZONES = {
+    "Dubai, UAE": "Asia/Dubai",
+    "Abu Dhabi, UAE": "Asia/Dubai",
+    "London, UK": "Europe/London",
+    "New York, USA": "America/New_York",
+    "Los Angeles, USA": "America/Los_Angeles",
+    "Singapore": "Asia/Singapore",
+    "Riyadh, Saudi Arabia": "Asia/Riyadh",
+    "Doha, Qatar": "Asia/Qatar",
+    "Mumbai, India": "Asia/Kolkata",
+    "Sydney, Australia": "Australia/Sydney",
+    "Paris, France": "Europe/Paris",
+    "Berlin, Germany": "Europe/Berlin",
+    "Tokyo, Japan": "Asia/Tokyo",
+    "Hong Kong": "Asia/Hong_Kong",
+}
+DEFAULT_LOCATION = "Dubai, UAE"
+DEFAULT_TIMEZONE = "Asia/Dubai"
+
+MATCH_TYPES = ["Singles", "Doubles", "Mixed Doubles"]
+
+# Stored configs carry this; raise it whenever migrate_config learns a new step
+CONFIG_SCHEMA_VERSION = 1
+
+
+def get_timezone(config):
+    if config:
+        loc = config.get('location', DEFAULT_LOCATION)
+        return LOCATION_TIMEZONES.get(loc, DEFAULT_TIMEZONE)
+    return DEFAULT_TIMEZONE
+
+
+def default_config(sport, location=DEFAULT_LOCATION):
+    return {
+        "location": location,
+        "ranking_systems": {"Elo (Hybrid)": True, "Points": True, sport.rating.name: False},
+        "match_type_settings": {
+            "Singles": {"enabled": True, "win_points": 2, "loss_points": 1, "min_sets": "Best of 3"},
+            "Doubles": {"enabled": True, "win_points": 2, "loss_points": 1, "min_sets": "Best of 3"},
+            "Mixed Doubles": {"enabled": False, "win_points": 3, "loss_points": 0, "min_sets": "Best of 3"}
+        },
+        "match_image_required": True,
+        "allow_ties": False,
+        "schema_version": CONFIG_SCHEMA_VERSION
+    }
+
+
+def migrate_config(conf, sport):
+    """Bring a stored chapter config up to the current shape for ``sport``.
+
+    Handles list-style ``ranking_systems``, another sport's rating name
+    (e.g. DUPR in a Tennis chapter), the pre-``match_type_settings`` point
+    fields, and fills in any keys missing from the defaults.
+    """
+    rating_name = sport.rating.name
+
+    # Migration for ranking_systems
+    if "ranking_systems" not in conf or isinstance(conf["ranking_systems"], list):
+        old_ranking_systems = conf.get("ranking_systems", ["Elo (Hybrid)"])
+        if isinstance(old_ranking_systems, list):
+            conf["ranking_systems"] = {
+                "Elo (Hybrid)": "Elo (Hybrid)" in old_ranking_systems,
+                "Points": "Points" in old_ranking_systems,
+                rating_name: any(n in old_ranking_systems for n in (rating_name,) + sport.rating.legacy_names),
+            }
+        # if it's already a dict, do nothing
+    elif rating_name not in conf["ranking_systems"]:
+        # Rename another sport's rating (e.g. DUPR -> UTR)
+        for legacy_name in sport.rating.legacy_names:
+            if legacy_name in conf["ranking_systems"]:
+                conf["ranking_systems"][rating_name] = conf["ranking_systems"].pop(legacy_name)
+                break
+
+    # Migration for match_type_settings
+    if "match_type_settings" not in conf:
+        old_match_types = conf.get("match_types", ["Doubles", "Singles"])
+        old_win = conf.get("points_win", 3)
+        old_loss = conf.get("points_loss", 1)
+        old_sets = conf.get("sets_modes", {"Singles": "Best of 3", "Doubles": "Best of 3", "Mixed Doubles": "Best of 3"})
+
+        conf["match_type_settings"] = {}
+        for mt in MATCH_TYPES:
+            conf["match_type_settings"][mt] = {
+                "enabled": mt in old_match_types,
+                "win_points": old_win,
+                "loss_points": old_loss,
+                "min_sets": old_sets.get(mt, "Best of 3")
+            }
+
+    # Ensure all keys from default are present
+    default_conf = default_config(sport)
+    for key in default_conf:
+        if key not in conf:
+            conf[key] = default_conf[key]
+
+    conf["schema_version"] = CONFIG_SCHEMA_VERSION
+    return conf
+
+
+def parse_config(raw):
+    """The stored ``chapters.config`` as a dict of its own.
+
+    JSONB columns arrive decoded (and possibly shared with a cached frame,
+    hence the copy); rows from before the JSONB column hold JSON text.
+    """
+    if isinstance(raw, dict):
+        return copy.deepcopy(raw)
+    if isinstance(raw, str) and raw:
+        return json.loads(raw)
+    return {}
+
+
+def canonical_config(raw, sport):
+    """``(config, migrated)`` for a stored config: configs already at
+    ``CONFIG_SCHEMA_VERSION`` are used as they are, anything else goes
+    through ``migrate_config`` (or the defaults, if empty) and should be
+    written back."""
+    conf = parse_config(raw)
+    if conf.get("schema_version") == CONFIG_SCHEMA_VERSION:
+        return conf, False
+    return (migrate_config(conf, sport) if conf else default_config(sport)), True
@@ -0,0 +1,98 @@
+"""A chapter's working set in one database round trip.
+
+Opening a chapter needs its row (name, sport, config, title image), its
+players, live matches, bookings and courts. Fetched one statement (and on
+Neon, one connection) at a time that is half a dozen round trips before
+the first paint. ``fetch`` asks for all of them in a single statement,
+each table aggregated to a JSON array:
+
+    SELECT (SELECT json_agg(c) FROM chapters c WHERE c.id = ...) AS chapters,
+           (SELECT json_agg(p) FROM players p WHERE p.chapter_id = ...) AS players,
+           ...
+
+and turns the arrays back into frames typed as ``pd.read_sql_query``
+would type them (the tables hold text, numbers, booleans and the JSONB
+config, which all survive JSON unchanged). ``load`` goes through
+``framecache`` and ``sharedcache`` first and fetches only the tables they
+miss, so after a write just the written table comes back.
+"""
+import pandas as pd
+
+from patchmoint import framecache, sharedcache
+
+TABLES = ("chapters", "players", "matches", "bookings", "courts")
+
+# Columns of a table with no rows for the chapter (json_agg has none to offer)
+EMPTY_COLUMNS = {
+    "players": ["name", "profile_image_url", "birthday", "chapter_id", "password", "gender"],
+    "matches": ["match_id", "date", "match_type", "team1_player1", "team1_player2", "team2_player1", "team2_player2",
+                "set1", "set2", "set3", "winner", "match_image_url", "chapter_id"],
+    "bookings": ["booking_id", "date", "time", "match_type", "court_name", "player1", "player2", "player3", "player4",
+                 "screenshot_url", "chapter_id"],
+    "courts": ["chapter_id", "name", "url"],
+}
+
+_QUERIES = {
+    "chapters": "SELECT json_agg(t) FROM chapters t WHERE t.id = %(chapter_id)s",
+    "players": "SELECT json_agg(t) FROM players t WHERE t.chapter_id = %(chapter_id)s",
+    # Archived seasons stay in the table but out of the live working set
+    "matches": "SELECT json_agg(t) FROM matches t WHERE t.chapter_id = %(chapter_id)s AND t.season_id IS NULL",
+    "bookings": "SELECT json_agg(t) FROM bookings t WHERE t.chapter_id = %(chapter_id)s",
+    "courts": "SELECT json_agg(t) FROM courts t WHERE t.chapter_id = %(chapter_id)s",
+}
+
+
+def _frame(table, rows):
+    if not rows:
+        return pd.DataFrame(columns=EMPTY_COLUMNS.get(table, []))
+    return pd.DataFrame.from_records(rows, columns=list(rows[0]), coerce_float=True)
+
+
+def fetch(conn, chapter_id, tables=TABLES):
+    """``{table: frame}`` of ``chapter_id`` for ``tables``, in one statement on ``conn``."""
+    columns = ", ".join(f"({_QUERIES[table]}) AS {table}" for table in tables)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {columns}", {"chapter_id": chapter_id})
+        row = cur.fetchone()
+    return {table: _frame(table, rows) for table, rows in zip(tables, row)}
+
+
+def load(chapter_id, connect, tables=TABLES):
+    """``{table: frame}`` of ``chapter_id`` through the caches; what they miss is
+    fetched in one statement on a ``connect()``-ed connection.
+
+    A fetch always brings the chapter row along, and nothing it returns is
+    cached when that row is missing, so lookups of chapters that do not
+    exist cannot fill the caches.
+
+    Frames are shared with every other caller: hand sessions
+    ``frame.copy(deep=False)``.
+    """
+    frames, versions, missing = {}, {}, []
+    for table in tables:
+        frame, versions[table] = framecache.lookup(chapter_id, table)
+        if frame is None:
+            missing.append(table)
+        else:
+            frames[table] = frame
+    if not missing:
+        return frames
+
+    # Cached frames only ever belong to chapters that exist
+    found = {"chapter": True}
+
+    def fetch_missing(tables):
+        conn = connect()
+        try:
+            fetched = fetch(conn, chapter_id, tuple(dict.fromkeys(("chapters", *tables))))
+        finally:
+            conn.close()
+        found["chapter"] = not fetched["chapters"].empty
+        return {table: fetched[table] for table in tables}
+
+    loaded = sharedcache.get_frames(chapter_id, missing, fetch_missing, lambda table, frame: found["chapter"])
+    if found["chapter"]:
+        for table, frame in loaded.items():
+            framecache.put(chapter_id, table, versions[table], frame)
+    frames.update(loaded)
+    return frames
@@ -0,0 +1,214 @@
+"""Query log for every SQL statement the app sends to Postgres.
+
+Connections are opened with ``connection_factory=TracedConnection`` (both the
+raw psycopg2 helpers and the SQLAlchemy engine), so each ``execute`` is
+timed and logged with its fingerprint, parameter shape and row count without
+changing the call sites. Statements slower than the configured threshold
+also get their plan: ``EXPLAIN (ANALYZE, BUFFERS)`` for plain reads, plain
+``EXPLAIN`` for anything else (analyzing runs the statement a second time,
+so a write, a data-modifying CTE, a ``pg_notify`` or a row lock would
+happen twice). The plan runs inside a savepoint so a failing EXPLAIN
+cannot abort the caller's transaction.
+
+The log is process-wide and bounded, so the master admin sees the
+statements of every session.
+"""
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psycopg2.extensions
+
+from patchmoint import tracing
+
+DEFAULT_SLOW_MS = 250.0
+LOG_SIZE = 2000
+
+_settings = {"slow_ms": DEFAULT_SLOW_MS, "explain": True}
+_log = deque(maxlen=LOG_SIZE)
+_lock = threading.Lock()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACE = re.compile(r"\s+")
+_READ = re.compile(r"^\s*(?:select|with|values|table|show)\b", re.I)
+_FROM = re.compile(r"\bfrom\b", re.I)
+# Anything that does more than read, even inside a read: data-modifying CTEs, row locks and
+# functions with side effects (notifications, sequences, locks, settings, other backends)
+_SIDE_EFFECTS = re.compile(r"\b(?:insert|update|delete|merge|truncate|for\s+(?:no\s+key\s+)?(?:update|share|key\s+share)|"
+                           r"pg_notify|nextval|setval|set_config|pg_advisory\w*|pg_try_advisory\w*|pg_terminate_backend|"
+                           r"pg_cancel_backend|pg_reload_conf|lo_\w+|dblink\w*)\b", re.I)
+
+
+def configure(slow_ms=None, explain=None):
+    """Set the slow-statement threshold (ms) and whether slow statements get a plan."""
+    if slow_ms is not None: _settings["slow_ms"] = float(slow_ms)
+    if explain is not None: _settings["explain"] = bool(explain)
+
+
+def slow_threshold_ms():
+    return _settings["slow_ms"]
+
+
+def fingerprint(sql):
+    """The statement with literals and parameters replaced, so repeats group together.
+
+    ``VALUES (%s, %s), (%s, %s)`` becomes ``VALUES (?+)...`` whatever the
+    number of rows.
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(?+)", sql)
+    sql = _REPEATED_LISTS.sub("(?+)...", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def params_shape(params):
+    """Types, never values, of the statement's parameters (they include passwords)."""
+    if params is None:
+        return ""
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        if len(params) > 8:
+            return f"{type(params).__name__}[{len(params)}]"
+        return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+    return type(params).__name__
+
+
+def _record(entry):
+    with _lock:
+        _log.append(entry)
+
+
+def entries():
+    """Logged statements, oldest first."""
+    with _lock:
+        return list(_log)
+
+
+def clear():
+    with _lock:
+        _log.clear()
+
+
+def summary(log=None):
+    """Per-fingerprint totals (calls, time, rows, slow count), slowest total first."""
+    groups = {}
+    for e in entries() if log is None else log:
+        g = groups.setdefault(e["fingerprint"], {"fingerprint": e["fingerprint"], "calls": 0, "total_ms": 0.0,
+                                                 "max_ms": 0.0, "rows": 0, "slow": 0, "errors": 0})
+        g["calls"] += 1
+        g["total_ms"] += e["duration_ms"]
+        g["max_ms"] = max(g["max_ms"], e["duration_ms"])
+        g["rows"] += max(e["rows"], 0)
+        g["slow"] += e["slow"]
+        g["errors"] += bool(e["error"])
+    for g in groups.values():
+        g["mean_ms"] = g["total_ms"] / g["calls"]
+    return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+
+def analyzable(sql):
+    """Whether running ``sql`` again for ``EXPLAIN ANALYZE`` is harmless: a read from tables, nothing more."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    sql = _STRING.sub("''", sql)
+    return bool(_READ.match(sql) and _FROM.search(sql) and not _SIDE_EFFECTS.search(sql))
+
+
+def _explain(connection, sql, params):
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyzable(sql) else "EXPLAIN "
+    use_savepoint = not connection.autocommit
+    cur = psycopg2.extensions.cursor(connection)
+    try:
+        if use_savepoint: cur.execute("SAVEPOINT patchmoint_explain")
+        try:
+            cur.execute(prefix + sql, params)
+            plan = "\n".join(row[0] for row in cur.fetchall())
+        except Exception as e:
+            if use_savepoint: cur.execute("ROLLBACK TO SAVEPOINT patchmoint_explain")
+            plan = f"EXPLAIN failed: {e}"
+        if use_savepoint: cur.execute("RELEASE SAVEPOINT patchmoint_explain")
+        return plan
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        cur.close()
+
+
+class _TracedCursorMixin:
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        error, sp = None, None
+        try:
+            with tracing.span("sql", tracing.SQL) as sp:
+                return super().execute(query, vars)
+        except Exception as e:
+            error = str(e).strip()
+            raise
+        finally:
+            self._log_statement(query, vars, start, error, sp)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        error, sp = None, None
+        vars_list = list(vars_list)
+        try:
+            with tracing.span("sql", tracing.SQL) as sp:
+                return super().executemany(query, vars_list)
+        except Exception as e:
+            error = str(e).strip()
+            raise
+        finally:
+            self._log_statement(query, vars_list, start, error, sp, many=True)
+
+    def _log_statement(self, query, vars, start, error, sp, many=False):
+        duration_ms = (time.perf_counter() - start) * 1000
+        fp = fingerprint(query)
+        if sp is not None:
+            sp.name = fp[:80]
+        slow = duration_ms >= _settings["slow_ms"] and error is None
+        plan = None
+        if slow and _settings["explain"] and not many:
+            plan = _explain(self.connection, query, vars)
+        _record({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "fingerprint": fp,
+            "params": f"{len(vars)} x {params_shape(vars[0]) if vars else ''}" if many else params_shape(vars),
+            "duration_ms": round(duration_ms, 2),
+            "rows": self.rowcount,
+            "slow": slow,
+            "plan": plan,
+            "error": error,
+        })
+
+
+_cursor_classes = {}
+
+
+def _traced_cursor_class(base):
+    cls = _cursor_classes.get(base)
+    if cls is None:
+        cls = type(f"Traced{base.__name__}", (_TracedCursorMixin, base), {})
+        _cursor_classes[base] = cls
+    return cls
+
+
+class TracedConnection(psycopg2.extensions.connection):
+    """psycopg2 connection whose cursors log every statement to the query log."""
+
+    def cursor(self, *args, **kwargs):
+        base = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _traced_cursor_class(base)
+        return super().cursor(*args, **kwargs)
@@ -0,0 +1,109 @@
+"""Process-wide cache of chapter tables, shared by every session.
+
+Streamlit runs every session in the same process, so the chapter's
+players, matches and bookings only need loading once per change rather
+than once per session and rerun. Each (chapter, table) has a version
+that write helpers ``bump``; a frame is served as long as it was loaded
+at the current version. ``lookup`` and ``put`` let a loader fill several
+tables from one query (see patchmoint.context). A load racing a write is returned to its caller
+but not kept, so the next read reloads. Writes made by other processes
+arrive through ``patchmoint.notify`` and bump the same versions; when
+``gate``-d on the listener, nothing is served from or kept in the cache
+while it is not known to receive them.
+
+Frames are shared: callers hand sessions ``frame.copy(deep=False)``,
+which under copy-on-write (always on from pandas 3, hence the pin in
+requirements.txt) never writes through to the cache.
+Values derived from a table (e.g. the chapter's migrated config) can be
+kept next to it under a ``name``; they share the table's version.
+"""
+import threading
+
+_lock = threading.Lock()
+_versions = {}  # (chapter_id, table) -> int
+_frames = {}  # (chapter_id, table[, name]) -> (version, frame)
+_stats = {"hits": 0, "misses": 0}
+_gate = None  # threading.Event: frames are only served while it is set
+
+
+def version(chapter_id, table):
+    with _lock:
+        return _versions.get((chapter_id, table), 0)
+
+
+def gate(event):
+    """Serve cached values only while ``event`` is set, e.g. the notify
+    listener's ``connected``: without it other processes' writes go unseen."""
+    global _gate
+    _gate = event
+
+
+def serving():
+    return _gate is None or _gate.is_set()
+
+
+def lookup(chapter_id, table, name=None):
+    """``(value, version)`` if the cached value is current, else ``(None, version)``."""
+    table_key = (chapter_id, table)
+    key = table_key if name is None else (chapter_id, table, name)
+    open_ = serving()
+    with _lock:
+        current = _versions.get(table_key, 0)
+        cached = _frames.get(key)
+        if open_ and cached is not None and cached[0] == current:
+            _stats["hits"] += 1
+            return cached[1], current
+        _stats["misses"] += 1
+        return None, current
+
+
+def put(chapter_id, table, version, value, name=None):
+    """Cache ``value`` as loaded at ``version``, unless a write has bumped the table since.
+
+    Nothing is kept while the gate is closed: writes made then go unseen,
+    so the value could be stale by the time the gate opens.
+    """
+    table_key = (chapter_id, table)
+    key = table_key if name is None else (chapter_id, table, name)
+    if not serving():
+        return
+    with _lock:
+        if _versions.get(table_key, 0) == version:
+            _frames[key] = (version, value)
+
+
+def get(chapter_id, table, load, keep=None, name=None):
+    """``(frame, version)`` of ``table`` for ``chapter_id``, calling ``load()`` on a miss.
+
+    ``keep(frame)`` decides whether a loaded frame may be cached (e.g. not
+    an error placeholder); by default every frame is. With a ``name`` the
+    value cached is whatever ``load()`` derives from the table instead.
+    """
+    frame, current = lookup(chapter_id, table, name)
+    if frame is not None:
+        return frame, current
+    frame = load()
+    if keep is None or keep(frame):
+        put(chapter_id, table, current, frame, name)
+    return frame, current
+
+
+def bump(chapter_id, *tables):
+    """Invalidate ``tables`` of ``chapter_id`` after a write."""
+    with _lock:
+        for table in tables:
+            key = (chapter_id, table)
+            _versions[key] = _versions.get(key, 0) + 1
+            for cached in [k for k in _frames if k[:2] == key]:
+                del _frames[cached]
+
+
+def clear():
+    with _lock:
+        _frames.clear()
+
+
+def stats():
+    """Hit and miss counts and the number of cached frames, for the admin panels."""
+    with _lock:
+        return {**_stats, "frames": len(_frames), "serving": serving()}
@@ -0,0 +1,78 @@
+"""Per-player match history series used by the profile charts.
+
+``game_difference_series`` makes one vectorized pass over a chapter's
+matches (each distinct set string parsed once, the four player columns
+melted into one row per match and player, a grouped cumsum) and yields
+every player's trend at once; ``performance_history`` slices one player
+out of it.
+"""
+import numpy as np
+import pandas as pd
+
+from patchmoint.scoring import parse_set
+
+_PLAYER_COLUMNS = ["team1_player1", "team1_player2", "team2_player1", "team2_player2"]
+_SET_COLUMNS = ["set1", "set2", "set3"]
+SERIES_COLUMNS = ["Player", "Date", "Match", "Game Diff", "Cumulative Game Diff", "Result"]
+
+
+def _match_game_differences(matches_df):
+    """Team 1's game difference in each match, parsing each distinct set value once."""
+    n = len(matches_df)
+    values = np.concatenate([matches_df[c].to_numpy(dtype=object) for c in _SET_COLUMNS])
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    diffs = np.zeros(len(uniques), dtype=np.int64)
+    for i, s in enumerate(uniques):
+        score = parse_set(s)
+        if score is not None:
+            diffs[i] = score.t1_games - score.t2_games
+    return diffs[codes].reshape(len(_SET_COLUMNS), n).sum(axis=0)
+
+
+def game_difference_series(matches_df):
+    """Every player's cumulative game difference after each of their matches.
+
+    One row per (match, player) with ``SERIES_COLUMNS``, oldest match first
+    within each player. A player listed twice in a match counts once, on
+    the first team they appear in.
+    """
+    if matches_df.empty:
+        return pd.DataFrame(columns=SERIES_COLUMNS)
+    n = len(matches_df)
+    team1_gd = _match_game_differences(matches_df)
+
+    players = matches_df[_PLAYER_COLUMNS].to_numpy(dtype=object).ravel()
+    long = pd.DataFrame({
+        "row": np.repeat(np.arange(n), len(_PLAYER_COLUMNS)),
+        "Player": players,
+        "is_t1": np.tile([True, True, False, False], n),
+    })
+    long = long[long["Player"].notna() & (long["Player"] != "")]
+    long = long.drop_duplicates(["row", "Player"])
+
+    rows = long["row"].to_numpy()
+    is_t1 = long["is_t1"].to_numpy()
+    winners = matches_df["winner"].to_numpy(dtype=object)[rows]
+    won = np.where(is_t1, winners == "Team 1", winners == "Team 2")
+    lost = np.where(is_t1, winners == "Team 2", winners == "Team 1")
+
+    long["Date"] = pd.to_datetime(matches_df["date"], errors="coerce").to_numpy()[rows]
+    long["Game Diff"] = np.where(is_t1, team1_gd[rows], -team1_gd[rows])
+    long["Result"] = np.where(won, "Win", np.where(lost, "Loss", "Tie"))
+    long = long.sort_values(["Date", "row"], kind="stable")
+
+    by_player = long.groupby("Player", sort=False)
+    long["Cumulative Game Diff"] = by_player["Game Diff"].cumsum()
+    long["Match"] = "Match " + (by_player.cumcount() + 1).astype(str)
+    return long[SERIES_COLUMNS].reset_index(drop=True)
+
+
+def performance_history(player_name, series):
+    """One player's slice of ``game_difference_series``, oldest first.
+
+    Returns a list of ``{"Date", "Match", "Cumulative Game Diff", "Result"}``
+    records, empty when the player has no matches.
+    """
+    if series.empty: return []
+    rows = series[series["Player"] == player_name]
+    return rows[["Date", "Match", "Cumulative Game Diff", "Result"]].to_dict("records")
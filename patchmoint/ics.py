@@ -0,0 +1,30 @@
+"""Calendar (.ics) invites for court bookings."""
+from datetime import datetime, timedelta
+
+
+def generate_ics_for_booking(row, sport_name, plain_suggestion=""):
+    """Return ``(ics_content, None)`` for a booking row, or ``(None, error)``."""
+    try:
+        summary = f"{sport_name}: {row['match_type']} at {row['court_name']}"
+        dt_str = f"{row['date']} {row['time']}"
+        try:
+            dt_start = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            dt_start = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
+        dt_end = dt_start + timedelta(hours=1.5)
+        ics_format = "%Y%m%dT%H%M%S"
+        description = f"Patch Moint {sport_name} Match\\n{plain_suggestion}"
+        ics_content = f"""BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Patch Moint League//EN
+BEGIN:VEVENT
+SUMMARY:{summary}
+DTSTART:{dt_start.strftime(ics_format)}
+DTEND:{dt_end.strftime(ics_format)}
+LOCATION:{row['court_name']}
+DESCRIPTION:{description}
+END:VEVENT
+END:VCALENDAR"""
+        return ics_content, None
+    except Exception as e:
+        return None, str(e)
@@ -0,0 +1,195 @@
+"""Cache coherence across processes with Postgres LISTEN/NOTIFY.
+
+Write helpers ``publish`` ``'<token>:<chapter_id>:<table>:<version>'``
+on the ``patchmoint_changes`` channel once their write has committed (and
+the shared cache, if any, has moved on), so nothing uncommitted is
+announced and no listener reloads before the shared version has moved.
+Every process (each sport's app, each replica) runs one ``Listener``
+thread that hands the changes made by other processes to a callback,
+typically ``framecache.bump``. ``TOKEN`` is made at import, so a process
+recognises and skips its own notifications (its local cache was already
+bumped after the commit) even when a connection pooler hands the same
+server backend to several processes.
+
+A pooler in transaction mode accepts ``LISTEN`` but never delivers the
+notifications, so the listener sends itself a probe before it reports
+``connected``; until then (and whenever the connection drops) callers
+must not trust their caches: see ``framecache.gate``. If the connection
+drops, notifications may have been missed, so the listener calls
+``on_reconnect`` (typically ``framecache.clear``) once it is back.
+
+    python -m patchmoint.notify "$DSN"                    # print changes as they arrive
+    python -m patchmoint.notify "$DSN" --send c1:matches  # publish one
+"""
+import argparse
+import select
+import sys
+import threading
+import time
+import uuid
+
+import psycopg2
+
+CHANNEL = "patchmoint_changes"
+TOKEN = uuid.uuid4().hex  # This process, in the payloads it publishes
+RECONNECT_SECONDS = 5.0
+PROBE_SECONDS = 5.0  # How long the listener waits for its own probe to arrive
+PROBE_RETRY_SECONDS = 60.0  # Before trying again on a connection that does not deliver
+
+_lock = threading.Lock()
+_listener = None
+
+
+def payload(chapter_id, table, version, token=TOKEN):
+    return f"{token}:{chapter_id}:{table}:{version}"
+
+
+def parse(text):
+    """``(token, chapter_id, table, version)`` from a payload, or None if it is malformed."""
+    token, _, rest = text.partition(":")
+    parts = rest.rsplit(":", 2)
+    if not token or len(parts) != 3 or not parts[0] or not parts[1]:
+        return None
+    chapter_id, table, version = parts
+    try:
+        return token, chapter_id, table, int(version)
+    except ValueError:
+        return None
+
+
+def publish(cur, chapter_id, versions):
+    """Queue a notification per ``{table: version}`` in ``cur``'s transaction."""
+    for table, version in versions.items():
+        cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload(chapter_id, table, version)))
+
+
+class Listener(threading.Thread):
+    """Daemon thread calling ``on_change(chapter_id, table)`` for other processes' writes."""
+
+    def __init__(self, dsn, on_change, on_reconnect=None, poll_seconds=1.0):
+        super().__init__(name="patchmoint-notify", daemon=True)
+        self.dsn = dsn
+        self.on_change = on_change
+        self.on_reconnect = on_reconnect
+        self.poll_seconds = poll_seconds
+        self.received = 0
+        self.connected = threading.Event()  # Set while notifications are known to arrive
+        self.error = None  # Why the listener is not connected, for the admin panels
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self):
+        first = True
+        while not self._stopping.is_set():
+            try:
+                conn = psycopg2.connect(self.dsn)
+            except psycopg2.Error as e:
+                self._fail(f"cannot connect: {' '.join(str(e).split())}")
+                self._stopping.wait(RECONNECT_SECONDS)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANNEL}")
+                if not self._probe(conn):
+                    self._fail("LISTEN does not receive notifications on this connection "
+                               "(a pooled endpoint?): point it at a direct one (LISTEN_DATABASE_URL)")
+                    self._stopping.wait(PROBE_RETRY_SECONDS)
+                    continue
+                if not first and self.on_reconnect:
+                    self.on_reconnect()
+                first = False
+                self.error = None
+                self.connected.set()
+                while not self._stopping.is_set():
+                    self._drain(conn)
+            except psycopg2.Error as e:
+                self._fail(f"connection lost: {' '.join(str(e).split())}")
+                self._stopping.wait(RECONNECT_SECONDS)
+            finally:
+                conn.close()
+
+    def _fail(self, error):
+        if self.connected.is_set() or self.error != error:
+            print(f"patchmoint.notify: {error}; shared caches are off until it works", file=sys.stderr, flush=True)
+        self.connected.clear()
+        self.error = error
+
+    def _probe(self, conn):
+        """Notify ourselves on another connection and wait for it to come back on ``conn``."""
+        probe = f"probe:{TOKEN}:{uuid.uuid4().hex}"
+        sender = psycopg2.connect(self.dsn)
+        try:
+            with sender.cursor() as cur:
+                cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, probe))
+            sender.commit()
+        finally:
+            sender.close()
+        deadline = time.monotonic() + PROBE_SECONDS
+        while time.monotonic() < deadline:
+            if any(n.payload == probe for n in self._drain(conn)):
+                return True
+        return False
+
+    def _drain(self, conn):
+        """Wait up to ``poll_seconds`` and handle what arrived; returns the notifications."""
+        if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+            return []
+        conn.poll()
+        notifications, conn.notifies[:] = list(conn.notifies), []
+        for notification in notifications:
+            self._handle(notification)
+        return notifications
+
+    def _handle(self, notification):
+        change = parse(notification.payload)
+        if change is None or change[0] == TOKEN:
+            return
+        self.received += 1
+        try:
+            self.on_change(change[1], change[2])
+        except Exception:
+            # A failing callback must not take the listener down with it
+            pass
+
+
+def start_listener(dsn, on_change, on_reconnect=None):
+    """The process-wide listener, started on first call; later calls return the same one."""
+    global _listener
+    with _lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = Listener(dsn, on_change, on_reconnect)
+            _listener.start()
+        return _listener
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dsn", help="Postgres connection string")
+    parser.add_argument("--send", metavar="CHAPTER:TABLE", help="publish one change instead of listening")
+    args = parser.parse_args(argv)
+
+    if args.send:
+        chapter_id, _, table = args.send.rpartition(":")
+        conn = psycopg2.connect(args.dsn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload(chapter_id, table, 0)))
+        conn.commit()
+        conn.close()
+        return 0
+
+    listener = Listener(args.dsn, lambda chapter_id, table: print(f"{chapter_id} {table}", flush=True),
+                        lambda: print("reconnected: caches would be cleared", flush=True))
+    listener.start()
+    try:
+        while listener.is_alive():
+            listener.join(1)
+    except KeyboardInterrupt:
+        listener.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
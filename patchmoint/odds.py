@@ -0,0 +1,107 @@
+"""Match-up odds and balanced doubles pairings from a ranking table."""
+from itertools import combinations
+
+
+def performance_score(player_stats, full_dataset):
+    """
+    Calculates a weighted performance score for a player based on normalized stats.
+    """
+    # Define weights for each component
+    w_wp = 0.50  # Win Percentage
+    w_agd = 0.35 # Average Game Difference
+    w_ef = 0.15  # Experience Factor (Matches Played)
+
+    # --- 1. Normalize Win Percentage (WP) ---
+    max_wp = full_dataset['Win %'].max()
+    wp_norm = player_stats['Win %'] / max_wp if max_wp > 0 else 0
+
+    # --- 2. Normalize Average Game Difference (AGD) ---
+    max_agd = full_dataset['Game Diff Avg'].max()
+    min_agd = full_dataset['Game Diff Avg'].min()
+    if max_agd == min_agd:
+        agd_norm = 0.5 # Avoid division by zero if all values are the same
+    else:
+        agd_norm = (player_stats['Game Diff Avg'] - min_agd) / (max_agd - min_agd)
+
+    # --- 3. Normalize Experience Factor (EF) ---
+    max_matches = full_dataset['Matches'].max()
+    ef_norm = player_stats['Matches'] / max_matches if max_matches > 0 else 0
+
+    # --- 4. Calculate Final Performance Score ---
+    return (w_wp * wp_norm) + (w_agd * agd_norm) + (w_ef * ef_norm)
+
+
+def player_scores(players, rank_df):
+    """Performance score per player; players without history in ``rank_df`` score 0."""
+    scores = {}
+    for player in players:
+        player_data = rank_df[rank_df["Player"] == player]
+        scores[player] = performance_score(player_data.iloc[0], rank_df) if not player_data.empty else 0
+    return scores
+
+
+def doubles_pairings(players, rank_df):
+    """The three ways to split four players into two teams, most balanced first.
+
+    Each entry is a dict with the teams (``t1``, ``t2``), their win odds in
+    percent (``o1``, ``o2``) and the performance score gap (``diff``).
+    """
+    scores = player_scores(players, rank_df)
+    pairings = []
+    seen = set()
+    for t1 in combinations(players, 2):
+        t2 = tuple(p for p in players if p not in t1)
+        split = frozenset([frozenset(t1), frozenset(t2)])
+        if split in seen: continue
+        seen.add(split)
+        s1 = sum(scores[p] for p in t1)
+        s2 = sum(scores[p] for p in t2)
+        o1 = (s1/(s1+s2))*100 if s1+s2>0 else 50
+        pairings.append({'t1': t1, 't2': t2, 'o1': o1, 'o2': 100-o1, 'diff': abs(s1-s2)})
+    pairings.sort(key=lambda x: x['diff'])
+    return pairings
+
+
+def balanced_pairing(players, rank_df):
+    """Most balanced doubles teams as ``(team1, team2, team1_odds, team2_odds)``.
+
+    Returns None unless four players are given and ``rank_df`` has data.
+    """
+    if len(players) != 4 or "" in players or rank_df.empty:
+        return None
+
+    scores = player_scores(players, rank_df)
+    min_diff = float('inf')
+    best_pairing = None
+    for team1_combo in combinations(players, 2):
+        team2_combo = tuple(p for p in players if p not in team1_combo)
+        diff = abs(sum(scores[p] for p in team1_combo) - sum(scores[p] for p in team2_combo))
+        if diff < min_diff:
+            min_diff = diff
+            best_pairing = (team1_combo, team2_combo)
+    if not best_pairing:
+        return None
+
+    team1, team2 = best_pairing
+    team1_total_score = sum(scores[p] for p in team1)
+    team2_total_score = sum(scores[p] for p in team2)
+    total_match_score = team1_total_score + team2_total_score
+
+    team1_odds = (team1_total_score / total_match_score) * 100 if total_match_score > 0 else 50.0
+    team2_odds = (team2_total_score / total_match_score) * 100 if total_match_score > 0 else 50.0
+    return team1, team2, team1_odds, team2_odds
+
+
+def singles_odds(players, rank_df):
+    """Win odds in percent for a two-player match, or ``(None, None)``."""
+    if len(players) != 2 or "" in players or rank_df.empty:
+        return (None, None)
+
+    scores = player_scores(players, rank_df)
+    p1_score = scores[players[0]]
+    p2_score = scores[players[1]]
+    total_score = p1_score + p2_score
+
+    p1_odds = (p1_score / total_score) * 100 if total_score > 0 else 50.0
+    p2_odds = (p2_score / total_score) * 100 if total_score > 0 else 50.0
+    return (p1_odds, p2_odds)
@@ -0,0 +1,132 @@
+"""Head-to-head and partnership tables over dense player IDs.
+
+``build_pairs`` encodes the matches the ranking replay counts (see
+``rankings.encode_matches``) and aggregates them in one vectorized pass
+into two sparse player-by-player tables: opponents (results and games
+against each other) and partners (results and game difference together).
+Each table is stored CSR-style: non-empty (player, other) cells sorted by
+player, a row pointer per player and a dict from the pair to its cell,
+so a pair is one lookup and a player's row one slice.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from patchmoint.rankings import encode_matches
+
+OPPONENT_COLUMNS = ["matches", "wins", "losses", "ties", "games_won", "games_lost"]
+PARTNER_COLUMNS = ["matches", "wins", "losses", "ties", "game_diff"]
+
+
+class PairTable:
+    """Sparse player-by-player statistics; rows and columns are dense player IDs."""
+
+    def __init__(self, names, ids, rows, cols, values):
+        n = len(names)
+        order = np.lexsort((cols, rows))
+        self.names = names
+        self.ids = ids
+        self.rows = rows[order]
+        self.cols = cols[order]
+        self.values = {k: v[order] for k, v in values.items()}
+        self.indptr = np.searchsorted(self.rows, np.arange(n + 1))
+        self._cells = {(r, c): i for i, (r, c) in enumerate(zip(self.rows.tolist(), self.cols.tolist()))}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, player, other):
+        """Stats of ``player`` with or against ``other`` as a dict, or None if they never met."""
+        i = self._cells.get((self.ids.get(player), self.ids.get(other)))
+        if i is None:
+            return None
+        return {k: v[i].item() for k, v in self.values.items()}
+
+    def row(self, player):
+        """All of ``player``'s pairs as a frame with an ``other`` column."""
+        p = self.ids.get(player)
+        if p is None:
+            return pd.DataFrame(columns=["other", *self.values])
+        start, end = self.indptr[p], self.indptr[p + 1]
+        frame = pd.DataFrame({k: v[start:end] for k, v in self.values.items()})
+        frame.insert(0, "other", [self.names[c] for c in self.cols[start:end].tolist()])
+        return frame
+
+
+class Pairs(NamedTuple):
+    opponents: PairTable
+    partners: PairTable
+
+
+def _aggregate(names, ids, a, b, columns):
+    """Sum the per-(a, b) rows of ``columns`` into a PairTable."""
+    n = max(len(names), 1)
+    keys, inverse = np.unique(a * n + b, return_inverse=True)
+    values = {k: np.bincount(inverse, weights=v, minlength=len(keys)).astype(np.int64) for k, v in columns.items()}
+    return PairTable(names, ids, keys // n, keys % n, values)
+
+
+def build_pairs(matches, players_df, config, sport):
+    """Opponent and partner tables from the matches the rankings count."""
+    enc = encode_matches(matches, players_df, config, sport)
+    k = np.flatnonzero(enc.played)
+    t1 = np.stack([enc.t1a[k], enc.t1b[k]], axis=1)
+    t2 = np.stack([enc.t2a[k], enc.t2b[k]], axis=1)
+    g1, g2 = enc.g1[k], enc.g2[k]
+    tie = enc.is_tie[k]
+    win1 = enc.t1_won[k] & ~tie
+    win2 = ~enc.t1_won[k] & ~tie
+
+    # Opponents: every team 1 member against every team 2 member, from both sides
+    opp_a, opp_b, opp_match = [], [], []
+    for i in range(2):
+        for j in range(2):
+            ok = (t1[:, i] >= 0) & (t2[:, j] >= 0)
+            opp_a.append(t1[ok, i]); opp_b.append(t2[ok, j]); opp_match.append(np.flatnonzero(ok))
+    x, y, mi = np.concatenate(opp_a), np.concatenate(opp_b), np.concatenate(opp_match)
+    opponents = _aggregate(enc.names, enc.ids, np.concatenate([x, y]), np.concatenate([y, x]), {
+        "matches": np.ones(2 * len(mi)),
+        "wins": np.concatenate([win1[mi], win2[mi]]),
+        "losses": np.concatenate([win2[mi], win1[mi]]),
+        "ties": np.concatenate([tie[mi], tie[mi]]),
+        "games_won": np.concatenate([g1[mi], g2[mi]]),
+        "games_lost": np.concatenate([g2[mi], g1[mi]]),
+    })
+
+    # Partners: the two members of a doubles team, from both sides
+    part_a, part_b, won, lost, ties, gd = [], [], [], [], [], []
+    for team, team_won, other_won, diff in ((t1, win1, win2, g1 - g2), (t2, win2, win1, g2 - g1)):
+        ok = (team[:, 0] >= 0) & (team[:, 1] >= 0)
+        for a, b in ((team[ok, 0], team[ok, 1]), (team[ok, 1], team[ok, 0])):
+            part_a.append(a); part_b.append(b)
+            won.append(team_won[ok]); lost.append(other_won[ok]); ties.append(tie[ok]); gd.append(diff[ok])
+    a, b = np.concatenate(part_a), np.concatenate(part_b)
+    partners = _aggregate(enc.names, enc.ids, a, b, {
+        "matches": np.ones(len(a)),
+        "wins": np.concatenate(won),
+        "losses": np.concatenate(lost),
+        "ties": np.concatenate(ties),
+        "game_diff": np.concatenate(gd),
+    })
+    return Pairs(opponents, partners)
+
+
+def head_to_head_table(pairs, player):
+    """``player``'s record against each opponent, most played first."""
+    h2h = pairs.opponents.row(player)
+    if h2h.empty:
+        return h2h
+    h2h["win_pct"] = (h2h["wins"] / h2h["matches"] * 100).round(1)
+    return h2h.sort_values(["matches", "win_pct"], ascending=[False, False]).reset_index(drop=True)
+
+
+def best_partners(pairs, player, min_matches=1):
+    """``player``'s partners with at least ``min_matches`` together, best win rate first."""
+    partners = pairs.partners.row(player)
+    partners = partners[partners["matches"] >= min_matches].copy() if not partners.empty else partners
+    if partners.empty:
+        return partners
+    partners["win_pct"] = (partners["wins"] / partners["matches"] * 100).round(1)
+    partners["game_diff_avg"] = (partners["game_diff"] / partners["matches"]).round(2)
+    return partners.sort_values(["win_pct", "game_diff_avg", "matches"], ascending=False).reset_index(drop=True)
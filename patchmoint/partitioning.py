@@ -0,0 +1,181 @@
+"""Hash-partition the per-chapter tables on ``chapter_id``.
+
+Every chapter load filters ``matches`` and ``bookings`` by ``chapter_id``,
+so hashing on it lets Postgres prune each of those scans (and vacuum and
+index maintenance) down to one partition. Listing by sport would not: a
+sport holds many chapters.
+
+    python -m patchmoint.partitioning "$NEON_DATABASE_URL"                  # dry run
+    python -m patchmoint.partitioning "$NEON_DATABASE_URL" --apply --partitions 16
+
+The dry run only reads: per table it reports the rows, size and chapters
+and, per partition, exactly which share of them the hash would put there
+(worked out against an empty temporary partitioned table). ``--apply``
+converts each table in its own transaction: the old table is renamed to
+``<table>_unpartitioned`` (kept unless ``--drop-old``), a partitioned
+table with the same columns, defaults and indexes takes its name and the
+rows are copied over. A partitioned table cannot have a unique key
+without the partition column, so ``match_id`` / ``booking_id`` become
+unique together with ``chapter_id`` and keep a plain index of their own.
+"""
+import argparse
+import sys
+from typing import NamedTuple
+
+import pandas as pd
+import psycopg2
+
+DEFAULT_PARTITIONS = 16
+PARTITION_COLUMNS = ["partition", "chapters", "rows", "est_bytes"]
+
+
+class TableSpec(NamedTuple):
+    unique: tuple  # Columns of the unique key; must include chapter_id
+    indexes: tuple  # (name, columns and predicate) of the other indexes
+
+
+TABLES = {
+    "matches": TableSpec(("match_id", "chapter_id"), (
+        ("matches_match_id_idx", "(match_id)"),
+        ("matches_live_idx", "(chapter_id) WHERE season_id IS NULL"),
+        ("matches_season_idx", "(season_id) WHERE season_id IS NOT NULL"),
+    )),
+    "bookings": TableSpec(("booking_id", "chapter_id"), (
+        ("bookings_booking_id_idx", "(booking_id)"),
+        ("bookings_chapter_idx", "(chapter_id)"),
+    )),
+}
+
+
+class TableReport(NamedTuple):
+    table: str
+    partitioned: bool
+    rows: int
+    total_bytes: int
+    chapters: int
+    null_chapter_rows: int
+    partitions: pd.DataFrame  # PARTITION_COLUMNS: estimated, or actual once the table is partitioned
+
+
+def is_partitioned(cur, table):
+    cur.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def estimate(conn, table, partitions=DEFAULT_PARTITIONS):
+    """Dry-run report of ``table`` split into ``partitions`` hash partitions; changes nothing."""
+    with conn.cursor() as cur:
+        # A partitioned parent has no storage of its own: add up its partitions
+        cur.execute(f"SELECT COUNT(*), COUNT(DISTINCT chapter_id), COUNT(*) FILTER (WHERE chapter_id IS NULL), "
+                    f"pg_total_relation_size(%s::regclass) + COALESCE((SELECT SUM(pg_total_relation_size(inhrelid)) "
+                    f"FROM pg_inherits WHERE inhparent = %s::regclass), 0)::bigint FROM {table}", (table, table))
+        rows, chapters, null_rows, total_bytes = cur.fetchone()
+        if is_partitioned(cur, table):
+            # Report what each partition actually holds
+            cur.execute(f"""
+                SELECT c.relname, COUNT(DISTINCT t.chapter_id), COUNT(t.chapter_id), pg_total_relation_size(c.oid)
+                FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                LEFT JOIN {table} t ON t.tableoid = c.oid
+                WHERE i.inhparent = %s::regclass GROUP BY c.relname, c.oid ORDER BY c.relname
+            """, (table,))
+            frame = pd.DataFrame(cur.fetchall(), columns=PARTITION_COLUMNS)
+            return TableReport(table, True, rows, total_bytes, chapters, null_rows, frame)
+
+        # Ask Postgres where each chapter would hash to, against an empty stand-in table
+        cur.execute("SAVEPOINT partition_estimate")
+        cur.execute("CREATE TEMP TABLE partition_estimate (chapter_id TEXT) PARTITION BY HASH (chapter_id)")
+        cur.execute(f"""
+            WITH per_chapter AS (SELECT chapter_id, COUNT(*) AS n FROM {table} GROUP BY chapter_id)
+            SELECT r, COUNT(chapter_id), COALESCE(SUM(n), 0)::bigint
+            FROM generate_series(0, %s - 1) AS r
+            LEFT JOIN per_chapter ON satisfies_hash_partition('partition_estimate'::regclass, %s, r, chapter_id)
+            GROUP BY r ORDER BY r
+        """, (partitions, partitions))
+        counts = cur.fetchall()
+        cur.execute("ROLLBACK TO SAVEPOINT partition_estimate")
+
+    bytes_per_row = total_bytes / rows if rows else 0
+    frame = pd.DataFrame([(f"{table}_p{r:02d}", int(c), int(n), int(n * bytes_per_row)) for r, c, n in counts],
+                         columns=PARTITION_COLUMNS)
+    return TableReport(table, False, rows, total_bytes, chapters, null_rows, frame)
+
+
+def partition_table(conn, table, partitions=DEFAULT_PARTITIONS, drop_old=False):
+    """Convert ``table`` to a hash-partitioned table in one transaction.
+
+    Returns the rows copied, or None when the table is already partitioned.
+    The caller commits.
+    """
+    spec = TABLES[table]
+    old = f"{table}_unpartitioned"
+    with conn.cursor() as cur:
+        if is_partitioned(cur, table):
+            return None
+        cur.execute("SELECT to_regclass(%s)", (old,))
+        if cur.fetchone()[0] is not None:
+            raise RuntimeError(f"{old} already exists; drop or rename it before partitioning {table} again")
+
+        cur.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cur.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        # Index names are per schema: move the old ones aside so the new table can reuse them
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s", (old,))
+        for (index,) in cur.fetchall():
+            cur.execute(f'ALTER INDEX "{index}" RENAME TO "{index[:50]}_unpartitioned"')
+
+        cur.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY HASH (chapter_id)")
+        for r in range(partitions):
+            cur.execute(f"CREATE TABLE {table}_p{r:02d} PARTITION OF {table} FOR VALUES WITH (MODULUS {partitions}, REMAINDER {r})")
+        cur.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_key UNIQUE ({', '.join(spec.unique)})")
+        for name, definition in spec.indexes:
+            cur.execute(f"CREATE INDEX {name} ON {table} {definition}")
+
+        cur.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        copied = cur.rowcount
+        cur.execute(f"SELECT COUNT(*) FROM {old}")
+        if cur.fetchone()[0] != copied:
+            raise RuntimeError(f"row count mismatch while copying {table}")
+        if drop_old:
+            cur.execute(f"DROP TABLE {old}")
+    return copied
+
+
+def format_report(report):
+    lines = [f"{report.table}: {report.rows} rows, {report.total_bytes / 1e6:.1f} MB, {report.chapters} chapters"
+             + (f", {report.null_chapter_rows} rows without a chapter" if report.null_chapter_rows else "")]
+    biggest = report.partitions["rows"].max() if not report.partitions.empty else 0
+    lines.append(f"  {'partitioned' if report.partitioned else 'estimate'}: {len(report.partitions)} partitions, "
+                 f"biggest {biggest} rows, {(report.partitions['chapters'] == 0).sum()} empty")
+    for p in report.partitions.itertuples():
+        lines.append(f"  {p.partition:<20} {p.chapters:>6} chapters {p.rows:>10} rows {p.est_bytes / 1e6:>10.2f} MB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dsn", help="Postgres connection string")
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS)
+    parser.add_argument("--tables", nargs="+", default=list(TABLES), choices=list(TABLES))
+    parser.add_argument("--apply", action="store_true", help="convert the tables (default: dry run)")
+    parser.add_argument("--drop-old", action="store_true", help="drop <table>_unpartitioned after copying")
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        for table in args.tables:
+            print(format_report(estimate(conn, table, args.partitions)))
+            conn.rollback()
+            if args.apply:
+                copied = partition_table(conn, table, args.partitions, args.drop_old)
+                conn.commit()
+                print("  nothing to do" if copied is None else f"  partitioned: {copied} rows copied")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
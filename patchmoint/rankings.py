@@ -0,0 +1,509 @@
+"""The ranking engine: Elo (Hybrid), Points and the sport rating from match history.
+
+Player names are interned to dense integer IDs once per call and every match
+is pre-encoded into fixed-width arrays (member IDs, game totals, set
+tallies, flags). The only Python loop left is the sequential Elo/rating
+replay over plain lists. It also feeds each player's ``PlayerForm``, the
+order-dependent stats kept in constant space; the plain counters are
+bincounts over one row per (match, player) afterwards.
+
+``rank_with_history`` also returns the rating history: one row per player,
+match and rating system with the rating before the match and its change,
+so trajectories and "as of" values are slices of the log, not replays.
+"""
+import math
+import re
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from patchmoint.badges import COURT_DOMINATOR, player_badges
+from patchmoint.config import default_config
+from patchmoint.scoring import parse_set
+from patchmoint.sports import DEFAULT_AVATAR
+
+K_FACTOR = 32
+ELO_DEFAULT_RATING = 1200.0
+
+_NUMBERS = re.compile(r'\d+')
+_PLAYER_COLUMNS = ["team1_player1", "team1_player2", "team2_player1", "team2_player2"]
+_SET_COLUMNS = ["set1", "set2", "set3"]
+_NO_PLAYER = -1
+_LOSS, _WIN, _TIE = 0, 1, 2
+_TREND_LETTERS = {_WIN: 'W', _LOSS: 'L', _TIE: 'T'}
+TREND_LENGTH = 5
+ELO = "Elo"
+HISTORY_COLUMNS = ["match_id", "date", "player_id", "player", "system", "rating_before", "delta"]
+
+
+class PlayerForm:
+    """The order-dependent stats of one player, updated match by match in constant space.
+
+    Game difference spread is Welford's running mean and M2, the trend a
+    ring buffer of the last ``TREND_LENGTH`` results and the busiest day a
+    running max (matches are replayed in date order, so a day's matches
+    arrive together).
+    """
+    __slots__ = ("matches", "streak", "gd_mean", "gd_m2", "trend", "day", "day_matches", "max_daily")
+
+    def __init__(self):
+        self.matches = 0
+        self.streak = 0
+        self.gd_mean = 0.0
+        self.gd_m2 = 0.0
+        self.trend = [_TIE] * TREND_LENGTH
+        self.day = None
+        self.day_matches = 0
+        self.max_daily = 0
+
+    def add(self, result, gd, day):
+        if result == _WIN: self.streak = max(0, self.streak) + 1
+        elif result == _LOSS: self.streak = min(0, self.streak) - 1
+        else: self.streak = 0
+        self.trend[self.matches % TREND_LENGTH] = result
+        self.matches += 1
+
+        delta = gd - self.gd_mean
+        self.gd_mean += delta / self.matches
+        self.gd_m2 += delta * (gd - self.gd_mean)
+
+        if day != self.day:
+            self.day, self.day_matches = day, 0
+        self.day_matches += 1
+        if self.day_matches > self.max_daily: self.max_daily = self.day_matches
+
+    @property
+    def consistency(self):
+        """Population standard deviation of the game difference (0 until two matches)."""
+        return math.sqrt(self.gd_m2 / self.matches) if self.matches > 1 else 0
+
+    def recent(self):
+        """The last ``TREND_LENGTH`` results, oldest first."""
+        if self.matches < TREND_LENGTH:
+            return self.trend[:self.matches]
+        start = self.matches % TREND_LENGTH
+        return self.trend[start:] + self.trend[:start]
+
+
+def _set_tallies(s):
+    """How a set counts towards Set Collector and Sniper.
+
+    Returns (team 1 side took it, team 2 side took it, team 1 side took the
+    tie-break, team 2 side took the tie-break). Tie-break entries only count
+    for Sniper: their "Tie Break a-b" text is not a set score.
+    """
+    tb_a = tb_b = False
+    if not s:
+        return False, False, tb_a, tb_b
+    try:
+        if "Tie Break" in s:
+            nums = [int(x) for x in _NUMBERS.findall(s)]
+            if len(nums) >= 2:
+                tb_a, tb_b = nums[0] > nums[1], nums[1] > nums[0]
+        pts = s.split('-')
+        return int(pts[0]) > int(pts[1]), int(pts[1]) > int(pts[0]), tb_a, tb_b
+    except (ValueError, IndexError):
+        return False, False, tb_a, tb_b
+
+
+def _first_set_games(s):
+    """Games of a plain "a-b" first set, for Comeback Kid; None for anything else."""
+    if '-' not in s:
+        return None
+    try:
+        p1, p2 = map(int, s.split('-'))
+        return p1, p2
+    except ValueError:
+        return None
+
+
+def _encode_sets(matches, sport):
+    """Per-match game totals, clutch flag and set tallies from the set columns."""
+    n = len(matches)
+    values = np.concatenate([matches[c].to_numpy(dtype=object) for c in _SET_COLUMNS]) if n else np.array([], dtype=object)
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+
+    table = np.zeros((len(uniques), 7), dtype=np.int64)
+    for i, s in enumerate(map(str, uniques)):
+        score = parse_set(s)
+        if score is not None:
+            g1, g2 = score.t1_games, score.t2_games
+            clutch = score.is_tie_break or (sport.close_games_are_clutch and abs(g1 - g2) <= 2 and max(g1, g2) >= 10)
+            table[i, :3] = g1, g2, clutch
+        table[i, 3:] = _set_tallies(s)
+
+    per_set = table[codes].reshape(len(_SET_COLUMNS), n, 7)
+    totals = per_set.sum(axis=0)
+    return {
+        "g1": totals[:, 0], "g2": totals[:, 1], "clutch": per_set[:, :, 2].any(axis=0),
+        "sets_a": totals[:, 3], "sets_b": totals[:, 4], "tb_a": totals[:, 5], "tb_b": totals[:, 6],
+    }
+
+
+def _encode_comebacks(matches, t1_won, is_tie):
+    if matches.empty:
+        return np.zeros(0, dtype=bool)
+    codes, uniques = pd.factorize(matches["set1"].to_numpy(dtype=object), use_na_sentinel=False)
+    games = [_first_set_games(str(s)) for s in uniques]
+    t1_lost_first = np.array([g is not None and g[1] > g[0] for g in games], dtype=bool)
+    t2_lost_first = np.array([g is not None and g[0] > g[1] for g in games], dtype=bool)
+    return (t1_won & t1_lost_first[codes]) | (~t1_won & ~is_tie & t2_lost_first[codes])
+
+
+def _encode_players(matches, players_df):
+    """Intern player names to dense IDs; returns (names, id lookup, (n, 4) member IDs)."""
+    names = []
+    ids = {}
+    if 'name' in players_df.columns:
+        for name in players_df['name']:
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+
+    n = len(matches)
+    values = np.concatenate([matches[c].to_numpy(dtype=object) for c in _PLAYER_COLUMNS]) if n else np.array([], dtype=object)
+    codes, uniques = pd.factorize(values)
+    lookup = np.full(len(uniques) + 1, _NO_PLAYER, dtype=np.int64)  # codes of -1 (missing) land on the last slot
+    for i, p in enumerate(uniques):
+        if p and str(p).strip() and str(p).upper() != "VISITOR":
+            if p not in ids:
+                ids[p] = len(names)
+                names.append(p)
+            lookup[i] = ids[p]
+    members = lookup[codes].reshape(len(_PLAYER_COLUMNS), n).T
+    return names, ids, members
+
+
+def _compact_team(first, second):
+    # A team whose first slot is empty plays with its second player alone
+    return np.where(first >= 0, first, second), np.where(first >= 0, second, _NO_PLAYER)
+
+
+class EncodedMatches(NamedTuple):
+    """Matches in replay (date) order as per-match arrays over dense player IDs.
+
+    ``t1a``/``t1b``/``t2a``/``t2b`` are member IDs (-1 for an empty slot;
+    a one-player team is always in ``a``), ``g1``/``g2`` game totals, and
+    ``played`` marks the matches that count: both teams present, the match
+    type enabled and at least one game. ``active`` is the same without the
+    games condition.
+    """
+    matches: pd.DataFrame
+    names: list
+    ids: dict
+    t1a: np.ndarray
+    t1b: np.ndarray
+    t2a: np.ndarray
+    t2b: np.ndarray
+    g1: np.ndarray
+    g2: np.ndarray
+    t1_won: np.ndarray
+    is_tie: np.ndarray
+    is_singles: np.ndarray
+    pts_win: np.ndarray
+    pts_loss: np.ndarray
+    sets: dict
+    comeback: np.ndarray
+    date_codes: np.ndarray
+    active: np.ndarray
+    played: np.ndarray
+
+
+def encode_matches(matches_to_rank, players_df, config, sport):
+    """Sort the matches by date and encode them once for the replay and the pair tables."""
+    match_type_settings = config.get("match_type_settings", default_config(sport)["match_type_settings"])
+    if not matches_to_rank.empty:
+        matches_to_rank = matches_to_rank.sort_values('date')
+    m = matches_to_rank
+    n = len(m)
+
+    names, ids, members = _encode_players(m, players_df)
+    t1a, t1b = _compact_team(members[:, 0], members[:, 1])
+    t2a, t2b = _compact_team(members[:, 2], members[:, 3])
+
+    match_types = m['match_type'].to_numpy(dtype=object) if n else np.array([], dtype=object)
+    type_codes, type_uniques = pd.factorize(match_types)
+    type_table = np.zeros((len(type_uniques) + 1, 3))
+    for i, mt in enumerate(type_uniques):
+        type_config = match_type_settings.get(mt, {"enabled": False})
+        type_table[i] = type_config.get("enabled", False), type_config.get("win_points", 2), type_config.get("loss_points", 0)
+    enabled = type_table[type_codes, 0].astype(bool)
+
+    sets = _encode_sets(m, sport)
+    winners = m['winner'].to_numpy(dtype=object) if n else np.array([], dtype=object)
+    is_tie = winners == "Tie"
+    t1_won = winners == "Team 1"
+
+    # Those without any games still mark the players as active
+    active = (t1a >= 0) & (t2a >= 0) & enabled
+    played = active & ((sets["g1"] + sets["g2"]) > 0)
+
+    # Matches of the same day share a code, for the busiest-day count
+    date_codes, _ = pd.factorize(np.array([str(d) for d in m['date']] if n else [], dtype=object))
+
+    return EncodedMatches(
+        m, names, ids, t1a, t1b, t2a, t2b, sets["g1"], sets["g2"], t1_won, is_tie, match_types == "Singles",
+        type_table[type_codes, 1], type_table[type_codes, 2], sets, _encode_comebacks(m, t1_won, is_tie),
+        date_codes, active, played,
+    )
+
+
+def initial_ratings(players_df, sport):
+    """Starting (Elo, sport rating) per player: seeded from ``initial_utr``, else the defaults."""
+    rating = sport.rating
+    if 'name' not in players_df.columns:
+        return {}
+    initial = players_df['initial_utr'] if 'initial_utr' in players_df.columns else [None] * len(players_df)
+    start = {}
+    for name, initial_utr in zip(players_df['name'], initial):
+        if pd.notna(initial_utr) and initial_utr is not None:
+            start[name] = (float((initial_utr - rating.default) * 110.0 + ELO_DEFAULT_RATING), float(initial_utr))
+        else:
+            start[name] = (ELO_DEFAULT_RATING, rating.default)
+    return start
+
+
+def calculate_rankings(matches_to_rank, players_df, config, sport, today=None):
+    """Replay ``matches_to_rank`` in date order and return the ranking table.
+
+    ``players_df`` supplies starting ratings (``initial_utr``) and profile
+    images, ``config`` the chapter's match type settings and tie rule.
+    ``today`` (default: now) decides the participation badge.
+    """
+    return rank_with_history(matches_to_rank, players_df, config, sport, today)[0]
+
+
+def rank_with_history(matches_to_rank, players_df, config, sport, today=None):
+    """``calculate_rankings`` plus the rating history of the same replay.
+
+    The history has ``HISTORY_COLUMNS``: for every played match, each
+    player's rating before it and its change (``delta``), once for the Elo
+    (``system == ELO``) and once for the sport rating (``sport.rating.name``),
+    in replay order.
+    """
+    today = today or datetime.now()
+    rating = sport.rating
+    allow_ties = config.get("allow_ties", False)
+
+    enc = encode_matches(matches_to_rank, players_df, config, sport)
+    m, names, ids = enc.matches, enc.names, enc.ids
+    n, n_players = len(m), len(names)
+    t1a, t1b, t2a, t2b = enc.t1a, enc.t1b, enc.t2a, enc.t2b
+    g1, g2, t1_won, is_tie = enc.g1, enc.g2, enc.t1_won, enc.is_tie
+    sets, k_played = enc.sets, np.flatnonzero(enc.played)
+
+    elo0 = np.full(n_players, ELO_DEFAULT_RATING)
+    rating0 = np.full(n_players, rating.default)
+    for name, (elo_start, rating_start) in initial_ratings(players_df, sport).items():
+        elo0[ids[name]], rating0[ids[name]] = elo_start, rating_start
+
+    # --- Sequential replay: Elo, rating and form ---
+    elo = elo0.tolist()
+    ratings = rating0.tolist()
+    last_change = [0] * n_players
+    giant_kill = np.zeros(n, dtype=bool)
+    forms = [None] * n_players
+    elo_before, elo_delta, rating_before, rating_delta = [], [], [], []
+    appearance = []  # Players in order of their first played match
+    k_factor, scale, r_min, r_max = rating.k_factor, rating.scale, rating.minimum, rating.maximum
+    for k, a1, b1, a2, b2, won, tie, games1, games2, day in zip(
+            k_played.tolist(), t1a[k_played].tolist(), t1b[k_played].tolist(), t2a[k_played].tolist(),
+            t2b[k_played].tolist(), t1_won[k_played].tolist(), is_tie[k_played].tolist(),
+            g1[k_played].tolist(), g2[k_played].tolist(), enc.date_codes[k_played].tolist()):
+        team1 = (a1,) if b1 < 0 else (a1, b1)
+        team2 = (a2,) if b2 < 0 else (a2, b2)
+        r1 = ratings[a1] if b1 < 0 else (ratings[a1] + ratings[b1]) / 2
+        r2 = ratings[a2] if b2 < 0 else (ratings[a2] + ratings[b2]) / 2
+        e1 = elo[a1] if b1 < 0 else (elo[a1] + elo[b1]) / 2
+        e2 = elo[a2] if b2 < 0 else (elo[a2] + elo[b2]) / 2
+
+        # Giant Killer: beat a team with a 100+ Elo advantage
+        if won and (e2 - e1) >= 100: giant_kill[k] = True
+        elif (not won and not tie) and (e1 - e2) >= 100: giant_kill[k] = True
+
+        actual1 = 0.5 if tie else (1.0 if won else 0.0)
+        for team, own, opp, actual in ((team1, e1, e2, actual1), (team2, e2, e1, 1.0 - actual1)):
+            expected = 1 / (1 + 10 ** ((opp - own) / 400))
+            elo_change = K_FACTOR * (actual - expected)
+            for p in team:
+                elo_before.append(elo[p])
+                elo_delta.append(elo_change)
+                elo[p] += elo_change
+                last_change[p] = elo_change
+
+        total = games1 + games2
+        for team, own, opp, gwp in ((team1, r1, r2, games1 / total), (team2, r2, r1, games2 / total)):
+            expected_gwp = 1 / (1 + math.exp(-(own - opp) / scale))
+            rating_change = k_factor * (gwp - expected_gwp)
+            for p in team:
+                before = ratings[p]
+                ratings[p] = max(r_min, min(r_max, before + rating_change))
+                rating_before.append(before)
+                rating_delta.append(ratings[p] - before)
+
+        result1 = _TIE if tie else (_WIN if won else _LOSS)
+        result2 = _TIE if tie else (_LOSS if won else _WIN)
+        for team, result, gd in ((team1, result1, games1 - games2), (team2, result2, games2 - games1)):
+            for p in team:
+                form = forms[p]
+                if form is None:
+                    form = forms[p] = PlayerForm()
+                    appearance.append(p)
+                form.add(result, gd, day)
+
+    # --- One row per (match, player) of the played matches, in replay order ---
+    slots = np.stack([t1a, t1b, t2a, t2b], axis=1)[k_played]
+    present = slots >= 0
+    pid = slots[present]
+    k = np.repeat(k_played, 4).reshape(-1, 4)[present]
+    on_team1 = np.broadcast_to(np.array([True, True, False, False]), slots.shape)[present]
+
+    # The replay updated the players of a match in this same order
+    match_ids = m['match_id'].to_numpy(dtype=object) if 'match_id' in m.columns else m.index.to_numpy(dtype=object)
+    history = pd.DataFrame({
+        "match_id": np.tile(match_ids[k], 2),
+        "date": np.tile(m['date'].to_numpy(dtype=object)[k] if n else np.array([], dtype=object), 2),
+        "player_id": np.tile(pid, 2),
+        "player": np.tile(np.array(names, dtype=object)[pid] if n_players else np.array([], dtype=object), 2),
+        "system": pd.Categorical([ELO] * len(pid) + [rating.name] * len(pid), categories=[ELO, rating.name]),
+        "rating_before": np.array(elo_before + rating_before, dtype=float),
+        "delta": np.array(elo_delta + rating_delta, dtype=float),
+    }, columns=HISTORY_COLUMNS)
+
+    win = np.where(on_team1, t1_won[k], ~t1_won[k]) & ~is_tie[k]
+    tie = is_tie[k]
+    games_won = np.where(on_team1, g1[k], g2[k])
+    gd = 2 * games_won - (g1[k] + g2[k])
+    pts_win, pts_loss = enc.pts_win[k], enc.pts_loss[k]
+    points = np.where(tie, (pts_win + pts_loss) / 2, np.where(win, pts_win, pts_loss))
+    clutch = sets["clutch"][k]
+    # Set Collector / Sniper count sets by the team 1 / team 2 side of the score, not the player's side
+    sets_won = np.where(win, sets["sets_a"][k], sets["sets_b"][k])
+    tb_wins = np.where(win, sets["tb_a"][k], sets["tb_b"][k])
+
+    def per_player(weights=None):
+        return np.bincount(pid, weights=weights, minlength=n_players)
+
+    matches_n = per_player().astype(int)
+    wins_n = per_player(win).astype(int)
+    ties_n = per_player(tie).astype(int)
+    losses_n = matches_n - wins_n - ties_n
+    games_won_n = per_player(games_won).astype(int)
+    gd_sum_n = per_player(gd).astype(int)
+    clutch_n = per_player(clutch).astype(int)
+    clutch_wins_n = per_player(clutch & win).astype(int)
+    points_n = per_player(points)
+    singles_n = per_player(enc.is_singles[k]).astype(int)
+    singles_wins_n = per_player(enc.is_singles[k] & win).astype(int)
+    doubles_n = matches_n - singles_n
+    doubles_wins_n = wins_n - singles_wins_n
+    giant_kills_n = per_player(win & giant_kill[k]).astype(int)
+    comebacks_n = per_player(win & enc.comeback[k]).astype(int)
+    sets_won_n = per_player(sets_won).astype(int)
+    tb_wins_n = per_player(tb_wins).astype(int)
+
+    # Last Active counts every active match, with or without games
+    k_active = np.flatnonzero(enc.active)
+    active_slots = np.stack([t1a, t1b, t2a, t2b], axis=1)[k_active]
+    active_present = active_slots >= 0
+    last_k = np.full(n_players, -1)
+    np.maximum.at(last_k, active_slots[active_present], np.repeat(k_active, 4).reshape(-1, 4)[active_present])
+    dates = m['date'].to_numpy(dtype=object) if n else np.array([], dtype=object)
+
+    profiles = dict(zip(players_df['name'], players_df['profile_image_url'])) if 'profile_image_url' in players_df.columns else {}
+
+    parsed_dates = {}
+    rank_data = []
+    for p in appearance:
+        name = names[p]
+        form = forms[p]
+        m_played = int(matches_n[p])
+
+        wins, ties, losses = int(wins_n[p]), int(ties_n[p]), int(losses_n[p])
+        clutch_pct = (clutch_wins_n[p] / clutch_n[p] * 100) if clutch_n[p] > 0 else 0
+        consistency = form.consistency
+        l_date = dates[last_k[p]] if last_k[p] >= 0 else ""
+        last_dt = None
+        if l_date:
+            # Many players share a last match day: parse each date once
+            if l_date not in parsed_dates:
+                try:
+                    dt = pd.to_datetime(l_date)
+                    parsed_dates[l_date] = (dt, dt.strftime("%d %b %y"))
+                except: parsed_dates[l_date] = (None, l_date)
+            last_dt, l_date = parsed_dates[l_date]
+
+        badges = player_badges(
+            m_played, wins, form.streak, consistency, clutch_pct, int(clutch_n[p]),
+            giant_kills=int(giant_kills_n[p]), comebacks=int(comebacks_n[p]), max_daily_matches=form.max_daily,
+            sets_won=int(sets_won_n[p]), tb_wins=int(tb_wins_n[p]), last_active=last_dt, today=today,
+        )
+
+        points_total = float(points_n[p])
+        if not ties and points_total.is_integer():
+            points_total = int(points_total)
+        score_elo = round(elo[p], 1)
+        current_rating = int(round(ratings[p]))
+
+        singles_perf = round((singles_wins_n[p] / singles_n[p]) * 100, 1) if singles_n[p] > 0 else 0
+        doubles_perf = round((doubles_wins_n[p] / doubles_n[p]) * 100, 1) if doubles_n[p] > 0 else 0
+
+        # Record and Trend
+        record_str = f"{wins}W-{losses}L"
+        if allow_ties: record_str = f"{wins}W-{losses}L-{ties}T"
+        trend_str = "".join([f"<span class='trend-{_TREND_LETTERS[r].lower()}'>{_TREND_LETTERS[r]}</span>" for r in form.recent()])
+
+        rank_data.append({
+            "Player": name, "Points": points_total, "Score": score_elo, "Label": "Elo", "Elo": score_elo,
+            "Score_Elo (Hybrid)": score_elo, "Score_Points": points_total,
+            sport.score_key: current_rating, "Last Change": round(last_change[p], 1),
+            "Wins": wins, "Losses": losses, "Ties": ties, "Games Won": int(games_won_n[p]),
+            "Win %": round((wins/m_played)*100, 1), "Matches": m_played,
+            "Game Diff Avg": round(int(gd_sum_n[p])/m_played, 2) if m_played > 0 else 0,
+            "Clutch Factor": round(clutch_pct, 1),
+            "Consistency Index": round(consistency, 2), "Last Active": l_date if l_date else "N/A",
+            "Badges": badges,
+            "Profile": profiles.get(name, DEFAULT_AVATAR),
+            "Record": record_str,
+            "Trend": trend_str,
+            "Singles Perf": singles_perf,
+            "Doubles Perf": doubles_perf,
+        })
+
+    df = pd.DataFrame(rank_data)
+    if not df.empty:
+        df = df.sort_values(by=["Score_Elo (Hybrid)", "Win %"], ascending=[False, False])
+        df["Rank_Elo (Hybrid)"] = range(1, len(df) + 1)
+        df = df.sort_values(by=["Score_Points", "Win %"], ascending=[False, False])
+        df["Rank_Points"] = range(1, len(df) + 1)
+        df = df.sort_values(by=[sport.score_key, "Win %"], ascending=[False, False])
+        df[f"Rank_{sport.rating.name}"] = range(1, len(df) + 1)
+
+        # Set default rank based on Elo Hybrid
+        df = df.sort_values(by="Score_Elo (Hybrid)", ascending=False).reset_index(drop=True)
+        df["Rank"] = df.index + 1
+
+        # Award #1 Rank Badge
+        if not df.empty:
+            df.at[0, 'Badges'] = df.at[0, 'Badges'] + [COURT_DOMINATOR]
+    return df, history
+
+
+def rating_trajectory(history, players, system=ELO):
+    """Each player's rating after every match of ``system``, in match order.
+
+    Columns: ``player``, ``match`` (1-based count of the player's matches),
+    ``match_id``, ``date``, ``rating`` and ``delta``.
+    """
+    h = history[(history["system"] == system) & history["player"].isin(players)]
+    out = pd.DataFrame({
+        "player": h["player"].to_numpy(),
+        "match_id": h["match_id"].to_numpy(),
+        "date": h["date"].to_numpy(),
+        "rating": (h["rating_before"] + h["delta"]).to_numpy(),
+        "delta": h["delta"].to_numpy(),
+    })
+    out.insert(1, "match", out.groupby("player").cumcount() + 1)
+    return out
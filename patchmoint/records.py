@@ -0,0 +1,139 @@
+"""All-time Hall of Fame records, folded in match by match.
+
+A chapter keeps one row per player (``RECORD_COLUMNS``): the running state
+the records need (current win streak, last match day and its count) next
+to the player's bests so far. ``update_records`` folds newly posted
+matches into those rows with the rankings' Elo rule, so reading the Hall
+of Fame never replays the match history; ``hall_of_fame`` picks each
+record's holder from the rows. Records are history: they outlive season
+resets. A deleted or backdated match changes that history, so the rows
+are then rebuilt from it with ``records_from_history``.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from patchmoint.rankings import ELO_DEFAULT_RATING, K_FACTOR, encode_matches, initial_ratings
+
+RECORD_COLUMNS = [
+    "player", "win_streak", "best_win_streak", "best_win_streak_on", "last_day", "day_matches",
+    "most_matches_day", "most_matches_day_on", "sets_won", "peak_elo", "peak_elo_on",
+    "biggest_upset", "biggest_upset_on",
+]
+HALL_OF_FAME_COLUMNS = ["Record", "Player", "Value", "On"]
+
+
+class Record(NamedTuple):
+    title: str
+    column: str
+    on_column: str  # Date the record was set, "" for running totals
+    fmt: str
+
+
+RECORDS = [
+    Record("Longest Win Streak", "best_win_streak", "best_win_streak_on", "{:.0f} wins"),
+    Record("Biggest Elo Upset", "biggest_upset", "biggest_upset_on", "+{:.0f} Elo"),
+    Record("Most Matches in a Day", "most_matches_day", "most_matches_day_on", "{:.0f} matches"),
+    Record("Most Sets Won", "sets_won", "", "{:.0f} sets"),
+    Record("Highest Peak Elo", "peak_elo", "peak_elo_on", "{:.1f}"),
+]
+
+
+def new_record(player):
+    return {
+        "player": player, "win_streak": 0, "best_win_streak": 0, "best_win_streak_on": "", "last_day": "",
+        "day_matches": 0, "most_matches_day": 0, "most_matches_day_on": "", "sets_won": 0,
+        "peak_elo": 0.0, "peak_elo_on": "", "biggest_upset": 0.0, "biggest_upset_on": "",
+    }
+
+
+def update_records(records, matches, players_df, config, sport, ratings):
+    """Fold ``matches`` into ``records`` (player -> row dict) in date order.
+
+    ``ratings`` maps players to their Elo before the first of ``matches``
+    (players missing from it start from ``initial_ratings``) and is moved
+    along match by match. Only matches the rankings count are folded in.
+    Returns the names of the players whose rows changed.
+    """
+    start = initial_ratings(players_df, sport)
+    enc = encode_matches(matches, players_df, config, sport)
+    dates = enc.matches['date'].to_numpy(dtype=object) if len(enc.matches) else np.array([], dtype=object)
+    changed = set()
+    for k in np.flatnonzero(enc.played).tolist():
+        team1 = [enc.names[p] for p in (enc.t1a[k], enc.t1b[k]) if p >= 0]
+        team2 = [enc.names[p] for p in (enc.t2a[k], enc.t2b[k]) if p >= 0]
+        for p in team1 + team2:
+            ratings.setdefault(p, start.get(p, (ELO_DEFAULT_RATING,))[0])
+        e1 = sum(ratings[p] for p in team1) / len(team1)
+        e2 = sum(ratings[p] for p in team2) / len(team2)
+        tie, won = bool(enc.is_tie[k]), bool(enc.t1_won[k])
+        actual1 = 0.5 if tie else (1.0 if won else 0.0)
+        day = str(dates[k])
+
+        sides = ((team1, e1, e2, actual1, enc.sets["sets_a"][k]), (team2, e2, e1, 1.0 - actual1, enc.sets["sets_b"][k]))
+        for team, own, opp, actual, sets_won in sides:
+            elo_change = K_FACTOR * (actual - 1 / (1 + 10 ** ((opp - own) / 400)))
+            for p in team:
+                r = records.setdefault(p, new_record(p))
+                changed.add(p)
+                ratings[p] += elo_change
+                if ratings[p] > r["peak_elo"]:
+                    r["peak_elo"], r["peak_elo_on"] = ratings[p], day
+
+                r["win_streak"] = r["win_streak"] + 1 if actual == 1.0 else 0
+                if r["win_streak"] > r["best_win_streak"]:
+                    r["best_win_streak"], r["best_win_streak_on"] = r["win_streak"], day
+                if actual == 1.0 and opp - own > r["biggest_upset"]:
+                    r["biggest_upset"], r["biggest_upset_on"] = opp - own, day
+
+                r["day_matches"] = r["day_matches"] + 1 if r["last_day"] == day else 1
+                r["last_day"] = day
+                if r["day_matches"] > r["most_matches_day"]:
+                    r["most_matches_day"], r["most_matches_day_on"] = r["day_matches"], day
+
+                r["sets_won"] += int(sets_won)
+    return changed
+
+
+def records_from_history(matches, players_df, config, sport, season_seeds=None):
+    """Every player's record row from a full match history, for seeding or rebuilding a chapter.
+
+    With a ``season_id`` column the seasons are folded in the order they
+    first appear, each from fresh Elo ratings as the rankings start them.
+    ``season_seeds`` maps an archived season to the ``initial_utr`` seeds
+    it started from (``players_df`` holds the live season's); seasons
+    without them start from ``players_df``.
+    """
+    records = {}
+    season_seeds = season_seeds or {}
+    seasons = matches.groupby("season_id", sort=False, dropna=False) if "season_id" in matches.columns else [(None, matches)]
+    for season_id, season in seasons:
+        seeds = season_seeds.get(season_id)
+        update_records(records, season, players_df if seeds is None else seeded_players(players_df, seeds), config, sport, {})
+    return records
+
+
+def seeded_players(players_df, seeds):
+    """``players_df`` (plus any seeded player no longer in it) with ``seeds`` (player -> initial_utr) as ``initial_utr``."""
+    names = pd.concat([players_df.get("name", pd.Series(dtype=object)), pd.Series(list(seeds), dtype=object)]).drop_duplicates()
+    return pd.DataFrame({"name": names.to_numpy(), "initial_utr": names.map(seeds).to_numpy(dtype=object)})
+
+
+def hall_of_fame(records):
+    """The holder of each record as a ``HALL_OF_FAME_COLUMNS`` frame.
+
+    ``records`` is a frame of record rows; the earliest to set a shared
+    record keeps it. Records nobody has set yet are left out.
+    """
+    rows = []
+    if not records.empty:
+        for record in RECORDS:
+            values = pd.to_numeric(records[record.column], errors="coerce").fillna(0)
+            if values.max() <= 0:
+                continue
+            on = records[record.on_column].fillna("") if record.on_column else pd.Series("", index=records.index)
+            best = records.assign(_value=values, _on=on.replace("", "9999")).sort_values(["_value", "_on"], ascending=[False, True]).iloc[0]
+            rows.append({"Record": record.title, "Player": best["player"], "Value": record.fmt.format(best["_value"]),
+                         "On": on[best.name]})
+    return pd.DataFrame(rows, columns=HALL_OF_FAME_COLUMNS)
@@ -0,0 +1,65 @@
+"""Parsing of set score strings such as "6-4", "Tie Break 7-5" or "11-9"."""
+import re
+from typing import NamedTuple
+
+_NUMBERS = re.compile(r'\d+')
+
+SET = "set"
+TIE_BREAK = "tie_break"
+SUPER_TIE_BREAK = "super_tie_break"
+
+
+class SetScore(NamedTuple):
+    """Games won by each team in one set, plus tie-break points when played."""
+    t1_games: int
+    t2_games: int
+    kind: str = SET
+    t1_points: int = 0
+    t2_points: int = 0
+
+    @property
+    def is_tie_break(self):
+        return self.kind != SET
+
+
+def parse_set(s):
+    """Parse one set column value; returns None for empty or unreadable sets.
+
+    A Super Tie Break counts as a 1-0 set and a Tie Break as 7-6 to the team
+    that took more points. A tie-break entry missing its points still comes
+    back as a (0-0) tie-break so clutch detection can see it.
+    """
+    if s is None:
+        return None
+    s_str = str(s)
+    if not s_str or s_str.lower() == 'nan':
+        return None
+
+    if "Tie Break" in s_str:
+        kind = SUPER_TIE_BREAK if "Super Tie Break" in s_str else TIE_BREAK
+        nums = [int(x) for x in _NUMBERS.findall(s_str)]
+        if len(nums) < 2:
+            return SetScore(0, 0, kind)
+        won, lost = (1, 0) if kind == SUPER_TIE_BREAK else (7, 6)
+        if nums[0] > nums[1]:
+            return SetScore(won, lost, kind, nums[0], nums[1])
+        return SetScore(lost, won, kind, nums[0], nums[1])
+
+    if '-' in s_str:
+        parts = s_str.split('-')
+        try:
+            return SetScore(int(parts[0]), int(parts[1]))
+        except ValueError:
+            return None
+    return None
+
+
+def parse_sets(*sets):
+    """Parsed scores of the played sets, skipping empty ones."""
+    return [score for score in map(parse_set, sets) if score is not None]
+
+
+def game_difference(sets, for_team1=True):
+    """Total game difference over parsed sets from one team's side."""
+    diff = sum(score.t1_games - score.t2_games for score in sets)
+    return diff if for_team1 else -diff
@@ -0,0 +1,181 @@
+"""Optional cache shared by every replica, on a Redis-protocol server.
+
+With one app process, ``framecache`` and ``st.cache_data`` keep the working
+set warm. Behind a load balancer each replica would load and compute it
+all over again, so when configured (``SHARED_CACHE_URL``, e.g.
+``redis://cache:6379/0``) this module sits between them and the database:
+
+* chapter frames under ``<prefix>:frame:<chapter>:<table>:<version>``,
+  where the version is a counter on the server that ``bump`` increments
+  after each write, so every replica agrees on what is current;
+* computed results (rankings, pair tables, ...) under
+  ``<prefix>:memo:<name>:<digest of the inputs>``, so they need no
+  invalidation of their own.
+
+Values are pickled (protocol 5) and expire after ``TTL`` seconds, which
+reclaims superseded versions. ``FORMAT`` is part of the prefix: raise it
+when a cached result changes shape, so replicas on old and new code do not
+read each other's values. Server errors are counted and fall back to
+loading or computing locally. Needs the ``redis`` package.
+"""
+import hashlib
+import pickle
+import threading
+from collections import Counter
+
+import pandas as pd
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when a shared cache is configured
+    redis = None
+
+FORMAT = 1
+PREFIX = f"patchmoint:{FORMAT}"
+TTL = 24 * 3600
+TIMEOUT_SECONDS = 2.0
+
+_lock = threading.Lock()
+_client = None
+_url = None
+_stats = Counter()
+
+
+def configure(url):
+    """Use the server at ``url`` from now on (None turns the shared cache off)."""
+    global _client, _url
+    with _lock:
+        if url == _url:
+            return
+        if url and redis is None:
+            raise RuntimeError("SHARED_CACHE_URL is set but the redis package is not installed (pip install redis)")
+        _client = redis.Redis.from_url(url, socket_timeout=TIMEOUT_SECONDS, socket_connect_timeout=TIMEOUT_SECONDS) if url else None
+        _url = url
+
+
+def enabled():
+    return _client is not None
+
+
+def _version_key(chapter_id, table):
+    return f"{PREFIX}:version:{chapter_id}:{table}"
+
+
+def bump(chapter_id, *tables):
+    """Move ``tables`` of ``chapter_id`` to a new shared version after a write."""
+    client = _client
+    if client is None or not tables:
+        return
+    try:
+        with client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.incr(_version_key(chapter_id, table))
+            pipe.execute()
+    except redis.RedisError:
+        _stats["errors"] += 1
+
+
+def versions(chapter_id, tables):
+    """Current shared versions of ``tables`` of ``chapter_id``; None when there is no server or it fails."""
+    client = _client
+    if client is None:
+        return None
+    try:
+        return [int(v or 0) for v in client.mget([_version_key(chapter_id, t) for t in tables])]
+    except redis.RedisError:
+        _stats["errors"] += 1
+        return None
+
+
+def get_frame(chapter_id, table, load, keep=None):
+    """``table`` of ``chapter_id`` at its current shared version, ``load()``-ed on a miss.
+
+    ``keep(frame)`` decides whether a loaded frame may be shared, as in
+    ``framecache.get``.
+    """
+    frames = get_frames(chapter_id, [table], lambda missing: {table: load()},
+                        None if keep is None else lambda _, frame: keep(frame))
+    return frames[table]
+
+
+def get_frames(chapter_id, tables, load, keep=None):
+    """``{table: frame}`` at the current shared versions, in two server round trips.
+
+    ``load(missing)`` returns ``{table: frame}`` for the tables not on the
+    server; ``keep(table, frame)`` decides which of those may be shared.
+    """
+    client = _client
+    if client is None:
+        return load(list(tables))
+    try:
+        versions = client.mget([_version_key(chapter_id, t) for t in tables])
+        keys = {t: f"{PREFIX}:frame:{chapter_id}:{t}:{int(v or 0)}" for t, v in zip(tables, versions)}
+        blobs = client.mget(list(keys.values()))
+    except redis.RedisError:
+        _stats["errors"] += 1
+        return load(list(tables))
+    frames = {t: pickle.loads(blob) for t, blob in zip(keys, blobs) if blob is not None}
+    _stats["hits"] += len(frames)
+    missing = [t for t in tables if t not in frames]
+    if missing:
+        _stats["misses"] += len(missing)
+        loaded = load(missing)
+        for t in missing:
+            if keep is None or keep(t, loaded[t]):
+                _store(client, keys[t], loaded[t], nx=True)
+        frames.update(loaded)
+    return frames
+
+
+def digest(*parts):
+    """Stable hash of ``parts``; frames are hashed by content, anything else pickled."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            frame = part.to_frame() if isinstance(part, pd.Series) else part
+            h.update(repr((type(part).__name__, list(frame.columns), [str(t) for t in frame.dtypes])).encode())
+            try:
+                h.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            except TypeError:
+                # Unhashable cells (lists, dicts): fall back to the pickled frame
+                h.update(pickle.dumps(part, protocol=5))
+        else:
+            h.update(pickle.dumps(part, protocol=5))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def memo(name, compute, *inputs):
+    """``compute()``, shared between replicas under ``name`` and the digest of ``inputs``.
+
+    ``inputs`` must be everything the result depends on.
+    """
+    client = _client
+    if client is None:
+        return compute()
+    key = f"{PREFIX}:memo:{name}:{digest(*inputs)}"
+    try:
+        blob = client.get(key)
+    except redis.RedisError:
+        _stats["errors"] += 1
+        return compute()
+    if blob is not None:
+        _stats["hits"] += 1
+        return pickle.loads(blob)
+
+    _stats["misses"] += 1
+    result = compute()
+    _store(client, key, result)
+    return result
+
+
+def _store(client, key, value, nx=False):
+    try:
+        client.set(key, pickle.dumps(value, protocol=5), ex=TTL, nx=nx)
+    except redis.RedisError:
+        _stats["errors"] += 1
+
+
+def stats():
+    """Hits, misses and server errors of this process, for the admin panels."""
+    return {"hits": _stats["hits"], "misses": _stats["misses"], "errors": _stats["errors"]}
@@ -0,0 +1,181 @@
+"""Monte Carlo simulation of the rest of a season.
+
+``simulate_season`` plays a list of remaining (or hypothetical) fixtures
+many times over. The fixtures run one after another, as the rankings
+replay them, but each step is vectorized across all simulated seasons:
+team Elo, win probability, random draw and rating update are NumPy
+operations on one contiguous row of seasons per player. Large runs are split into
+fixed-size chunks, each with its own seed, and fanned out to worker
+processes; the chunking does not depend on the number of workers, so a
+seed gives the same result serial or parallel.
+
+Ties are not simulated. Players level on the ranking score keep their
+current order, as the rankings break ties by win percentage.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from patchmoint.planner import plan_session
+from patchmoint.rankings import ELO_DEFAULT_RATING, K_FACTOR
+
+SIMULATIONS = 20_000
+CHUNK_SIZE = 10_000
+# Seasons x fixtures above which the chunks go to worker processes; spawned workers
+# take about a second to start (they import NumPy and pandas afresh)
+PARALLEL_WORK = 100_000_000
+ELO_SYSTEM = "Elo (Hybrid)"
+POINTS_SYSTEM = "Points"
+OUTLOOK_COLUMNS = ["Player", "Current", "Expected Position", "P(1st)", "P(Top 3)", "Best", "Worst"]
+
+
+class Fixture(NamedTuple):
+    team1: tuple
+    team2: tuple
+    match_type: str = "Doubles"
+
+
+class SeasonOutlook(NamedTuple):
+    players: list  # In current ranking order
+    positions: np.ndarray  # positions[i, j]: probability that players[i] finishes (j + 1)th
+    table: pd.DataFrame  # OUTLOOK_COLUMNS, one row per player in current order
+    simulations: int
+
+
+def _encode_fixtures(fixtures, index):
+    """(team1 ids, team2 ids) as (fixtures, 2) arrays, -1 for an empty slot."""
+    t1 = np.full((len(fixtures), 2), -1, dtype=np.int64)
+    t2 = np.full((len(fixtures), 2), -1, dtype=np.int64)
+    for f, fixture in enumerate(fixtures):
+        for arr, team in ((t1, fixture.team1), (t2, fixture.team2)):
+            for slot, p in enumerate(team[:2]):
+                arr[f, slot] = index[p]
+    return t1, t2
+
+
+def _simulate_chunk(elo0, points0, t1, t2, pts_win, pts_loss, by_points, seasons, seed):
+    """Finishing positions (0 = first) of ``seasons`` seasons, shape (seasons, players)."""
+    rng = np.random.default_rng(seed)
+    n_players = len(elo0)
+    # (players, seasons): each player's seasons are one contiguous row
+    elo = np.repeat(elo0[:, None], seasons, axis=1)
+    points = np.repeat(points0[:, None], seasons, axis=1)
+    for (a1, b1), (a2, b2), win_pts, loss_pts in zip(t1.tolist(), t2.tolist(), pts_win.tolist(), pts_loss.tolist()):
+        e1 = elo[a1] if b1 < 0 else (elo[a1] + elo[b1]) / 2
+        e2 = elo[a2] if b2 < 0 else (elo[a2] + elo[b2]) / 2
+        expected1 = 1 / (1 + 10 ** ((e2 - e1) / 400))
+        won = rng.random(seasons) < expected1
+        change1 = K_FACTOR * (won - expected1)
+        if by_points:
+            gained1 = np.where(won, win_pts, loss_pts)
+            gained2 = (win_pts + loss_pts) - gained1
+        for p in (a1, b1):
+            if p >= 0:
+                elo[p] += change1
+                if by_points: points[p] += gained1
+        for p in (a2, b2):
+            if p >= 0:
+                elo[p] -= change1
+                if by_points: points[p] += gained2
+
+    score = (points if by_points else elo).T
+    # Players come in current ranking order, so a stable sort keeps it among equals
+    order = np.argsort(-score, axis=1, kind="stable")
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.broadcast_to(np.arange(n_players), order.shape), axis=1)
+    return positions
+
+
+def simulate_season(standings, fixtures, match_type_settings, system=ELO_SYSTEM,
+                    simulations=SIMULATIONS, seed=0, workers=None):
+    """Finishing-position distribution of every player after ``fixtures``.
+
+    ``standings`` is a ranking table (``Player``, ``Elo``, ``Points``) in
+    current order; fixture players missing from it start as new players.
+    ``system`` is ``"Elo (Hybrid)"`` or ``"Points"``; points per result come
+    from ``match_type_settings``, and Elo moves with every simulated match in
+    both. ``workers`` caps the worker processes (default: CPU count; 1 keeps
+    it in process).
+    """
+    players = list(standings["Player"]) if not standings.empty else []
+    for fixture in fixtures:
+        for p in (*fixture.team1, *fixture.team2):
+            if p and p not in players:
+                players.append(p)
+    index = {p: i for i, p in enumerate(players)}
+    known = dict(zip(standings["Player"], zip(standings["Elo"], standings["Points"]))) if not standings.empty else {}
+    elo0 = np.array([float(known[p][0]) if p in known else ELO_DEFAULT_RATING for p in players])
+    points0 = np.array([float(known[p][1]) if p in known else 0.0 for p in players])
+
+    fixtures = [Fixture(tuple(p for p in f.team1 if p), tuple(p for p in f.team2 if p), f.match_type) for f in fixtures]
+    fixtures = [f for f in fixtures if f.team1 and f.team2]
+    t1, t2 = _encode_fixtures(fixtures, index)
+    settings = [match_type_settings.get(f.match_type, {}) for f in fixtures]
+    pts_win = np.array([s.get("win_points", 2) for s in settings], dtype=float)
+    pts_loss = np.array([s.get("loss_points", 0) for s in settings], dtype=float)
+
+    n_players = len(players)
+    counts = np.zeros((n_players, n_players), dtype=np.int64)
+    best = np.full(n_players, n_players)
+    worst = np.zeros(n_players, dtype=np.int64)
+    if n_players:
+        sizes = [min(CHUNK_SIZE, simulations - start) for start in range(0, simulations, CHUNK_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        args = [(elo0, points0, t1, t2, pts_win, pts_loss, system == POINTS_SYSTEM, size, s) for size, s in zip(sizes, seeds)]
+        workers = min(workers or os.cpu_count() or 1, len(args))
+        if workers > 1 and simulations * len(fixtures) > PARALLEL_WORK:
+            # Not fork: the caller's threads (a Streamlit server, a DB listener) do not survive it
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+        else:
+            chunks = [_simulate_chunk(*a) for a in args]
+        for positions in chunks:
+            flat = np.arange(n_players) * n_players + positions
+            counts += np.bincount(flat.ravel(), minlength=n_players * n_players).reshape(n_players, n_players)
+            best = np.minimum(best, positions.min(axis=0))
+            worst = np.maximum(worst, positions.max(axis=0))
+
+    probabilities = counts / max(simulations, 1)
+    places = np.arange(1, n_players + 1)
+    table = pd.DataFrame({
+        "Player": players,
+        "Current": places,
+        "Expected Position": (probabilities @ places).round(2) if n_players else [],
+        "P(1st)": (probabilities[:, 0] * 100).round(1) if n_players else [],
+        "P(Top 3)": (probabilities[:, :3].sum(axis=1) * 100).round(1) if n_players else [],
+        "Best": best + 1,
+        "Worst": worst + 1,
+    }, columns=OUTLOOK_COLUMNS)
+    return SeasonOutlook(players, probabilities, table, simulations)
+
+
+def round_robin_fixtures(players, rounds=1, match_type="Singles"):
+    """Every pair of ``players`` meeting ``rounds`` times in singles."""
+    return [Fixture((a,), (b,), match_type) for _ in range(rounds) for a, b in combinations(players, 2)]
+
+
+def booking_fixtures(bookings_df, ratings, since):
+    """Fixtures of the full bookings from ``since`` on.
+
+    Singles bookings need two players, doubles four; doubles teams are split
+    as the session planner would, by ``ratings``.
+    """
+    if bookings_df.empty:
+        return []
+    when = pd.to_datetime(bookings_df["date"].astype(str) + " " + bookings_df["time"].astype(str), errors="coerce")
+    fixtures = []
+    for row, dt in zip(bookings_df.itertuples(), when):
+        if pd.isna(dt) or dt < since:
+            continue
+        players = [p for p in (row.player1, row.player2, row.player3, row.player4) if isinstance(p, str) and p]
+        if row.match_type == "Singles" and len(players) == 2:
+            fixtures.append(Fixture((players[0],), (players[1],), "Singles"))
+        elif row.match_type != "Singles" and len(players) == 4:
+            court = plan_session(players, ratings, 1, restarts=1).courts[0]
+            fixtures.append(Fixture(court.team1, court.team2, row.match_type))
+    return fixtures
@@ -0,0 +1,263 @@
+"""Static leaderboard snapshots: an HTML page and a PNG per chapter.
+
+Guests who only want the standings should not need a Streamlit session
+(or a database round trip). The generator renders each chapter's podium
+and top ten once per change into
+
+    <out>/<chapter_id>/index.html        the page to share
+    <out>/<chapter_id>/leaderboard.png   the image (also its link preview)
+
+which any static host, CDN or object store synced from ``<out>`` can
+serve. Files are replaced atomically and only rewritten when their
+content changed, so caches and ETags of the host stay valid in between.
+
+    python -m patchmoint.snapshots "$NEON_DATABASE_URL" --out site/          # every chapter, once
+    python -m patchmoint.snapshots "$NEON_DATABASE_URL" --out site/ --watch  # and again after each change
+
+``--watch`` listens for the app's change notifications (see
+``patchmoint.notify``) and re-renders the chapters whose players, matches
+or config changed, at most once per ``--interval``; after the listener
+reconnects (changes may have been missed) it re-renders them all. The
+pages of a chapter that no longer exists are removed.
+"""
+import argparse
+import html
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+
+from patchmoint import api, framecache, notify
+from patchmoint.cards import get_img_src, podium_html
+from patchmoint.rankings import calculate_rankings
+
+TOP = 10
+WATCH_INTERVAL = 10.0
+HTML_NAME = "index.html"
+PNG_NAME = "leaderboard.png"
+# Changes to these tables move the standings; bookings do not
+RANKED_TABLES = ("chapters", "players", "matches")
+
+_PNG_WIDTH = 1080
+_PNG_HEADER = 200
+_PNG_ROW = 78
+_BACKGROUND = (7, 17, 40)
+_ACCENT = (204, 255, 0)
+_MEDALS = [(204, 255, 0), (192, 192, 192), (205, 127, 50)]
+
+_STYLE = """
+body { margin: 0; padding: 24px 12px; background: linear-gradient(135deg, #071a3d 0%, #0c0014 100%); min-height: 100vh;
+       color: white; font-family: 'Turret Road', sans-serif; }
+main { max-width: 720px; margin: 0 auto; }
+h1 { margin: 0 0 4px; color: #ccff00; }
+.as-of { color: #aaa; margin-bottom: 28px; }
+.glow-square { width: 100px; height: 100px; border: 3px solid #ccff00; border-radius: 12px; overflow: hidden; display: flex;
+               justify-content: center; align-items: center; background-color: #262626; box-shadow: 0 0 15px rgba(204, 255, 0, 0.4);
+               margin: 0 auto; box-sizing: border-box; }
+.glow-square img { width: 100%; height: 100%; object-fit: contain; padding: 5px; box-sizing: border-box; }
+table { width: 100%; border-collapse: collapse; }
+td, th { padding: 10px 8px; border-bottom: 1px solid rgba(255, 255, 255, 0.1); text-align: left; }
+th { color: #aaa; font-size: 0.8em; text-transform: uppercase; }
+td.num, th.num { text-align: right; }
+td.rank { color: #ccff00; font-weight: bold; }
+td img { width: 36px; height: 36px; border-radius: 8px; object-fit: cover; vertical-align: middle; margin-right: 8px; }
+footer { margin-top: 24px; color: #666; font-size: 0.8em; }
+"""
+
+
+def leaderboard(rank_df, config, top=TOP):
+    """The first ``top`` rows in the chapter's first ranking system, ordered as the Rankings tab does."""
+    if rank_df.empty:
+        return rank_df
+    systems = [k for k, v in config.get("ranking_systems", {}).items() if v] or ["Elo (Hybrid)"]
+    system = systems[0]
+    sys_key = f"Score_{system}"
+    if sys_key in rank_df.columns:
+        rank_df = rank_df.sort_values(by=[sys_key, "Win %"], ascending=[False, False]).reset_index(drop=True)
+        rank_df = rank_df.assign(Rank=rank_df.index + 1, Score=rank_df[sys_key], Label=system)
+    return rank_df.head(top)
+
+
+def render_html(chapter_name, board, as_of, app_url="", image_url=PNG_NAME):
+    """The standalone snapshot page of a ``leaderboard`` frame."""
+    name = html.escape(chapter_name)
+    label = html.escape(str(board["Label"].iloc[0])) if not board.empty else ""
+    records = board.assign(Player=board["Player"].map(html.escape)).to_dict("records") if not board.empty else []
+    rows = "".join(
+        f"<tr><td class='rank'>#{r['Rank']}</td>"
+        f"<td><img src='{html.escape(get_img_src(r['Profile']), quote=True)}' alt=''>{r['Player']}</td>"
+        f"<td class='num'>{r['Score']:.1f}</td><td>{html.escape(str(r['Record']))}</td><td class='num'>{r['Win %']}%</td></tr>"
+        for r in records
+    ) or "<tr><td colspan='5'>No matches yet</td></tr>"
+    link = f"<a href='{html.escape(app_url, quote=True)}' style='color:#ccff00;'>Open the league</a> · " if app_url else ""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{name} standings</title>
+<meta property="og:title" content="{name} standings">
+<meta property="og:description" content="Top {len(records)} as of {as_of:%B %d, %Y}">
+<meta property="og:image" content="{html.escape(image_url, quote=True)}">
+<link href="https://fonts.googleapis.com/css2?family=Turret+Road:wght@400;700&display=swap" rel="stylesheet">
+<style>{_STYLE}</style>
+</head>
+<body><main>
+<h1>{name}</h1>
+<div class="as-of">Rankings as of {as_of:%B %d, %Y}, {label} View</div>
+{podium_html(records[:3]) if len(records) >= 3 else ""}
+<table>
+<tr><th>Rank</th><th>Player</th><th class="num">{label}</th><th>Record</th><th class="num">Win %</th></tr>
+{rows}
+</table>
+<footer>{link}Snapshot of the live standings</footer>
+</main></body>
+</html>
+"""
+
+
+def _font(size):
+    return ImageFont.load_default(size=size)
+
+
+def render_png(chapter_name, board, as_of):
+    """The snapshot image of a ``leaderboard`` frame, as PNG bytes."""
+    height = _PNG_HEADER + _PNG_ROW * max(len(board), 1) + 40
+    image = Image.new("RGB", (_PNG_WIDTH, height), _BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    title, body, small = _font(56), _font(36), _font(26)
+    label = str(board["Label"].iloc[0]) if not board.empty else ""
+
+    draw.text((48, 40), chapter_name, font=title, fill=_ACCENT)
+    draw.text((48, 118), f"Rankings as of {as_of:%B %d, %Y}" + (f" · {label}" if label else ""), font=small, fill=(170, 170, 170))
+    if board.empty:
+        draw.text((48, _PNG_HEADER), "No matches yet", font=body, fill="white")
+    for i, row in enumerate(board.itertuples(index=False)):
+        top = _PNG_HEADER + i * _PNG_ROW
+        if i % 2 == 0:
+            draw.rectangle((32, top - 10, _PNG_WIDTH - 32, top + _PNG_ROW - 14), fill=(18, 30, 58))
+        color = _MEDALS[i] if i < len(_MEDALS) else "white"
+        draw.text((48, top), f"#{row.Rank}", font=body, fill=color)
+        draw.text((160, top), str(row.Player), font=body, fill="white")
+        draw.text((_PNG_WIDTH - 340, top), f"{row.Score:.1f}", font=body, fill=_ACCENT, anchor="ra")
+        draw.text((_PNG_WIDTH - 48, top + 6), str(row.Record), font=small, fill=(170, 170, 170), anchor="ra")
+
+    out = io.BytesIO()
+    image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _write(path, data):
+    """Atomically replace ``path`` with ``data`` unless it already holds exactly that."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".snapshot-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+    return True
+
+
+def snapshot(chapter_id, out_dir, app_url="", base_url=""):
+    """Render ``chapter_id`` into ``out_dir``; returns the names of the files that changed."""
+    name, sport, config = api.chapter(chapter_id)
+    matches = api.frame(chapter_id, "matches")
+    rank_df = calculate_rankings(matches, api.frame(chapter_id, "players"), config, sport) if not matches.empty else pd.DataFrame()
+    board = leaderboard(rank_df, config)
+    as_of = datetime.now().date()
+
+    directory = os.path.join(out_dir, chapter_id)
+    os.makedirs(directory, exist_ok=True)
+    # Link previews need an absolute image URL
+    image_url = f"{base_url.rstrip('/')}/{chapter_id}/{PNG_NAME}" if base_url else PNG_NAME
+    chapter_url = f"{app_url}?chapter={chapter_id}" if app_url else ""
+    files = {
+        HTML_NAME: render_html(name, board, as_of, chapter_url, image_url).encode(),
+        PNG_NAME: render_png(name, board, as_of),
+    }
+    return [f for f, data in files.items() if _write(os.path.join(directory, f), data)]
+
+
+def remove(chapter_id, out_dir):
+    """Delete the pages of ``chapter_id`` from ``out_dir``; returns whether there were any."""
+    directory = os.path.join(out_dir, chapter_id)
+    # Ids arrive in notifications: never follow one out of out_dir
+    if os.path.dirname(os.path.normpath(directory)) != os.path.normpath(out_dir) or not os.path.isdir(directory):
+        return False
+    shutil.rmtree(directory)
+    return True
+
+
+def _snapshot_all(chapter_ids, args):
+    for chapter_id in chapter_ids:
+        try:
+            changed = snapshot(chapter_id, args.out, args.app_url, args.base_url)
+            print(f"{chapter_id}: {', '.join(changed) if changed else 'unchanged'}", flush=True)
+        except api.NotFound:
+            removed = remove(chapter_id, args.out)
+            print(f"{chapter_id}: no such chapter{', pages removed' if removed else ''}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dsn", help="Postgres connection string")
+    parser.add_argument("--out", required=True, help="directory to write <chapter_id>/index.html and leaderboard.png to")
+    parser.add_argument("--chapters", nargs="+", help="chapter ids (default: every chapter)")
+    parser.add_argument("--app-url", default="", help="app URL the pages link back to (e.g. the sport's app_url)")
+    parser.add_argument("--base-url", default="", help="public URL the --out directory is served at")
+    parser.add_argument("--watch", action="store_true", help="keep running and re-render chapters after each change")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="seconds between re-renders when watching")
+    parser.add_argument("--listen-dsn", help="direct (non-pooled) connection string for LISTEN, if the DSN is pooled")
+    args = parser.parse_args(argv)
+
+    dsn = api.connect(args.dsn)
+    wanted = set(args.chapters or [])
+    pending, lock = set(), threading.Lock()
+    resync = threading.Event()
+
+    def on_change(chapter_id, table):
+        framecache.bump(chapter_id, table)
+        if table in RANKED_TABLES and (not wanted or chapter_id in wanted):
+            with lock:
+                pending.add(chapter_id)
+
+    def on_reconnect():
+        # Changes made while the listener was away were not heard: render everything again
+        framecache.clear()
+        resync.set()
+
+    if args.watch:
+        # Listen before the first pass so no change slips in between
+        listener = notify.start_listener(args.listen_dsn or dsn, on_change, on_reconnect)
+        framecache.gate(listener.connected)
+        listener.connected.wait(30)
+    _snapshot_all(args.chapters or api.chapter_ids(), args)
+    stop = threading.Event()
+    try:
+        while args.watch and not stop.wait(args.interval):
+            if resync.is_set():
+                resync.clear()
+                with lock:
+                    pending.update(args.chapters or api.chapter_ids())
+            with lock:
+                batch = sorted(pending)
+                pending.clear()
+            _snapshot_all(batch, args)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
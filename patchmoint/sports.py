@@ -0,0 +1,174 @@
+"""Per-sport plugins: score grammar, rating system and theming.
+
+Everything that used to differ between the Tennis, Pickleball and Padel
+scripts lives here, so one app process can serve all three leagues.
+"""
+from dataclasses import dataclass
+
+ASSET_BASE_URL = "https://raw.githubusercontent.com/mahadevbk/patchmointtennis/main/assets"
+DEFAULT_AVATAR = f"{ASSET_BASE_URL}/players/default.png"
+
+
+@dataclass(frozen=True)
+class CustomScore:
+    """A free-form score entry offered at the end of the set dropdown."""
+    label: str
+    template: str
+    defaults: tuple
+    key: str
+    min_points: int
+    error: str
+    exact_margin: bool = False  # Past min_points the margin must be exactly 2 (win by 2)
+
+    def is_valid(self, v1, v2):
+        top, diff = max(v1, v2), abs(v1 - v2)
+        if top < self.min_points or diff < 2:
+            return False
+        if self.exact_margin and top > self.min_points and diff != 2:
+            return False
+        return True
+
+    def format(self, v1, v2):
+        return self.template.format(v1, v2)
+
+
+@dataclass(frozen=True)
+class RatingSystem:
+    """The sport's UTR-style rating, shown next to Elo and Points."""
+    name: str
+    description: str
+    default: float
+    minimum: float
+    maximum: float
+    k_factor: float = 0.05
+    scale: float = 3.0
+    legacy_names: tuple = ()  # Names older chapter configs may still use
+
+
+@dataclass(frozen=True)
+class Theme:
+    background_url: str
+    chapter_card_url: str
+    score_color: str = "#ccff00"
+    score_glow_rgb: str = "204, 255, 0"
+    vs_label_color: str = "#bbbbbb"
+
+
+@dataclass(frozen=True)
+class Sport:
+    name: str
+    valid_scores: tuple
+    custom_scores: tuple
+    rating: RatingSystem
+    theme: Theme
+    app_url: str
+    close_games_are_clutch: bool = False  # Pickleball: a 2-point game past 10 counts as clutch
+
+    @property
+    def score_key(self):
+        return f"Score_{self.rating.name}"
+
+    def get_valid_scores(self):
+        return list(self.valid_scores) + [c.label for c in self.custom_scores]
+
+    def get_custom_score(self, label):
+        for custom in self.custom_scores:
+            if custom.label == label:
+                return custom
+        return None
+
+
+def _set_scores():
+    # Tennis / Padel scores
+    scores = ["6-0", "6-1", "6-2", "6-3", "6-4", "7-5", "7-6", "0-6", "1-6", "2-6", "3-6", "4-6", "5-7", "6-7"]
+    # Standard Tie Breaks
+    for i in range(7): scores.extend([f"Tie Break 7-{i}", f"Tie Break {i}-7"])
+    # Standard Super Tie Breaks
+    for i in range(10): scores.extend([f"Super Tie Break 10-{i}", f"Super Tie Break {i}-10"])
+    return tuple(scores)
+
+
+def _pickleball_scores():
+    # Pickleball scores: typically games to 11, 15, or 21. Win by 2.
+    scores = []
+    # Games to 11
+    for i in range(10): scores.extend([f"11-{i}", f"{i}-11"])
+    scores.extend(["12-10", "10-12", "13-11", "11-13", "14-12", "12-14"]) # Common tie breaks
+    # Games to 15
+    for i in range(14): scores.extend([f"15-{i}", f"{i}-15"])
+    scores.extend(["16-14", "14-16", "17-15", "15-17"])
+    return tuple(scores)
+
+
+TIE_BREAK_ENTRIES = (
+    CustomScore("Custom Tie Break Entry", "Tie Break {}-{}", (7, 5), "custom_tb", 7, "Tie Break: Min 7 pts & Diff 2"),
+    CustomScore("Custom Super Tie Break Entry", "Super Tie Break {}-{}", (10, 8), "custom_stb", 10, "Super TB: Min 10 pts & Diff 2"),
+)
+
+TENNIS = Sport(
+    name="Tennis",
+    valid_scores=_set_scores(),
+    custom_scores=TIE_BREAK_ENTRIES,
+    rating=RatingSystem(
+        name="UTR",
+        description="Universal Tennis Rating simulation. Focuses on game score margins.",
+        default=4.0, minimum=1.0, maximum=16.5,
+        legacy_names=("DUPR",),
+    ),
+    theme=Theme(
+        background_url=f"{ASSET_BASE_URL}/background/background.jpg",
+        chapter_card_url=f"{ASSET_BASE_URL}/background/cardbg.png",
+    ),
+    app_url="https://patchmoint-tennis.streamlit.app/",
+)
+
+PICKLEBALL = Sport(
+    name="Pickleball",
+    valid_scores=_pickleball_scores(),
+    custom_scores=(
+        CustomScore("Custom Pickleball Score (Win by 2)", "{}-{}", (11, 9), "custom_pb", 11, "Invalid: Min 11 pts & Win by 2", exact_margin=True),
+    ),
+    rating=RatingSystem(
+        name="DUPR",
+        description="Dynamic Universal Pickleball Rating simulation. Focuses on game score margins.",
+        default=3.5, minimum=2.0, maximum=8.0,
+        legacy_names=("UTR",),
+    ),
+    theme=Theme(
+        background_url=f"{ASSET_BASE_URL}/background/bgpickleball.jpg",
+        chapter_card_url=f"{ASSET_BASE_URL}/background/pickleballchapter.jpg",
+    ),
+    app_url="https://patchmoint-pickleball.streamlit.app/",
+    close_games_are_clutch=True,
+)
+
+PADEL = Sport(
+    name="Padel",
+    valid_scores=_set_scores(),
+    custom_scores=TIE_BREAK_ENTRIES,
+    rating=RatingSystem(
+        name="Padel Rating",
+        description="Universal Padel Rating simulation. Focuses on game score margins.",
+        default=4.0, minimum=1.0, maximum=16.5,
+        legacy_names=("UTR", "DUPR"),
+    ),
+    theme=Theme(
+        background_url=f"{ASSET_BASE_URL}/background/background.jpg",
+        chapter_card_url=f"{ASSET_BASE_URL}/background/padelballchapter.jpg",
+        score_color="#FF5F1F",
+        score_glow_rgb="255, 95, 31",
+        vs_label_color="#ccff00",
+    ),
+    app_url="https://patchmoint-padel.streamlit.app/",
+)
+
+SPORTS = {s.name: s for s in (TENNIS, PICKLEBALL, PADEL)}
+DEFAULT_SPORT = "Tennis"
+
+
+def get_sport(name):
+    """Look up a sport by name, case-insensitively (e.g. from ``?sport=padel``)."""
+    for sport in SPORTS.values():
+        if str(name).strip().lower() == sport.name.lower():
+            return sport
+    return None
@@ -0,0 +1,371 @@
+"""The app's stylesheet, assembled once per process and theme.
+
+Streamlit drops every element a rerun does not emit again, so the styles
+have to go out with each rerun; ``stylesheet`` makes that one cached,
+minified ``<style>`` string (fonts, base rules, match cards and the
+sport's theme) for a single style-only ``st.html`` call, which Streamlit
+keeps out of the page layout.
+"""
+import functools
+import re
+
+FONTS_URL = "https://fonts.googleapis.com/css2?family=Turret+Road:wght@200;300;400;500;700;800&display=swap"
+
+BASE_CSS = """
+    .glow-square {
+            width: 100px; 
+            height: 100px;
+            border: 3px solid #ccff00;
+            border-radius: 12px;
+            overflow: hidden;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            background-color: #262626;
+            box-shadow: 0 0 15px rgba(204, 255, 0, 0.4);
+            margin: 0 auto;
+            position: relative;
+            box-sizing: border-box;
+        }
+        .glow-square img {
+            width: 100%;
+            height: 100%;
+            object-fit: contain;
+            padding: 5px;
+            box-sizing: border-box;
+            cursor: pointer;
+        }
+        .mmc-avatar {
+            width: 100px;
+            height: 120px;
+            border-radius: 15%;
+            border: 2px solid #444;
+            object-fit: cover;
+            margin-bottom: 8px;
+            background: #222;
+            cursor: pointer;
+            box-sizing: border-box;
+        }
+        .player-img-container {
+            position: relative;
+            display: inline-block;
+            overflow: hidden;
+            border-radius: 15%;
+            width: 100px;
+            height: 120px;
+            box-sizing: border-box;
+        }
+html, body, [class*="st-"], .stApp, h1, h2, h3, h4, h5, h6 {
+    font-family: 'Turret Road', sans-serif !important;
+}
+.mobile-card {
+    background: linear-gradient(135deg, #071a3d 0%, #0c0014 100%);
+    border: 1px solid rgba(255, 245, 0, 0.2);
+    border-radius: 15px;
+    padding: 15px;
+    margin-bottom: 15px;
+    box-shadow: 0 4px 15px rgba(0,0,0,0.5);
+}
+.rank-badge {
+    background: #fff500;
+    color: #041136;
+    font-weight: bold;
+    border-radius: 5px;
+    padding: 2px 8px;
+    font-size: 14px;
+}
+.trend-dot {
+    height: 10px; width: 10px; border-radius: 50%; display: inline-block; margin-right: 3px;
+}
+.dot-w { background-color: #00ff88; box-shadow: 0 0 5px #00ff88; }
+.dot-l { background-color: #ff4b4b; }
+.stApp {
+  background-size: cover;
+  background-position: center;
+  background-attachment: fixed;
+}
+@media print {
+  html, body { -webkit-print-color-adjust: exact !important; print-color-adjust: exact !important; }
+  body { background-color: #041136 !important; height: 100vh; margin: 0; padding: 0; }
+  header, .stToolbar { display: none; }
+}
+[data-testid="stHeader"] {
+    background: black !important;
+    background-image: none !important;
+    border-bottom: 1px solid #333;
+}
+.profile-image:hover { transform: scale(1.1); }
+.court-card {
+    background: linear-gradient(to bottom, #031827, #07314f); border: 1px solid #fff500;
+    border-radius: 10px; padding: 15px; margin: 10px 0; box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
+    transition: transform 0.2s, box-shadow 0.2s; text-align: center;
+    min-height: 120px; display: flex; flex-direction: column; justify-content: center; align-items: center;
+}
+.court-card:hover { transform: scale(1.05); box-shadow: 0 6px 12px rgba(255, 245, 0, 0.3); }
+.court-card h4 { color: #fff500; margin-bottom: 10px; }
+.court-card a {
+    background-color: #fff500; color: #031827; padding: 8px 16px; border-radius: 5px;
+    text-decoration: none; font-weight: bold; display: inline-block; margin-top: 10px;
+    transition: background-color 0.2s;
+}
+.court-card a:hover { background-color: #ffd700; }
+h1 { font-size: 24px !important; }
+h2 { font-size: 22px !important; }
+h3 { font-size: 16px !important; }
+.rankings-table-container {
+    width: 100%; margin-top: 0px !important; padding: 5px;
+}
+.ranking-row {
+    display: block; padding: 15px; margin-bottom: 15px; border: 1px solid rgba(255, 255, 255, 0.2);
+    border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.3);
+    background: linear-gradient(135deg, rgba(255, 255, 255, 0.30) 0%, rgba(255, 255, 255, 0.26) 100%);
+    overflow: visible; transition: transform 0.2s;
+}
+.ranking-row:hover { transform: translateY(-2px); border-color: rgba(255, 245, 0, 0.5); }
+.rank-profile-player-group { display: flex; align-items: center; margin-bottom: 15px; border-bottom: 1px solid rgba(255,255,255,0.1); padding-bottom: 10px; }
+.rank-col { font-size: 2em; font-weight: bold; color: #fff500; margin-right: 15px; min-width: 40px; text-align: center; }
+.player-col { font-size: 1.4em; font-weight: bold; color: #ffffff; flex-grow: 1; }
+.badge { background: #fff500; color: black; padding: 2px 8px; 
+    border-radius: 10px; font-size: 0.75em; font-weight: bold; margin-left: 5px;
+}
+.trend-w { color: #00ff88; font-weight: bold; margin-right: 2px; }
+.trend-l { color: #ff4b4b; font-weight: bold; margin-right: 2px; }
+.trend-t { color: #FFA500; font-weight: bold; margin-right: 2px; }
+.stat-box {
+    background: rgba(255,255,255,0.30); padding: 15px; border-radius: 10px; 
+    border-left: 4px solid #fff500; margin-bottom: 10px;
+}
+.stat-label { font-size: 0.7em; color: #aaa; text-transform: uppercase; }
+.metric-value { font-size: 1.1em; font-weight: bold; }
+.stat-highlight { color: #fff500; }
+[data-testid="stMetric"] > div:nth-of-type(1) { color: #FF7518 !important; }
+.block-container { display: flex; flex-wrap: wrap; justify-content: center; }
+[data-testid="stHorizontalBlock"] { flex: 1 1 100% !important; margin: 10px 0; }
+.chapter-card {
+    background-size: cover;
+    background-position: center;
+    border: 2px solid #fff500;
+    border-radius: 12px;
+    text-align: center;
+    transition: transform 0.2s, box-shadow 0.2s;
+    box-shadow: 0 0 10px #fff500;
+    display: flex;
+    flex-direction: column;
+    height: 100%;
+    padding: 0;
+    overflow: hidden;
+}
+.chapter-card:hover {
+    transform: translateY(-5px);
+    border-color: #fff500;
+    box-shadow: 0 0 20px #fff500;
+}
+.card-content {
+    padding: 15px;
+    display: flex;
+    flex-direction: column;
+    flex-grow: 1;
+}
+.card-image-container {
+    height: 150px;
+    width: 100%;
+    overflow: hidden;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background-color: rgba(255, 255, 255, 0.30);
+}
+.card-image-container img {
+    width: 100%;
+    height: 100%;
+    object-fit: contain;
+}
+.chapter-card h3 {
+    color: #fff500;
+    margin-top: 10px;
+    margin-bottom: 10px;
+    font-size: 24px !important; /* Added font-size (16px * 1.5 = 24px) */
+    font-weight: 700;           /* Optional: makes it bold for better visibility */
+}
+.chapter-card p {
+    color: #fff500 !important;
+    font-size: 16px;
+    font-weight: 500;
+    margin-bottom: 15px;
+    opacity: 1; /* Ensures it is fully bright */
+}
+.enter-button {
+    background-color: #fff500;
+    color: #031827;
+    padding: 8px 16px;
+    border-radius: 5px;
+    text-decoration: none;
+    font-weight: bold;
+    display: block;
+    margin-top: auto; /* Pushes button to the bottom */
+    transition: background-color 0.2s;
+    width: 100%;
+    box-sizing: border-box;
+}
+.enter-button:hover {
+    background-color: #ffd700;
+}
+.stat-container {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 8px;
+        margin-top: 10px;
+    }
+    .stat-chip {
+        padding: 4px 12px;
+        border-radius: 15px;
+        font-weight: bold;
+        font-size: 0.85rem;
+        color: white;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
+    }
+    .win-rate { background: linear-gradient(135deg, #28a745, #1e7e34); }
+    .matches { background: linear-gradient(135deg, #007bff, #0056b3); }
+    .points { background: linear-gradient(135deg, #fd7e14, #d96101); }
+"""
+
+MATCH_CARD_CSS = """
+.modern-match-card {
+    background: linear-gradient(145deg, rgba(255,255,255,0.08) 0%, rgba(255,255,255,0.02) 100%);
+    border: 1px solid rgba(255,255,255,0.1);
+    border-radius: 16px;
+    margin-bottom: 24px;
+    overflow: hidden;
+    transition: all 0.3s ease;
+    box-shadow: 0 4px 6px rgba(0,0,0,0.2);
+}
+.modern-match-card:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 8px 15px rgba(0,0,0,0.4);
+    border-color: rgba(204, 255, 0, 0.4); /* Optic yellow border on hover */
+}
+.mmc-header {
+    display: flex;
+    justify-content: space-between;
+    padding: 12px 20px;
+    background: rgba(0,0,0,0.2);
+    font-size: 0.85em;
+    color: #ccff00;
+    border-bottom: 1px solid rgba(255,255,255,0.05);
+}
+.mmc-body {
+    display: flex;
+    align-items: center;
+    padding: 20px 10px; /* Reduced side padding */
+    position: relative;
+}
+.mmc-team {
+    flex: 1;
+    text-align: center;
+    display: flex;
+    flex-direction: column;
+    align-items: center;
+    z-index: 2;
+}
+.mmc-avatar {
+    width: 100px;
+    height: 120px;
+    border-radius: 15%;
+    border: 2px solid #444;
+    object-fit: cover;
+    margin-bottom: 8px;
+    background: #222;
+}
+.mmc-winner-img {
+    border-color: #ccff00; /* Optic yellow border for winner */
+    box-shadow: 0 0 15px rgba(204, 255, 0, 0.4);
+}
+.mmc-tie-img {
+    border-color: #bbbbbb;
+    box-shadow: 0 0 15px rgba(187, 187, 187, 0.4);
+}
+.mmc-name {
+    font-weight: bold;
+    font-size: 1.0em;
+    color: #eee;
+    line-height: 1.2;
+}
+.mmc-winner-text {
+    color: #ccff00; /* Optic yellow text for winner */
+    text-shadow: 0 0 10px rgba(204, 255, 0, 0.2);
+}
+.mmc-tie-text {
+    color: #bbbbbb;
+    text-shadow: 0 0 10px rgba(187, 187, 187, 0.2);
+}
+.mmc-vs-container {
+    flex: 0 0 140px; /* Wider container for the score */
+    text-align: center;
+    z-index: 2;
+    display: flex;
+    flex-direction: column;
+    justify-content: center;
+}
+.mmc-vs-label {
+    font-size: 0.7em;
+    color: #bbbbbb;
+    font-weight: bold;
+    margin-bottom: 2px;
+    letter-spacing: 2px;
+}
+.mmc-score-main {
+    font-size: 2.2em; /* BIGGER */
+    font-weight: 900;
+    color: #ccff00; /* Optic yellow */
+    letter-spacing: 1px;
+    line-height: 1.1;
+    text-shadow: 0 0 20px rgba(204, 255, 0, 0.3); /* GLOW */
+    white-space: nowrap;
+}
+.mmc-footer {
+    padding: 12px 20px;
+    background: rgba(255,255,255,0.03);
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    border-top: 1px solid rgba(255,255,255,0.05);
+}
+.mmc-tag {
+    background: rgba(204, 255, 0, 0.15);
+    color: #ccff00;
+    padding: 2px 8px;
+    border-radius: 4px;
+    font-size: 0.75em;
+    font-weight: bold;
+    text-transform: uppercase;
+}
+.mmc-stat {
+    color: #aaa;
+    font-size: 0.9em;
+}
+"""
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_AROUND_PUNCTUATION = re.compile(r"\s*([{};])\s*")
+
+
+def theme_css(theme):
+    return f"""
+.stApp {{ background-image: url("{theme.background_url}"); }}
+.chapter-card {{ background-image: url("{theme.chapter_card_url}") !important; }}
+.mmc-vs-label {{ color: {theme.vs_label_color}; }}
+.mmc-score-main {{ color: {theme.score_color}; text-shadow: 0 0 20px rgba({theme.score_glow_rgb}, 0.3); }}
+.mmc-tag {{ background: rgba({theme.score_glow_rgb}, 0.15); color: {theme.score_color}; }}
+"""
+
+
+def minify(css):
+    css = _COMMENT.sub("", css)
+    return _AROUND_PUNCTUATION.sub(r"\1", _SPACE.sub(" ", css)).strip()
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet(theme):
+    """The whole ``<style>`` element for a sport's ``Theme``."""
+    return f"<style>@import url('{FONTS_URL}');{minify(BASE_CSS + MATCH_CARD_CSS + theme_css(theme))}</style>"
@@ -0,0 +1,169 @@
+"""Deterministic synthetic leagues for benchmarks and local experiments.
+
+``synthetic_league(n_matches, sport=...)`` builds players, matches and
+bookings frames shaped like the database tables. The same arguments always
+give the same league, so timings can be compared across commits.
+"""
+import random
+from datetime import date, timedelta
+from typing import NamedTuple
+
+import pandas as pd
+
+from patchmoint.config import default_config
+from patchmoint.sports import PICKLEBALL, TENNIS
+
+CHAPTER_ID = "synthetic"
+MATCH_TYPE_WEIGHTS = {"Singles": 0.3, "Doubles": 0.55, "Mixed Doubles": 0.15}
+
+# Set scores from the set winner's side
+_SET_WINS = ["6-0", "6-1", "6-2", "6-3", "6-4", "7-5", "7-6"]
+_SET_WEIGHTS = [1, 3, 5, 6, 7, 4, 3]
+
+
+class SyntheticLeague(NamedTuple):
+    players: pd.DataFrame
+    matches: pd.DataFrame
+    bookings: pd.DataFrame
+    config: dict
+
+
+def _flip(score):
+    a, b = score.split('-')
+    return f"{b}-{a}"
+
+
+def _set_sport_set(rng, team1_wins):
+    r = rng.random()
+    if r < 0.06:
+        loser = rng.randint(0, 5)
+        score = f"Tie Break 7-{loser}" if team1_wins else f"Tie Break {loser}-7"
+        return score
+    score = rng.choices(_SET_WINS, _SET_WEIGHTS)[0]
+    return score if team1_wins else _flip(score)
+
+
+def _pickleball_set(rng, team1_wins):
+    r = rng.random()
+    if r < 0.15:
+        top = rng.randint(12, 14)
+        score = f"{top}-{top - 2}"
+    elif r < 0.25:
+        score = f"15-{rng.randint(5, 13)}"
+    else:
+        score = f"11-{rng.randint(0, 9)}"
+    return score if team1_wins else _flip(score)
+
+
+def _deciding_set(rng, sport, team1_wins):
+    if sport is PICKLEBALL:
+        return _pickleball_set(rng, team1_wins)
+    if rng.random() < 0.5:
+        loser = rng.randint(0, 8)
+        return f"Super Tie Break 10-{loser}" if team1_wins else f"Super Tie Break {loser}-10"
+    return _set_sport_set(rng, team1_wins)
+
+
+def _match_sets(rng, sport, team1_wins):
+    """Best-of-three set strings consistent with the winner."""
+    one_set = _pickleball_set if sport is PICKLEBALL else _set_sport_set
+    if rng.random() < 0.6:
+        return [one_set(rng, team1_wins), one_set(rng, team1_wins), ""]
+    first_to_winner = rng.random() < 0.5
+    return [
+        one_set(rng, team1_wins if first_to_winner else not team1_wins),
+        one_set(rng, not team1_wins if first_to_winner else team1_wins),
+        _deciding_set(rng, sport, team1_wins),
+    ]
+
+
+def synthetic_league(n_matches, n_players=None, sport=TENNIS, seed=0, n_bookings=20,
+                     start=date(2024, 1, 1), tie_rate=0.0):
+    """A reproducible league of ``n_matches`` matches for ``sport``.
+
+    Players get a hidden skill that decides match winners, so rankings have
+    realistic spread. ``n_players`` defaults to about one player per 25
+    matches (at least 8). With ``tie_rate`` > 0 some matches are ties and the
+    config allows them.
+    """
+    rng = random.Random(seed)
+    n_players = n_players or max(8, n_matches // 25)
+
+    names = [f"Player {i:04d}" for i in range(n_players)]
+    genders = ["M" if i % 2 == 0 else "F" for i in range(n_players)]
+    skill = {name: rng.gauss(0, 1) for name in names}
+    men = [n for n, g in zip(names, genders) if g == "M"]
+    women = [n for n, g in zip(names, genders) if g == "F"]
+    players = pd.DataFrame({
+        "name": names,
+        "profile_image_url": ["" if i % 3 == 0 else f"https://example.com/players/{i}.png" for i in range(n_players)],
+        "birthday": ["01-01"] * n_players,
+        "chapter_id": CHAPTER_ID,
+        "password": "",
+        "gender": genders,
+        "is_admin": False,
+        "initial_utr": [None if i % 4 else round(sport.rating.default + skill[n], 1) for i, n in enumerate(names)],
+    })
+
+    match_types = list(MATCH_TYPE_WEIGHTS)
+    type_weights = list(MATCH_TYPE_WEIGHTS.values())
+    days = max(1, n_matches // 6)
+    rows = []
+    for i in range(n_matches):
+        match_type = rng.choices(match_types, type_weights)[0]
+        if match_type == "Singles":
+            t1p1, t2p1 = rng.sample(names, 2)
+            t1p2 = t2p2 = ""
+        elif match_type == "Doubles":
+            t1p1, t1p2, t2p1, t2p2 = rng.sample(names, 4)
+        else:
+            t1p1, t2p1 = rng.sample(men, 2)
+            t1p2, t2p2 = rng.sample(women, 2)
+
+        t1_skill = skill[t1p1] + (skill[t1p2] if t1p2 else 0)
+        t2_skill = skill[t2p1] + (skill[t2p2] if t2p2 else 0)
+        team1_wins = rng.random() < 1 / (1 + 10 ** ((t2_skill - t1_skill) / 2))
+        set1, set2, set3 = _match_sets(rng, sport, team1_wins)
+        winner = "Team 1" if team1_wins else "Team 2"
+        if tie_rate and rng.random() < tie_rate:
+            winner = "Tie"
+
+        rows.append({
+            "match_id": f"SYN-{i:06d}",
+            "date": (start + timedelta(days=i * days // n_matches)).isoformat(),
+            "match_type": match_type,
+            "team1_player1": t1p1, "team1_player2": t1p2,
+            "team2_player1": t2p1, "team2_player2": t2p2,
+            "set1": set1, "set2": set2, "set3": set3,
+            "winner": winner,
+            "match_image_url": "",
+            "chapter_id": CHAPTER_ID,
+        })
+    matches = pd.DataFrame(rows, columns=[
+        "match_id", "date", "match_type", "team1_player1", "team1_player2", "team2_player1", "team2_player2",
+        "set1", "set2", "set3", "winner", "match_image_url", "chapter_id"])
+
+    booking_rows = []
+    first_booking = start + timedelta(days=days + 1)
+    for i in range(n_bookings):
+        match_type = "Singles" if i % 3 == 0 else "Doubles"
+        booked = rng.sample(names, 2 if match_type == "Singles" else 4)
+        booked += [""] * (4 - len(booked))
+        booking_rows.append({
+            "booking_id": f"SYNB-{i:04d}",
+            "date": (first_booking + timedelta(days=i // 3)).isoformat(),
+            "time": f"{rng.randint(6, 21):02d}:{rng.choice(['00', '30'])}",
+            "match_type": match_type,
+            "court_name": f"Court {i % 4 + 1}",
+            "player1": booked[0], "player2": booked[1], "player3": booked[2], "player4": booked[3],
+            "standby_player": "",
+            "screenshot_url": "",
+            "chapter_id": CHAPTER_ID,
+        })
+    bookings = pd.DataFrame(booking_rows)
+
+    config = default_config(sport)
+    for settings in config["match_type_settings"].values():
+        settings["enabled"] = True
+    config["allow_ties"] = bool(tie_rate)
+    return SyntheticLeague(players, matches, bookings, config)
@@ -0,0 +1,166 @@
+"""Per-rerun timing spans for the admin Performance panel.
+
+A trace is started at the top of each script run and kept per thread
+(Streamlit runs every session's script in its own thread). While no trace
+is active, ``span()`` hands back a shared no-op context manager and
+``traced`` functions call straight through, so instrumentation left in
+place costs one thread-local lookup.
+
+    trace = tracing.start(enabled)
+    with tracing.span("fetch_data matches", tracing.DB):
+        ...
+    with tracing.cached("rankings"):      # hit unless cache_miss() runs inside
+        ...
+"""
+import functools
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+DB = "db"
+SQL = "sql"  # One statement; see patchmoint.db
+CACHE = "cache"
+COMPUTE = "compute"
+RENDER = "render"
+
+_local = threading.local()
+_NOOP = nullcontext()
+
+
+class Span:
+    __slots__ = ("name", "kind", "start", "duration", "depth", "parent_kind")
+
+    def __init__(self, name, kind, start, depth, parent_kind):
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.duration = 0.0
+        self.depth = depth
+        self.parent_kind = parent_kind
+
+
+class Trace:
+    """Spans and counters of one script run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = Counter()
+        self._open = []
+        self._cache_frames = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def slowest(self, n=15):
+        return sorted(self.spans, key=lambda s: s.duration, reverse=True)[:n]
+
+    def summary(self):
+        """Totals for the panel header: run time, time and count per kind, cache hits."""
+        by_kind = Counter()
+        counts = Counter()
+        for s in self.spans:
+            # A span nested in one of its own kind is already inside the parent's time
+            if s.kind != s.parent_kind:
+                by_kind[s.kind] += s.duration
+            counts[s.kind] += 1
+        return {
+            "total": self.elapsed(),
+            "time_by_kind": dict(by_kind),
+            "count_by_kind": dict(counts),
+            "queries": counts[SQL],
+            "cache_hits": self.counters["cache_hit"],
+            "cache_misses": self.counters["cache_miss"],
+        }
+
+
+class _SpanContext:
+    __slots__ = ("trace", "name", "kind", "span")
+
+    def __init__(self, trace, name, kind):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+
+    def __enter__(self):
+        trace = self.trace
+        parent_kind = trace._open[-1].kind if trace._open else None
+        self.span = Span(self.name, self.kind, time.perf_counter() - trace.started, len(trace._open), parent_kind)
+        trace.spans.append(self.span)
+        trace._open.append(self.span)
+        return self.span
+
+    def __exit__(self, *exc):
+        self.trace._open.pop()
+        self.span.duration = time.perf_counter() - self.trace.started - self.span.start
+        return False
+
+
+class _CachedContext(_SpanContext):
+    __slots__ = ()
+
+    def __enter__(self):
+        self.trace._cache_frames.append(False)
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        missed = self.trace._cache_frames.pop()
+        self.trace.counters["cache_miss" if missed else "cache_hit"] += 1
+        self.span.name += " (miss)" if missed else " (hit)"
+        return super().__exit__(*exc)
+
+
+def start(enabled=True):
+    """Begin a new trace for this thread's script run; returns it, or None when disabled."""
+    _local.trace = Trace() if enabled else None
+    return _local.trace
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+def span(name, kind=COMPUTE):
+    """Time the ``with`` block as a span of the current trace."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NOOP
+    return _SpanContext(trace, name, kind)
+
+
+def cached(name):
+    """Span around a cached call; counted as a miss if ``cache_miss()`` runs inside."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NOOP
+    return _CachedContext(trace, name, CACHE)
+
+
+def cache_miss():
+    """Call from the body of a cached function: it only runs when the cache missed."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None and trace._cache_frames:
+        trace._cache_frames[-1] = True
+
+
+def count(key, n=1):
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.counters[key] += n
+
+
+def traced(name=None, kind=COMPUTE):
+    """Decorator form of ``span``; the span is named after the function by default."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = getattr(_local, "trace", None)
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _SpanContext(trace, span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
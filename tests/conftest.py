@@ -0,0 +1,42 @@
+"""Fixtures for the cache and change-notification tests.
+
+Tests that need Postgres run against ``PATCHMOINT_TEST_DATABASE_URL``
+(any local server will do, e.g. ``postgresql://postgres@/postgres?host=/tmp``)
+and are skipped without it. The shared cache runs on ``fakeredis``.
+"""
+import os
+import uuid
+
+import pytest
+
+from patchmoint import framecache, sharedcache
+
+
+@pytest.fixture
+def dsn():
+    url = os.environ.get("PATCHMOINT_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("PATCHMOINT_TEST_DATABASE_URL is not set")
+    return url
+
+
+@pytest.fixture
+def chapter_id():
+    # framecache versions live as long as the process: every test gets chapters of its own
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture(autouse=True)
+def ungated():
+    yield
+    framecache.gate(None)
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(sharedcache.redis.Redis, "from_url", lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+    sharedcache.configure("redis://test")
+    yield server
+    sharedcache.configure(None)
@@ -0,0 +1,87 @@
+import uuid
+
+import psycopg2
+import pytest
+
+from patchmoint import context, framecache
+
+SCHEMA = [
+    "CREATE TABLE chapters (id TEXT PRIMARY KEY, name TEXT, sport TEXT, config JSONB, title_image_url TEXT)",
+    "CREATE TABLE players (name TEXT, profile_image_url TEXT, birthday TEXT, chapter_id TEXT, password TEXT, gender TEXT)",
+    "CREATE TABLE matches (match_id TEXT PRIMARY KEY, date TEXT, match_type TEXT, team1_player1 TEXT, team1_player2 TEXT, "
+    "team2_player1 TEXT, team2_player2 TEXT, set1 TEXT, set2 TEXT, set3 TEXT, winner TEXT, match_image_url TEXT, "
+    "chapter_id TEXT, season_id TEXT)",
+    "CREATE TABLE bookings (booking_id TEXT PRIMARY KEY, date TEXT, time TEXT, match_type TEXT, court_name TEXT, player1 TEXT, "
+    "player2 TEXT, player3 TEXT, player4 TEXT, screenshot_url TEXT, chapter_id TEXT)",
+    "CREATE TABLE courts (chapter_id TEXT, name TEXT, url TEXT)",
+]
+
+
+@pytest.fixture
+def connect(dsn, chapter_id):
+    """Connections to a throwaway schema holding one chapter with a player and a live and an archived match."""
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path TO {schema}")
+        for statement in SCHEMA:
+            cur.execute(statement)
+        cur.execute("INSERT INTO chapters VALUES (%s, 'Test', 'Tennis', '{\"allow_ties\": true}', '')", (chapter_id,))
+        cur.execute("INSERT INTO players (name, chapter_id) VALUES ('Ann', %s)", (chapter_id,))
+        cur.execute("INSERT INTO matches (match_id, date, chapter_id, season_id) VALUES ('live', '2026-10-18', %s, NULL), "
+                    "('old', '2025-01-01', %s, 'season-1')", (chapter_id, chapter_id))
+    yield lambda: psycopg2.connect(dsn, options=f"-c search_path={schema}")
+    with admin.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    admin.close()
+
+
+def test_fetch_types_every_table_in_one_statement(connect, chapter_id):
+    conn = connect()
+    try:
+        frames = context.fetch(conn, chapter_id)
+    finally:
+        conn.close()
+    assert set(frames) == set(context.TABLES)
+    assert frames["chapters"].iloc[0]["config"] == {"allow_ties": True}
+    assert frames["players"]["name"].tolist() == ["Ann"]
+    assert frames["matches"]["match_id"].tolist() == ["live"]  # Archived seasons stay out
+    assert frames["bookings"].empty and list(frames["bookings"].columns) == context.EMPTY_COLUMNS["bookings"]
+
+
+def test_load_fetches_only_what_the_cache_misses(connect, chapter_id):
+    connections = []
+
+    def counting():
+        connections.append(1)
+        return connect()
+
+    context.load(chapter_id, counting)
+    context.load(chapter_id, counting)
+    assert len(connections) == 1
+
+    framecache.bump(chapter_id, "players")
+    frames = context.load(chapter_id, counting, ("chapters", "players"))
+    assert len(connections) == 2 and frames["players"]["name"].tolist() == ["Ann"]
+
+
+def test_missing_chapters_are_not_cached(connect):
+    missing = f"missing-{uuid.uuid4().hex[:8]}"
+    frames = context.load(missing, connect)
+    assert frames["chapters"].empty
+    assert all(framecache.lookup(missing, table)[0] is None for table in context.TABLES)
+
+
+def test_missing_chapters_are_not_shared(shared, connect):
+    missing = f"missing-{uuid.uuid4().hex[:8]}"
+    connections = []
+
+    def counting():
+        connections.append(1)
+        return connect()
+
+    for _ in range(2):
+        assert context.load(missing, counting, ("players",))["players"].empty
+    assert len(connections) == 2
@@ -0,0 +1,27 @@
+import pytest
+
+from patchmoint import db
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM matches WHERE chapter_id = %s",
+    "SELECT (SELECT json_agg(t) FROM players t WHERE t.chapter_id = %(chapter_id)s) AS players",
+    "WITH live AS (SELECT * FROM matches WHERE season_id IS NULL) SELECT count(*) FROM live",
+    "SELECT * FROM players WHERE name = 'Delete Me'",
+])
+def test_plain_reads_are_analyzed(sql):
+    assert db.analyzable(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT pg_notify(%s, %s)",
+    "SELECT 1",
+    "WITH gone AS (DELETE FROM bookings WHERE chapter_id = %s RETURNING *) SELECT count(*) FROM gone",
+    "WITH moved AS (UPDATE matches SET season_id = %s RETURNING *) SELECT * FROM moved",
+    "SELECT * FROM matches WHERE match_id = %s FOR UPDATE",
+    "SELECT nextval('ids') FROM generate_series(1, 3)",
+    "UPDATE players SET password = %s WHERE name = %s",
+    "INSERT INTO matches VALUES %s",
+])
+def test_anything_else_is_only_explained(sql):
+    assert not db.analyzable(sql)
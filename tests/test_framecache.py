@@ -0,0 +1,62 @@
+import threading
+
+import pandas as pd
+
+from patchmoint import framecache
+
+
+def test_get_loads_once_until_bumped(chapter_id):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return pd.DataFrame({"name": ["Ann"]})
+
+    first, version = framecache.get(chapter_id, "players", load)
+    again, _ = framecache.get(chapter_id, "players", load)
+    assert again is first and len(loads) == 1
+
+    framecache.bump(chapter_id, "players")
+    assert framecache.version(chapter_id, "players") == version + 1
+    framecache.get(chapter_id, "players", load)
+    assert len(loads) == 2
+
+
+def test_load_racing_a_write_is_not_kept(chapter_id):
+    frame, version = framecache.lookup(chapter_id, "matches")
+    assert frame is None
+    framecache.bump(chapter_id, "matches")
+    framecache.put(chapter_id, "matches", version, pd.DataFrame())
+    assert framecache.lookup(chapter_id, "matches")[0] is None
+
+
+def test_named_values_share_the_table_version(chapter_id):
+    framecache.put(chapter_id, "chapters", 0, {"a": 1}, name="config")
+    assert framecache.lookup(chapter_id, "chapters", "config")[0] == {"a": 1}
+    framecache.bump(chapter_id, "chapters")
+    assert framecache.lookup(chapter_id, "chapters", "config")[0] is None
+
+
+def test_keep_rejects_placeholders(chapter_id):
+    framecache.get(chapter_id, "players", pd.DataFrame, keep=lambda frame: len(frame.columns) > 0)
+    assert framecache.lookup(chapter_id, "players")[0] is None
+
+
+def test_closed_gate_neither_serves_nor_keeps(chapter_id):
+    gate = threading.Event()
+    framecache.put(chapter_id, "players", 0, "before")
+    framecache.gate(gate)
+    assert not framecache.serving()
+    assert framecache.lookup(chapter_id, "players")[0] is None
+
+    framecache.put(chapter_id, "courts", 0, "while closed")
+    gate.set()
+    assert framecache.lookup(chapter_id, "players")[0] == "before"
+    assert framecache.lookup(chapter_id, "courts")[0] is None
+
+
+def test_clear_keeps_versions(chapter_id):
+    framecache.bump(chapter_id, "players")
+    framecache.put(chapter_id, "players", 1, "frame")
+    framecache.clear()
+    assert framecache.lookup(chapter_id, "players") == (None, 1)
@@ -0,0 +1,113 @@
+import time
+import uuid
+
+import psycopg2
+import pytest
+from psycopg2.extensions import make_dsn
+
+from patchmoint import framecache, notify
+
+
+def test_payloads_round_trip():
+    assert notify.parse(notify.payload("club:1", "matches", 7)) == (notify.TOKEN, "club:1", "matches", 7)
+    assert notify.parse("garbage") is None
+    assert notify.parse("token:club:matches:x") is None
+
+
+def wait_for(condition, seconds=10.0):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def listener(dsn, monkeypatch):
+    """A listener on its own backend, tagged so a test can drop its connection."""
+    monkeypatch.setattr(notify, "RECONNECT_SECONDS", 0.2)
+    name = f"notify-test-{uuid.uuid4().hex[:8]}"
+    changes, reconnects = [], []
+    listener = notify.Listener(make_dsn(dsn, application_name=name), lambda *change: changes.append(change),
+                               lambda: reconnects.append(1), poll_seconds=0.1)
+    listener.application_name, listener.changes, listener.reconnects = name, changes, reconnects
+    listener.start()
+    assert listener.connected.wait(10), listener.error
+    yield listener
+    listener.stop()
+    listener.join(5)
+
+
+def send(dsn, text):
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_notify(%s, %s)", (notify.CHANNEL, text))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_publish_reaches_other_processes_only(dsn, listener, chapter_id):
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            notify.publish(cur, chapter_id, {"matches": 1})
+        # Nothing is announced before the commit
+        time.sleep(0.3)
+        assert listener.changes == []
+        conn.commit()
+    finally:
+        conn.close()
+    time.sleep(0.3)
+    assert listener.changes == []  # Our own token
+
+    send(dsn, notify.payload(chapter_id, "matches", 2, token="another-process"))
+    assert wait_for(lambda: listener.changes == [(chapter_id, "matches")])
+    send(dsn, "garbage")
+    time.sleep(0.3)
+    assert listener.received == 1
+
+
+def test_changes_bump_the_frame_cache_and_the_gate_follows_the_connection(dsn, listener, chapter_id):
+    listener.on_change = framecache.bump
+    framecache.gate(listener.connected)
+    framecache.put(chapter_id, "players", 0, "frame")
+    assert framecache.serving() and framecache.lookup(chapter_id, "players")[0] == "frame"
+
+    send(dsn, notify.payload(chapter_id, "players", 1, token="another-process"))
+    assert wait_for(lambda: framecache.version(chapter_id, "players") == 1)
+    assert framecache.lookup(chapter_id, "players")[0] is None
+
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE application_name = %s",
+                    (listener.application_name,))
+    admin.close()
+    assert wait_for(lambda: not framecache.serving(), 5)
+    assert wait_for(lambda: listener.reconnects == [1] and framecache.serving())
+
+
+def test_a_connection_that_never_delivers_keeps_the_gate_closed(dsn, monkeypatch):
+    monkeypatch.setattr(notify, "PROBE_SECONDS", 0.5)
+
+    class Deaf(notify.Listener):
+        # Listens on one connection but waits on another, as behind a transaction pooler
+        def _probe(self, conn):
+            other = psycopg2.connect(self.dsn)
+            try:
+                return super()._probe(other)
+            finally:
+                other.close()
+
+    deaf = Deaf(dsn, lambda *change: None, poll_seconds=0.1)
+    framecache.gate(deaf.connected)
+    deaf.start()
+    try:
+        assert wait_for(lambda: deaf.error is not None, 5)
+        assert not deaf.connected.is_set() and not framecache.serving()
+        assert "pooled" in deaf.error
+    finally:
+        deaf.stop()
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from patchmoint import sharedcache
+
+
+def test_disabled_always_loads(chapter_id):
+    assert not sharedcache.enabled()
+    assert sharedcache.versions(chapter_id, ["players"]) is None
+    loads = []
+    for _ in range(2):
+        sharedcache.get_frame(chapter_id, "players", lambda: loads.append(1) or pd.DataFrame())
+    assert len(loads) == 2
+
+
+def test_frames_are_shared_until_bumped(shared, chapter_id):
+    loads = []
+
+    def load(missing):
+        loads.append(list(missing))
+        return {table: pd.DataFrame({"table": [table]}) for table in missing}
+
+    first = sharedcache.get_frames(chapter_id, ["players", "matches"], load)
+    again = sharedcache.get_frames(chapter_id, ["players", "matches"], load)
+    assert loads == [["players", "matches"]]
+    pd.testing.assert_frame_equal(again["matches"], first["matches"])
+
+    sharedcache.bump(chapter_id, "matches")
+    assert sharedcache.versions(chapter_id, ["players", "matches"]) == [0, 1]
+    sharedcache.get_frames(chapter_id, ["players", "matches"], load)
+    assert loads[-1] == ["matches"]
+
+
+def test_keep_decides_what_is_shared(shared, chapter_id):
+    loads = []
+
+    def load(missing):
+        loads.append(1)
+        return {"chapters": pd.DataFrame()}
+
+    for _ in range(2):
+        sharedcache.get_frames(chapter_id, ["chapters"], load, keep=lambda table, frame: not frame.empty)
+    assert len(loads) == 2
+
+
+def test_memo_computes_once_per_input(shared):
+    calls = []
+    frame = pd.DataFrame({"x": [1, 2]})
+    for _ in range(2):
+        assert sharedcache.memo("double", lambda: calls.append(1) or frame * 2, frame).equals(frame * 2)
+    sharedcache.memo("double", lambda: calls.append(1) or frame, frame.assign(x=[3, 4]))
+    assert len(calls) == 2